@@ -0,0 +1,280 @@
+"""Benchmarks the export hot path against the bundled templates.
+
+Every SVG under templates/ is loaded through Template and paired with a synthetic Device_ populated to a realistic density for that template. The time and peak memory of populate_template, replace_unused_keys and check_compatibility are recorded, and the results stored as JSON so they can be compared with a previous run.
+
+Usage: python -m benchmarks.export_benchmark --baseline benchmarks/results/2.1.0.json
+"""
+
+import argparse
+import json
+import logging
+import platform
+import random
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+
+from joystick_diagrams.export import populate_template, replace_unused_keys
+from joystick_diagrams.export_device import ExportDevice
+from joystick_diagrams.input.axis import Axis, AxisDirection, AxisSlider
+from joystick_diagrams.input.button import Button
+from joystick_diagrams.input.device import Device_
+from joystick_diagrams.input.hat import Hat, HatDirection
+from joystick_diagrams.template import Template
+from joystick_diagrams.version import VERSION
+
+_logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = Path(__file__).parent.parent.joinpath("templates")
+RESULTS_DIR = Path(__file__).parent.joinpath("results")
+ENCODING = "UTF8"
+
+DEVICE_GUID = "00000000-0000-0000-0000-000000000000"
+SEED = 1
+
+# Share of template controls which are bound, and of bound controls which have modifiers
+INPUT_DENSITY = 0.8
+MODIFIER_DENSITY = 0.25
+MODIFIER_KEYS = ["ralt", "lalt", "rctrl", "lctrl", "rshift", "lshift", "JOY_BTN1"]
+
+BUTTON_PATTERN = re.compile(r"button_(\d+)")
+HAT_PATTERN = re.compile(r"pov_(\d+)_(\w+)")
+AXIS_SLIDER_PATTERN = re.compile(r"axis_slider_(\d+)")
+AXIS_PATTERN = re.compile(r"axis_(\w+)")
+
+
+@dataclass
+class BenchmarkProfile:
+    "Stands in for the ProfileWrapper of an ExportDevice"
+
+    profile_name: str
+
+
+@dataclass
+class BenchmarkResult:
+    template: str
+    operation: str
+    runs: int
+    min_seconds: float
+    median_seconds: float
+    peak_memory_bytes: int
+
+
+def create_control(key: str) -> Button | Axis | AxisSlider | Hat | None:
+    """Converts a lower case template key into a control, returns None where the key is not a control"""
+    if match := BUTTON_PATTERN.fullmatch(key):
+        return Button(int(match[1]))
+
+    if match := HAT_PATTERN.fullmatch(key):
+        direction = HatDirection.__members__.get(match[2].upper())
+        return Hat(int(match[1]), direction) if direction else None
+
+    if match := AXIS_SLIDER_PATTERN.fullmatch(key):
+        return AxisSlider(int(match[1]))
+
+    if match := AXIS_PATTERN.fullmatch(key):
+        direction = AxisDirection.__members__.get(match[1].upper())
+        return Axis(direction) if direction else None
+
+    return None
+
+
+def create_device(template: Template, rng: random.Random) -> Device_:
+    """Creates a device binding a share of the controls found in the template, with modifiers on some"""
+    device = Device_(DEVICE_GUID, template.template_file_name)
+
+    keys = [
+        *template.get_template_buttons(),
+        *template.get_template_axis(),
+        *template.get_template_hats(),
+    ]
+
+    for key in sorted(set(keys)):
+        control = create_control(key)
+
+        if control is None or rng.random() > INPUT_DENSITY:
+            continue
+
+        device.create_input(control, f"Command for {key}")
+
+        if rng.random() < MODIFIER_DENSITY:
+            for number in range(rng.randint(1, 3)):
+                modifier = set(rng.sample(MODIFIER_KEYS, rng.randint(1, 2)))
+                device.add_modifier_to_input(
+                    control, modifier, f"Modified command {number} for {key}"
+                )
+
+    return device
+
+
+def measure(
+    template: str, operation: str, func: Callable[[], object], runs: int
+) -> BenchmarkResult:
+    """Times a number of runs of func, then measures its peak memory in a separate traced run"""
+    timings = []
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return BenchmarkResult(
+        template, operation, runs, min(timings), statistics.median(timings), peak
+    )
+
+
+def benchmark_template(
+    name: str, export_device: ExportDevice, runs: int
+) -> list[BenchmarkResult]:
+    template_data = export_device.template.raw_data
+
+    return [
+        measure(
+            name, "populate_template", lambda: populate_template(export_device), runs
+        ),
+        measure(
+            name,
+            "replace_unused_keys",
+            lambda: replace_unused_keys(template_data),
+            runs,
+        ),
+        measure(name, "check_compatibility", export_device.check_compatibility, runs),
+    ]
+
+
+def run_benchmarks(template_dir: Path, runs: int) -> list[BenchmarkResult]:
+    rng = random.Random(SEED)
+    results = []
+
+    for template_path in sorted(template_dir.rglob("*.svg")):
+        name = template_path.relative_to(template_dir).as_posix()
+        template = Template(template_path)
+        export_device = ExportDevice(
+            create_device(template, rng), template, BenchmarkProfile("Benchmark")
+        )
+
+        results.extend(benchmark_template(name, export_device, runs))
+
+        _logger.info(f"Benchmarked {name}")
+
+    return results
+
+
+def summarise(results: list[BenchmarkResult]) -> dict[str, dict[str, float]]:
+    """Totals the median time and largest peak memory of each operation across all templates"""
+    totals: dict[str, dict[str, float]] = {}
+
+    for result in results:
+        total = totals.setdefault(
+            result.operation, {"median_seconds": 0.0, "peak_memory_bytes": 0}
+        )
+        total["median_seconds"] += result.median_seconds
+        total["peak_memory_bytes"] = max(
+            total["peak_memory_bytes"], result.peak_memory_bytes
+        )
+
+    return totals
+
+
+def find_regressions(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Compares operation totals against a baseline report, returning a description of each regression"""
+    regressions = []
+
+    for operation, total in report["totals"].items():
+        previous = baseline.get("totals", {}).get(operation)
+
+        if previous is None:
+            continue
+
+        for measurement in ("median_seconds", "peak_memory_bytes"):
+            if total[measurement] > previous[measurement] * (1 + tolerance):
+                regressions.append(
+                    f"{operation} {measurement} increased from {previous[measurement]:.6g} to {total[measurement]:.6g}"
+                )
+
+    return regressions
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Benchmark exporting of the bundled templates"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=RESULTS_DIR.joinpath(f"{VERSION}.json"),
+        help="File the JSON results are written to",
+    )
+    parser.add_argument(
+        "-r", "--runs", type=int, default=5, help="Timed runs of each operation"
+    )
+    parser.add_argument(
+        "-b", "--baseline", type=Path, help="Previous results to check for regressions"
+    )
+    parser.add_argument(
+        "-t",
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed increase over the baseline before reporting a regression",
+    )
+    parser.add_argument(
+        "--templates", type=Path, default=TEMPLATE_DIR, help="Templates to benchmark"
+    )
+    return parser
+
+
+def main(args: list[str] | None = None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    arguments = create_parser().parse_args(args)
+
+    results = run_benchmarks(arguments.templates, arguments.runs)
+
+    report = {
+        "version": VERSION,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "totals": summarise(results),
+        "results": [asdict(x) for x in results],
+    }
+
+    arguments.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(arguments.output, "w", encoding=ENCODING) as f:
+        json.dump(report, f, indent=2)
+
+    for operation, total in report["totals"].items():
+        _logger.info(
+            f"{operation}: {total['median_seconds']:.4f}s total, {total['peak_memory_bytes'] / 1024:.0f}KB peak"
+        )
+
+    _logger.info(f"Results written to {arguments.output}")
+
+    if arguments.baseline is None:
+        return 0
+
+    with open(arguments.baseline, "r", encoding=ENCODING) as f:
+        baseline = json.load(f)
+
+    regressions = find_regressions(report, baseline, arguments.tolerance)
+
+    for regression in regressions:
+        _logger.error(regression)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
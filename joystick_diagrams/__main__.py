@@ -1,31 +1,27 @@
 import logging
-from logging.handlers import RotatingFileHandler
-from pathlib import Path
-
-from joystick_diagrams import app_init
-from joystick_diagrams.utils import create_directory, data_root
-
-log_path = Path.joinpath(data_root(), "logs")
-create_directory(str(log_path))
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(module)s %(filename)s - %(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(),
-        RotatingFileHandler(
-            str(Path.joinpath(log_path, "application.log")),
-            mode="a",
-            maxBytes=5 * 1000000,
-            backupCount=1,
-        ),
-    ],
-)
+import multiprocessing
+import sys
+
+from joystick_diagrams import cli
+from joystick_diagrams.utils import setup_logging
+
 _logger = logging.getLogger(__name__)
 _logger.setLevel(logging.INFO)
 
 if __name__ == "__main__":
+    # Required for export worker processes in frozen builds
+    multiprocessing.freeze_support()
+
+    # Configured here rather than at import, so worker processes importing this module do not open the log file
+    setup_logging()
+
+    if cli.is_cli_command(sys.argv[1:]):
+        sys.exit(cli.main(sys.argv[1:]))
+
     try:
+        # UI is imported only when required so headless commands do not need Qt
+        from joystick_diagrams import app_init
+
         app_init.init()
 
     except Exception as error:
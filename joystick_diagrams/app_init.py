@@ -9,6 +9,7 @@ from joystick_diagrams import utils  # type: ignore
 from joystick_diagrams.app_state import AppState
 from joystick_diagrams.db import db_handler
 from joystick_diagrams.plugins.plugin_manager import ParserPluginManager
+from joystick_diagrams.template import enable_compiled_templates
 from joystick_diagrams.ui import resources_rc
 from joystick_diagrams.ui.main_window import MainWindow
 
@@ -18,6 +19,7 @@ _logger = logging.getLogger(__name__)
 def init():
     # Setup datastore
     db_handler.init()
+    enable_compiled_templates()
     # -------------------------------
 
     # -- Initialise Plugins System --
@@ -1,10 +1,16 @@
 import logging
 
+from joystick_diagrams.db import db_profile_parents, db_profiles
+from joystick_diagrams.exceptions import ProfileInheritanceCycleError
 from joystick_diagrams.input.profile import Profile_
 from joystick_diagrams.input.profile_collection import ProfileCollection
 from joystick_diagrams.plugin_wrapper import PluginWrapper
 from joystick_diagrams.plugins.plugin_manager import ParserPluginManager
-from joystick_diagrams.profile_wrapper import ProfileWrapper
+from joystick_diagrams.profile_inheritance import (
+    InheritanceChange,
+    ProfileInheritance,
+)
+from joystick_diagrams.profile_wrapper import ProfileWrapper, get_profile_graph
 
 _logger = logging.getLogger(__name__)
 
@@ -30,9 +36,13 @@ class AppState:
 
         # Profile wrappers for use by app
         self.profile_wrappers: list[ProfileWrapper] = []
+        self.profile_wrapper_map: dict[str, ProfileWrapper] = {}
 
         self.profileParentMapping: dict[str, list[str]] = {}
         self.processedProfileObjectMapping: dict[str, Profile_] = {}
+
+        # Merged profiles, kept so only profiles affected by a change are merged again
+        self.profile_inheritance = ProfileInheritance({}, {})
         self.process_profiles_from_collections()
 
     def process_profiles_from_collections(self):
@@ -51,14 +61,67 @@ class AppState:
         self.initialise_profile_wrappers()
 
     def initialise_profile_wrappers(self):
+        """Initialises the wrappers together, storing new profiles and loading the parents of every profile in one query each"""
         _logger.debug(f"Initialising {len(self.profile_wrappers)} profile wrappers ")
 
+        db_profiles.add_profiles(list(self.profile_wrapper_map))
+        parents = db_profile_parents.get_all_profile_parents()
+
+        for wrapper in self.profile_wrappers:
+            wrapper.set_parents(
+                parents.get(wrapper.profile_key, []), self.profile_wrapper_map
+            )
+
+        self.resolve_profile_inheritance()
+
+    def resolve_profile_inheritance(self) -> InheritanceChange | None:
+        """Merges the parents of every profile wrapper into its profile
+
+        Only profiles changed since they were last merged, and the profiles inheriting from them, are merged again. Returns the inputs which may have changed, or None where every profile was merged again
+        """
+        profiles, parents = get_profile_graph(self.profile_wrappers)
+
+        try:
+            change = self.profile_inheritance.update(profiles, parents)
+        except ProfileInheritanceCycleError as e:
+            _logger.error(f"{e}, so every profile will be merged again")
+            self.profile_inheritance = ProfileInheritance(profiles, parents)
+            self.profile_inheritance.resolve_all()
+            change = None
+
+            # Parents dropped to break the cycle are not applied to the wrappers either
+            for wrapper in self.profile_wrappers:
+                wrapper.parents = [
+                    x
+                    for x in wrapper.parents
+                    if x.profile_key
+                    in self.profile_inheritance.parents[wrapper.profile_key]
+                ]
+
         for wrapper in self.profile_wrappers:
-            wrapper.initialise_wrapper()
+            wrapper.profile = self.profile_inheritance.resolve(wrapper.profile_key)
+
+        return change
+
+    def update_profile_parents(
+        self, wrapper: ProfileWrapper, parents: list[ProfileWrapper]
+    ) -> InheritanceChange:
+        """Stores the parents of a profile, merging again only the profiles affected
+
+        Raises ProfileInheritanceCycleError where the profile would inherit from itself, without storing the parents
+        """
+        profiles, graph = get_profile_graph([*self.profile_wrappers, *parents])
+        graph[wrapper.profile_key] = [x.profile_key for x in parents]
+
+        change = self.profile_inheritance.update(profiles, graph)
+        wrapper.update_parents_for_profile(parents)
+
+        return change
 
     def create_profile_wrappers(self, plugin_wrappers: list[PluginWrapper]):
         # Clear Existing Wrappers
         self.profile_wrappers.clear()
+        self.profile_wrapper_map.clear()
 
         for plugin in plugin_wrappers:
             # Get pluugins only
@@ -71,7 +134,11 @@ class AppState:
             _logger.debug(f"{len(profiles)} profiles detected for {plugin}")
 
             for profile in profiles.values():
-                self.profile_wrappers.append(ProfileWrapper(profile, plugin))
+                wrapper = ProfileWrapper(profile, plugin)
+                self.profile_wrappers.append(wrapper)
+
+                # Where profile keys clash the first wrapper is used as the parent
+                self.profile_wrapper_map.setdefault(wrapper.profile_key, wrapper)
 
             _logger.debug(
                 f"Processing profiles from plugins with {plugin} plugin collections"
@@ -0,0 +1,330 @@
+"""Headless command line interface for Joystick Diagrams.
+
+Allows diagrams to be exported without starting the UI, for use in scripts and build pipelines
+
+    python -m joystick_diagrams export --output ./diagrams --workers 4
+    python -m joystick_diagrams recommend --apply
+    python -m joystick_diagrams templates --buttons 32 --hats 2
+    python -m joystick_diagrams validate
+
+Author: Robert Cox
+"""
+
+import argparse
+import logging
+import os
+
+from joystick_diagrams.app_state import AppState
+from joystick_diagrams.db import db_handler
+from joystick_diagrams.db.db_settings import get_setting
+from joystick_diagrams.export import (
+    EXPORT_PATH_SETTING_KEY,
+    ExportOptions,
+    export_devices,
+)
+from joystick_diagrams.export_cache import get_export_cache
+from joystick_diagrams.export_render import (
+    DEFAULT_DPI,
+    EXPORT_FORMAT_SVG,
+    EXPORT_FORMATS,
+)
+from joystick_diagrams.plugins.plugin_manager import ParserPluginManager
+from joystick_diagrams.template import (
+    enable_compiled_templates,
+    enable_memory_mapped_templates,
+)
+from joystick_diagrams.template_catalogue import (
+    find_templates,
+    get_catalogued_templates,
+    get_template_directories,
+    scan_templates,
+)
+from joystick_diagrams.template_recommendation import (
+    DEFAULT_MIN_SCORE,
+    DEFAULT_RECOMMENDATIONS,
+    TemplateRecommender,
+)
+from joystick_diagrams.template_validation import ISSUE_ERROR, validate_templates
+from joystick_diagrams.ui.device_setup_controller import (
+    assign_recommended_templates,
+    get_export_devices,
+    get_unassigned_devices,
+)
+from joystick_diagrams.utils import find_template_files
+
+_logger = logging.getLogger(__name__)
+
+EXPORT_COMMAND = "export"
+RECOMMEND_COMMAND = "recommend"
+TEMPLATES_COMMAND = "templates"
+VALIDATE_COMMAND = "validate"
+CLI_COMMANDS = (EXPORT_COMMAND, RECOMMEND_COMMAND, TEMPLATES_COMMAND, VALIDATE_COMMAND)
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="joystick_diagrams",
+        description="Joystick Diagrams, runs the UI when no command is supplied",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser(
+        EXPORT_COMMAND,
+        help="Export every device with a stored template for all enabled plugins",
+    )
+    export_parser.add_argument(
+        "-o",
+        "--output",
+        help="Directory to export diagrams to, defaults to the export location set in the UI",
+    )
+    export_parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes used to export diagrams",
+    )
+    export_parser.add_argument(
+        "-f",
+        "--force",
+        action="store_true",
+        help="Export all diagrams, including those unchanged since the last export",
+    )
+    export_parser.add_argument(
+        "--format",
+        dest="formats",
+        action="append",
+        choices=EXPORT_FORMATS,
+        help="Format to export, may be repeated. SVG diagrams are always exported",
+    )
+    export_parser.add_argument(
+        "--dpi",
+        type=int,
+        default=DEFAULT_DPI,
+        help="Resolution of PNG and PDF exports",
+    )
+
+    recommend_parser = commands.add_parser(
+        RECOMMEND_COMMAND,
+        help="Recommend bundled templates for devices which do not have a template",
+    )
+    recommend_parser.add_argument(
+        "-a",
+        "--apply",
+        action="store_true",
+        help="Store the best recommended template for each device",
+    )
+    recommend_parser.add_argument(
+        "--min-score",
+        type=float,
+        default=DEFAULT_MIN_SCORE,
+        help="Lowest score of a recommendation which is applied",
+    )
+    recommend_parser.add_argument(
+        "-n",
+        "--limit",
+        type=int,
+        default=DEFAULT_RECOMMENDATIONS,
+        help="Number of recommendations listed for each device",
+    )
+
+    templates_parser = commands.add_parser(
+        TEMPLATES_COMMAND,
+        help="List the catalogued templates, updating the catalogue for changed templates",
+    )
+    for control in ("buttons", "axis", "hats", "modifiers"):
+        templates_parser.add_argument(
+            f"--{control}",
+            type=int,
+            default=0,
+            help=f"Only list templates with at least this many {control}",
+        )
+
+    validate_parser = commands.add_parser(
+        VALIDATE_COMMAND,
+        help="Check templates for problems, all template directories are checked when no templates are supplied",
+    )
+    validate_parser.add_argument("templates", nargs="*", help="Templates to check")
+    validate_parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes used to check templates",
+    )
+
+    return parser
+
+
+def is_cli_command(args: list[str]) -> bool:
+    """Checks if the supplied arguments request a headless command"""
+    return bool(args) and args[0] in CLI_COMMANDS
+
+
+def main(args: list[str]) -> int:
+    """Runs a headless command, returning the process exit code"""
+    arguments = create_parser().parse_args(args)
+
+    if arguments.command == EXPORT_COMMAND:
+        return run_export(
+            arguments.output,
+            ExportOptions(
+                workers=arguments.workers,
+                incremental=not arguments.force,
+                formats=tuple(arguments.formats or [EXPORT_FORMAT_SVG]),
+                dpi=arguments.dpi,
+            ),
+        )
+
+    if arguments.command == RECOMMEND_COMMAND:
+        return run_recommend(
+            apply=arguments.apply, min_score=arguments.min_score, limit=arguments.limit
+        )
+
+    if arguments.command == TEMPLATES_COMMAND:
+        return run_templates(
+            arguments.buttons, arguments.axis, arguments.hats, arguments.modifiers
+        )
+
+    if arguments.command == VALIDATE_COMMAND:
+        return run_validate(arguments.templates, arguments.workers)
+
+    return 1
+
+
+def run_export(output_directory: str | None, options: ExportOptions) -> int:
+    """Processes all enabled plugins and exports every device which has a template"""
+    db_handler.init()
+    enable_compiled_templates()
+    enable_memory_mapped_templates()
+
+    output_directory = output_directory or get_setting(EXPORT_PATH_SETTING_KEY)
+
+    if not output_directory:
+        _logger.error(
+            "No export location was supplied with --output and none has been set in the UI"
+        )
+        return 1
+
+    initialise_plugins()
+
+    devices = [x for x in get_export_devices() if x.has_template]
+
+    _logger.info(f"Exporting {len(devices)} devices to {output_directory}")
+
+    export_cache = get_export_cache()
+    summary = export_devices(
+        devices,
+        output_directory,
+        options,
+        progress=lambda completed, total: _logger.info(f"Exported {completed}/{total}"),
+        cache=export_cache,
+    )
+
+    _logger.debug(f"Export cache state {export_cache}")
+
+    _logger.info(
+        f"{summary.written} devices were exported ({summary.cached} from cache), {summary.skipped} were unchanged and {summary.failed} failed"
+    )
+
+    if summary.render_failed:
+        _logger.error(f"{summary.render_failed} exports failed to render")
+
+    return 1 if summary.failed or summary.render_failed else 0
+
+
+def run_recommend(
+    *,
+    apply: bool = False,
+    min_score: float = DEFAULT_MIN_SCORE,
+    limit: int = DEFAULT_RECOMMENDATIONS,
+) -> int:
+    """Lists recommended templates for each device without a template, storing the best where apply is set"""
+    db_handler.init()
+    enable_compiled_templates()
+
+    initialise_plugins()
+
+    devices = get_unassigned_devices(get_export_devices())
+
+    if not devices:
+        _logger.info("Every device has a template")
+        return 0
+
+    scan_templates()
+    recommender = TemplateRecommender.from_catalogue(get_catalogued_templates())
+    recommendations = recommender.recommend(devices, limit)
+
+    device_names = {x.guid: x.name for x in devices}
+
+    for guid, device_recommendations in recommendations.items():
+        _logger.info(f"{device_names[guid]} ({guid})")
+
+        for recommendation in device_recommendations:
+            _logger.info(
+                f"    {recommendation.score:.2f} {recommendation.template_path} missing {len(recommendation.missing)} controls"
+            )
+
+    if apply:
+        assigned = assign_recommended_templates(devices, recommender, min_score)
+        _logger.info(
+            f"Templates were stored for {len(assigned)} of {len(recommendations)} devices"
+        )
+
+    return 0
+
+
+def run_templates(buttons: int, axis: int, hats: int, modifiers: int) -> int:
+    """Lists the catalogued templates with at least the given controls"""
+    db_handler.init()
+
+    scan = scan_templates()
+    templates = find_templates(buttons, axis, hats, modifiers)
+
+    for entry in templates:
+        _logger.info(
+            f"{entry.path} has {entry.buttons} buttons, {entry.axis} axis, {entry.hats} hats and {entry.modifiers} modifiers"
+        )
+
+    _logger.info(f"{len(templates)} templates matched")
+
+    return 1 if scan.failed else 0
+
+
+def run_validate(templates: list[str], workers: int) -> int:
+    """Checks templates for problems, returning 1 where any template has errors"""
+    db_handler.init()
+
+    paths = templates or [
+        x
+        for directory in get_template_directories()
+        for x in find_template_files(directory)
+    ]
+    results = validate_templates(paths, workers)
+
+    for result in results:
+        for issue in result.issues:
+            log = _logger.error if issue.severity == ISSUE_ERROR else _logger.warning
+            log(f"{result.path}: {issue}")
+
+    invalid = [x for x in results if not x.valid]
+
+    _logger.info(f"{len(results)} templates checked, {len(invalid)} have errors")
+
+    return 1 if invalid or len(results) < len(paths) else 0
+
+
+def initialise_plugins() -> AppState:
+    """Loads and runs the enabled plugins, creating the global state from their profiles"""
+    plugins = ParserPluginManager()
+    plugins.load_discovered_plugins()
+    plugins.create_plugin_wrappers()
+
+    for plugin_wrapper in plugins.get_enabled_plugin_wrappers():
+        plugins.execute_plugin_wrapper_process(plugin_wrapper)
+
+    return AppState(plugin_manager=plugins)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,105 @@
+"""Compatibility of many devices with many templates, computed together.
+
+Every control found on the devices and templates is numbered in a shared vocabulary, so the controls of each device and template are held as an integer bitset. The controls of a device missing from a template are then found by a single bitwise operation per pair, rather than by building and differencing sets of strings.
+"""
+
+import logging
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+
+from joystick_diagrams.input.device import Device_
+from joystick_diagrams.template import Template
+
+_logger = logging.getLogger(__name__)
+
+
+def get_device_controls(device_obj: Device_) -> frozenset[str]:
+    """Returns the lower cased identifiers of the controls used by a device, as they appear in templates"""
+    return frozenset(x.lower() for x in device_obj.get_identifiers())
+
+
+def get_template_controls(template: Template) -> set[str]:
+    """Returns the identifiers of the controls a template has placeholders for"""
+    return (
+        template.get_template_buttons()
+        | template.get_template_hats()
+        | template.get_template_axis()
+    )
+
+
+@dataclass
+class ControlVocabulary:
+    "Numbers controls so a set of controls can be held as the bits of an integer"
+
+    controls: list[str] = field(default_factory=list)
+    _bits: dict[str, int] = field(default_factory=dict, repr=False)
+
+    def encode(self, controls: Iterable[str]) -> int:
+        bitset = 0
+
+        for control in controls:
+            bit = self._bits.get(control)
+
+            if bit is None:
+                bit = self._bits[control] = len(self.controls)
+                self.controls.append(control)
+
+            bitset |= 1 << bit
+
+        return bitset
+
+    def decode(self, bitset: int) -> set[str]:
+        controls = set()
+
+        while bitset:
+            lowest = bitset & -bitset
+            controls.add(self.controls[lowest.bit_length() - 1])
+            bitset ^= lowest
+
+        return controls
+
+
+@dataclass(frozen=True)
+class CompatibilityMatrix:
+    """Controls of each device missing from each template, as bitsets indexed [device][template]"""
+
+    vocabulary: ControlVocabulary
+    missing: tuple[tuple[int, ...], ...]
+
+    def missing_controls(self, device_index: int, template_index: int) -> set[str]:
+        return self.vocabulary.decode(self.missing[device_index][template_index])
+
+    def missing_counts(self) -> list[list[int]]:
+        return [[x.bit_count() for x in row] for row in self.missing]
+
+
+def create_compatibility_matrix(
+    devices: Sequence[Device_ | frozenset[str]],
+    templates: Sequence[Template | set[str] | frozenset[str]],
+) -> CompatibilityMatrix:
+    """Computes the controls of every device missing from every template
+
+    Devices and templates may be given as their sets of controls, where these are already known
+    """
+    vocabulary = ControlVocabulary()
+
+    device_bits = [
+        vocabulary.encode(x if isinstance(x, frozenset) else get_device_controls(x))
+        for x in devices
+    ]
+    # Inverted, so that a device's missing controls are those it shares with the inverse of the template
+    template_inverse = [
+        ~vocabulary.encode(
+            x if isinstance(x, (set, frozenset)) else get_template_controls(x)
+        )
+        for x in templates
+    ]
+
+    return CompatibilityMatrix(
+        vocabulary,
+        tuple(tuple(x & y for y in template_inverse) for x in device_bits),
+    )
+
+
+if __name__ == "__main__":
+    pass
@@ -13,6 +13,8 @@ from joystick_diagrams.db import (
     db_profile_parents,
     db_profiles,
     db_settings,
+    db_template_catalogue,
+    db_template_validation,
 )
 
 _logger = logging.getLogger(__name__)
@@ -28,6 +30,8 @@ def init() -> None:
     db_settings.create_new_db_if_not_exist()
     db_profiles.create_new_db_if_not_exist()
     db_profile_parents.create_new_db_if_not_exist()
+    db_template_catalogue.create_new_db_if_not_exist()
+    db_template_validation.create_new_db_if_not_exist()
 
 
 if __name__ == "__main__":
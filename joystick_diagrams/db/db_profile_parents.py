@@ -57,6 +57,22 @@ def add_parents_to_profile(profile_key: str, parents: list):
     con.commit()
 
 
+def get_all_profile_parents() -> dict[str, list[str]]:
+    """Returns the parent keys of every profile with parents, in order"""
+    con = connection()
+    cur = con.cursor()
+
+    query = f"SELECT profile_key, parent_profile_key from {TABLE_NAME} ORDER BY profile_key, ordering asc"
+    cur.execute(query)
+
+    parents: dict[str, list[str]] = {}
+
+    for profile_key, parent_profile_key in cur.fetchall():
+        parents.setdefault(profile_key, []).append(parent_profile_key)
+
+    return parents
+
+
 if __name__ == "__main__":
     create_new_db_if_not_exist()
 
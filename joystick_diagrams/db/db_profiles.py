@@ -45,6 +45,17 @@ def add_profile(profile_key: str) -> list[str]:
     return result[0]
 
 
+def add_profiles(profile_keys: list[str]):
+    """Adds the profiles which do not exist in one transaction"""
+    con = connection()
+    cur = con.cursor()
+
+    query = "INSERT OR IGNORE INTO profiles (profile_key) VALUES(?)"
+    cur.executemany(query, [(x,) for x in profile_keys])
+
+    con.commit()
+
+
 def get_profile_parents(profile_key: str):
     con = connection()
     cur = con.cursor()
@@ -0,0 +1,104 @@
+from joystick_diagrams.db.db_connection import connection
+
+TABLE_NAME = "template_catalogue"
+COLUMNS = (
+    "path",
+    "directory",
+    "hash",
+    "size",
+    "modified",
+    "buttons",
+    "axis",
+    "hats",
+    "modifiers",
+    "controls",
+)
+
+
+def create_new_db_if_not_exist():
+    con = connection()
+    cur = con.cursor()
+    cur.execute(
+        f"""CREATE TABLE IF NOT EXISTS {TABLE_NAME}(
+            path TEXT PRIMARY KEY,
+            directory TEXT NOT NULL,
+            hash TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            modified INTEGER NOT NULL,
+            buttons INTEGER NOT NULL,
+            axis INTEGER NOT NULL,
+            hats INTEGER NOT NULL,
+            modifiers INTEGER NOT NULL,
+            controls TEXT NOT NULL
+        )"""
+    )
+    cur.execute(
+        f"CREATE INDEX IF NOT EXISTS {TABLE_NAME}_counts ON {TABLE_NAME}(buttons, axis, hats, modifiers)"
+    )
+    con.commit()
+
+
+def get_catalogue_entries(directory: str | None = None) -> list[tuple]:
+    con = connection()
+    cur = con.cursor()
+
+    if directory is None:
+        cur.execute(f"SELECT {', '.join(COLUMNS)} from {TABLE_NAME} ORDER BY path")
+    else:
+        cur.execute(
+            f"SELECT {', '.join(COLUMNS)} from {TABLE_NAME} WHERE directory = ? ORDER BY path",
+            (directory,),
+        )
+
+    return cur.fetchall()
+
+
+def get_catalogue_entries_by_path(paths: list[str]) -> list[tuple]:
+    con = connection()
+    cur = con.cursor()
+    entries = []
+
+    # Queried in batches to stay within the SQLite parameter limit
+    for start in range(0, len(paths), 500):
+        batch = paths[start : start + 500]
+        query = f"SELECT {', '.join(COLUMNS)} from {TABLE_NAME} WHERE path IN ({', '.join('?' * len(batch))})"
+        cur.execute(query, batch)
+        entries.extend(cur.fetchall())
+
+    return entries
+
+
+def add_update_catalogue_entries(entries: list[tuple]):
+    con = connection()
+    cur = con.cursor()
+
+    query = f"INSERT OR REPLACE INTO {TABLE_NAME} ({', '.join(COLUMNS)}) VALUES({', '.join('?' * len(COLUMNS))})"
+    cur.executemany(query, entries)
+    con.commit()
+
+
+def remove_catalogue_entries(paths: list[str]):
+    con = connection()
+    cur = con.cursor()
+    cur.executemany(f"DELETE FROM {TABLE_NAME} WHERE path = ?", [(x,) for x in paths])
+    con.commit()
+
+
+def find_catalogue_entries(
+    min_buttons: int = 0, min_axis: int = 0, min_hats: int = 0, min_modifiers: int = 0
+) -> list[tuple]:
+    con = connection()
+    cur = con.cursor()
+
+    query = f"""SELECT {", ".join(COLUMNS)} from {TABLE_NAME}
+    WHERE buttons >= ? AND axis >= ? AND hats >= ? AND modifiers >= ?"""
+    params = (min_buttons, min_axis, min_hats, min_modifiers)
+
+    cur.execute(query, params)
+
+    # Sorted by path here, as ordering in the query leads SQLite to scan the primary key rather than search the counts index
+    return sorted(cur.fetchall())
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,41 @@
+from joystick_diagrams.db.db_connection import connection
+
+TABLE_NAME = "template_validation"
+
+
+def create_new_db_if_not_exist():
+    con = connection()
+    cur = con.cursor()
+    cur.execute(
+        f"CREATE TABLE IF NOT EXISTS {TABLE_NAME}(hash TEXT PRIMARY KEY, version INTEGER NOT NULL, issues TEXT NOT NULL)"
+    )
+    con.commit()
+
+
+def get_validation_results(hashes: list[str], version: int) -> dict[str, str]:
+    """Returns the stored issues by hash, for results from the given validator version"""
+    con = connection()
+    cur = con.cursor()
+    results = {}
+
+    # Queried in batches to stay within the SQLite parameter limit
+    for start in range(0, len(hashes), 500):
+        batch = hashes[start : start + 500]
+        query = f"SELECT hash, issues from {TABLE_NAME} WHERE version = ? AND hash IN ({', '.join('?' * len(batch))})"
+        cur.execute(query, (version, *batch))
+        results.update(cur.fetchall())
+
+    return results
+
+
+def add_update_validation_results(results: list[tuple[str, int, str]]):
+    con = connection()
+    cur = con.cursor()
+
+    query = f"INSERT OR REPLACE INTO {TABLE_NAME} (hash, version, issues) VALUES(?,?,?)"
+    cur.executemany(query, results)
+    con.commit()
+
+
+if __name__ == "__main__":
+    pass
@@ -49,3 +49,17 @@ class NoPluginsExistError(JoystickDiagramsError):
 
     def __str__(self) -> str:
         return repr("No plugins were found in plugins directory")
+
+
+# -----------------------------------------------------------------------------
+# Profile Exceptions
+# -----------------------------------------------------------------------------
+
+
+class ProfileInheritanceCycleError(JoystickDiagramsError):
+    def __init__(self, value: list[str]) -> None:
+        super().__init__(" > ".join(value))
+        self.cycle = value
+
+    def __str__(self) -> str:
+        return repr(f"Profiles inherit from each other: {self.value}")
@@ -5,85 +5,464 @@ Supplied <DeviceMapping> and list[Profile]
 Author: Robert Cox
 """
 
+import atexit
+import json
 import logging
 import re
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
 from datetime import datetime
+from hashlib import sha256
 from pathlib import Path
 from xml.sax.saxutils import escape, unescape
 
-from joystick_diagrams import utils
+from joystick_diagrams import template_engine, utils
+from joystick_diagrams.exceptions import JoystickDiagramsError
+from joystick_diagrams.export_cache import ExportCache, get_export_cache
 from joystick_diagrams.export_device import ExportDevice
+from joystick_diagrams.export_manifest import ExportManifest
+from joystick_diagrams.export_render import (
+    DEFAULT_DPI,
+    EXPORT_FORMAT_SVG,
+    get_render_formats,
+    get_render_pool,
+    render_exports,
+)
+from joystick_diagrams.input.device import Device_
 from joystick_diagrams.input.modifier import Modifier
-from joystick_diagrams.template import Template
+from joystick_diagrams.template import (
+    Template,
+    configure_template_cache,
+    get_template,
+    get_template_cache_settings,
+)
+from joystick_diagrams.worker_pool import WorkerPool
 
 _logger = logging.getLogger(__name__)
 
 TEMPLATE_NAMING_KEY = "TEMPLATE_NAME"
 TEMPLATE_DATING_KEY = "CURRENT_DATE"
 
+# Stored settings for exports
+EXPORT_PATH_SETTING_KEY = "export_path"
+EXPORT_WORKERS_SETTING_KEY = "export_workers"
+EXPORT_FORMAT_SETTING_KEY = "export_format"
+EXPORT_DPI_SETTING_KEY = "export_dpi"
+
+# Keys cleared from the template when no value is available
+UNUSED_KEYS = [Template.BUTTON_KEY, Template.AXIS_KEY, Template.HAT_KEY]
+UNUSED_KEYS.extend(Template.MODIFIER_KEYS)
+
+
+@dataclass(frozen=True)
+class ExportJob:
+    """Compact picklable description of an ExportDevice export, used to hand work to worker processes"""
+
+    template_path: str
+    file_name: str
+    export_location: Path
+    substitutions: dict[str, str]
+
+
+@dataclass(frozen=True)
+class ExportOptions:
+    """How devices are exported, shared by every device of an export"""
+
+    workers: int = 1  # Worker processes used to export and render
+    incremental: bool = True  # Skip devices unchanged since they were last exported
+    formats: tuple[str, ...] = (EXPORT_FORMAT_SVG,)
+    dpi: int = DEFAULT_DPI  # Resolution of formats rendered from the SVG
+
+
+@dataclass
+class ExportSummary:
+    written: int = 0
+    skipped: int = 0
+    failed: int = 0
+    cached: int = 0  # Written from the export cache rather than rendered
+    render_failed: int = 0  # Exports which could not be rendered to other formats
+
+
+@dataclass
+class ExportProgress:
+    """Reports (completed, total) to an optional callback as the steps of an export complete"""
+
+    total: int
+    callback: Callable[[int, int], None] | None = None
+    completed: int = 0
+
+    def report(self, completed: int) -> None:
+        self.completed = completed
+
+        if self.callback:
+            self.callback(completed, self.total)
+
 
 def export(export_device: ExportDevice, output_directory: str):
     try:
-        export_device_to_templates(export_device, Path(output_directory))
+        export_device_to_templates(
+            export_device, Path(output_directory), cache=get_export_cache()
+        )
 
     except Exception as e:
         _logger.debug(e)
 
 
-def export_device_to_templates(export_device: ExportDevice, export_location: Path):
-    """Handles the manipulation of the template."""
+def export_devices(
+    devices: list[ExportDevice],
+    output_directory: str,
+    options: ExportOptions | None = None,
+    *,
+    progress: Callable[[int, int], None] | None = None,
+    cache: ExportCache | None = None,
+) -> ExportSummary:
+    """Exports a list of ExportDevices, in the shared pool of export workers where more than one worker is requested
+
+    When incremental, devices unchanged since they were last exported to the location are skipped
+
+    Where a cache is supplied, previously rendered diagrams are restored from it and new renders are added to it
+
+    SVG diagrams are always exported, and then rendered to any other requested formats by the shared render pool
+
+    Progress is reported as (completed, total) after each device is exported, and again after each is rendered where other formats are requested
+    """
+    options = options or ExportOptions()
+    export_location = Path(output_directory)
+    manifest = ExportManifest(export_location)
+    summary = ExportSummary()
+    # Devices are counted once when exported, and again when rendered to other formats
+    stages = 2 if get_render_formats(options.formats) else 1
+    export_progress = ExportProgress(len(devices) * stages, progress)
+    jobs = []
+    entries = []
+    exported_files = []
+
+    def complete(file_name: str | None = None):
+        if file_name:
+            exported_files.append(export_location.joinpath(file_name))
+
+        export_progress.report(export_progress.completed + 1)
+
+    for export_device in devices:
+        job = create_export_job(export_device, export_location)
+
+        if job is None:
+            _logger.error(
+                f"There was an issue getting data for the current template: {export_device}"
+            )
+            summary.failed += 1
+            complete()
+            continue
+
+        entry = create_manifest_entry(export_device)
+
+        if options.incremental and manifest.is_unchanged(job.file_name, entry):
+            _logger.debug(f"Skipping unchanged export {job.file_name}")
+            summary.skipped += 1
+            complete(job.file_name)
+            continue
+
+        if restore_cached_export(cache, entry, export_location, job.file_name):
+            manifest.update(job.file_name, entry)
+            summary.written += 1
+            summary.cached += 1
+            complete(job.file_name)
+            continue
+
+        jobs.append(job)
+        entries.append(entry)
+
+    results = get_export_pool(options.workers).export(jobs)
+
+    for result, job, entry in zip(results, jobs, entries, strict=True):
+        if result:
+            manifest.update(job.file_name, entry)
+            store_cached_export(cache, entry, export_location, job.file_name)
+            summary.written += 1
+            complete(job.file_name)
+        else:
+            summary.failed += 1
+            complete()
+
+    # Devices which failed to export have nothing to render
+    rendered = len(devices) * stages - len(exported_files)
+
+    summary.render_failed = render_exports(
+        exported_files,
+        options.formats,
+        options.dpi,
+        pool=get_render_pool(options.workers),
+        manifest=manifest,
+        incremental=options.incremental,
+        progress=lambda count, _: export_progress.report(rendered + count),
+    )
+
+    manifest.save()
+
+    _logger.info(
+        f"Export completed with {summary.written} written ({summary.cached} from cache), {summary.skipped} unchanged, {summary.failed} failed and {summary.render_failed} failed to render"
+    )
+
+    return summary
+
+
+def create_export_job(
+    export_device: ExportDevice, export_location: Path
+) -> ExportJob | None:
+    """Packages the data required to export an ExportDevice, returns None where no template is set or it cannot be loaded"""
+    if export_device.template is None:
+        return None
+
+    if not export_device.template.loaded:
+        try:
+            export_device.template.load()
+        except JoystickDiagramsError:
+            return None
+
+    return ExportJob(
+        str(export_device.template.template_path),
+        get_export_file_name(export_device),
+        export_location,
+        build_substitutions(export_device),
+    )
+
+
+class ExportPool(WorkerPool):
+    """Pool of export worker processes, which each keep their template cache between exports"""
+
+    def __init__(self, workers: int = 1):
+        super().__init__(
+            workers, initialise_export_worker, get_template_cache_settings()
+        )
+
+    def export(self, jobs: list[ExportJob]) -> Iterator[bool]:
+        """Runs ExportJobs, in the worker processes where there is more than one worker and job, yielding each result in order"""
+        if self.workers > 1 and len(jobs) > 1:
+            return self.imap(run_export_job, jobs)
+
+        return map(run_export_job, jobs)
+
+
+_export_pool: ExportPool | None = None
+
+
+def get_export_pool(workers: int = 1) -> ExportPool:
+    """Returns the export pool shared by exports, replaced where a different number of workers or template cache is requested"""
+    global _export_pool  # noqa: PLW0603
+
+    if (
+        _export_pool is None
+        or _export_pool.workers != workers
+        or _export_pool.initargs != get_template_cache_settings()
+    ):
+        close_export_pool()
+        _export_pool = ExportPool(workers)
+
+    return _export_pool
+
+
+@atexit.register
+def close_export_pool() -> None:
+    global _export_pool  # noqa: PLW0603
+
+    if _export_pool is not None:
+        _export_pool.close()
+        _export_pool = None
+
+
+def initialise_export_worker(
+    compiled_templates_directory: Path | None, memory_map_min_bytes: int | None
+):
+    """Configures logging and the template cache of an export worker process"""
+    utils.setup_worker_logging()
+    configure_template_cache(compiled_templates_directory, memory_map_min_bytes)
+
+
+def run_export_job(job: ExportJob) -> bool:
+    """Renders and saves an ExportJob, safe to be run in a worker process
+
+    Returns True where the export was written
+    """
+    try:
+        template = get_template(job.template_path)
+        save_template(
+            template.segments.iter_render(job.substitutions),
+            job.file_name,
+            job.export_location,
+        )
+        return True
+
+    except Exception as e:
+        _logger.error(f"Failed to export {job.file_name}: {e}")
+        return False
+
+
+def export_device_to_templates(
+    export_device: ExportDevice,
+    export_location: Path,
+    manifest: ExportManifest | None = None,
+    cache: ExportCache | None = None,
+) -> bool:
+    """Handles the manipulation of the template.
+
+    Returns False where the export was skipped as unchanged since last exported
+    """
 
     if export_device.template is None:
         _logger.error(
             f"There was an issue getting data for the current template: {export_device}"
         )
+        return False
+
+    export_manifest = manifest or ExportManifest(export_location)
+    file_name = get_export_file_name(export_device)
+    entry = create_manifest_entry(export_device)
+
+    if export_manifest.is_unchanged(file_name, entry):
+        _logger.debug(f"Skipping unchanged export {file_name}")
+        return False
+
+    if not restore_cached_export(cache, entry, export_location, file_name):
+        # Replace strings in the template data with device data, streamed to the file as resolved
+        save_template(stream_template(export_device), file_name, export_location)
+        store_cached_export(cache, entry, export_location, file_name)
+
+    export_manifest.update(file_name, entry)
+
+    if manifest is None:
+        export_manifest.save()
+
+    return True
+
+
+def create_manifest_entry(export_device: ExportDevice) -> dict[str, str | None]:
+    """Describes the data an export is created from, used to detect unchanged exports"""
+    return {
+        "inputs": hash_device_inputs(export_device.device),
+        "template": export_device.template.content_hash,
+        "profile": export_device.profile_wrapper.profile_name,
+        # Templates showing the date must be refreshed each day
+        "date": datetime.now().strftime("%d/%m/%Y")
+        if export_device.template.date
+        else None,
+    }
+
+
+def create_fingerprint(entry: dict[str, str | None]) -> str:
+    """Returns a fingerprint identifying the rendered output of a manifest entry"""
+    return sha256(json.dumps(entry, sort_keys=True).encode()).hexdigest()
+
+
+def restore_cached_export(
+    cache: ExportCache | None, entry: dict, export_location: Path, file_name: str
+) -> bool:
+    """Restores a previously rendered export from the cache, returns True where it was restored"""
+    if cache is None:
+        return False
+
+    return cache.restore(create_fingerprint(entry), export_location.joinpath(file_name))
+
+
+def store_cached_export(
+    cache: ExportCache | None, entry: dict, export_location: Path, file_name: str
+) -> None:
+    if cache is None:
         return
 
-    # Replace strings in the template data with device data
-    result = populate_template(export_device)
+    cache.store(create_fingerprint(entry), export_location.joinpath(file_name))
+
+
+def hash_device_inputs(device: Device_) -> str:
+    """Returns a SHA256 hash of the content of a device's combined inputs and their modifiers"""
+    inputs_hash = sha256()
+
+    for input_key, input_object in sorted(device.get_combined_inputs().items()):
+        inputs_hash.update(f"{input_key}\0{input_object.command}\0".encode())
+
+        for modifier in input_object.modifiers:
+            inputs_hash.update(
+                f"{sorted(modifier.modifiers)}\0{modifier.command}\0".encode()
+            )
+
+        inputs_hash.update(b"\1")
 
+    return inputs_hash.hexdigest()
+
+
+def get_export_file_name(export_device: ExportDevice) -> str:
     # TODO handle duplicate file names due to device name clashes
-    file_name = f"{export_device.device_id[:5]}-{export_device.device.name}-{export_device.profile_wrapper.profile_name}.svg"
-    save_template(result, file_name, export_location)
+    return f"{export_device.device_id[:5]}-{export_device.device.name}-{export_device.profile_wrapper.profile_name}.svg"
 
 
-def save_template(template_data, file_name, export_path):
+def save_template(template_data: str | Iterable[str], file_name, export_path):
+    """Writes template data to the export path, accepting either a string or an iterable of string segments
+
+    Segments are written as they are produced so the full document is never held in memory. Data is written to a temporary file first, so an existing export is only replaced once complete
+    """
     utils.create_directory(export_path)
 
-    with open(export_path.joinpath(file_name), "w", encoding="UTF-8") as f:
-        f.write(template_data)
+    file_path = export_path.joinpath(file_name)
+    temp_path = file_path.with_name(f"{file_name}.tmp")
+
+    try:
+        with open(temp_path, "w", encoding="UTF-8") as f:
+            if isinstance(template_data, str):
+                f.write(template_data)
+            else:
+                f.writelines(template_data)
+
+        temp_path.replace(file_path)
+    finally:
+        temp_path.unlink(missing_ok=True)
 
 
 def populate_template(export_device: ExportDevice) -> str:
     """Manipulates template_data to replace known keys with data from Device_"""
-    modified_template_data = export_device.template.raw_data
+    return "".join(stream_template(export_device))
+
+
+def stream_template(export_device: ExportDevice) -> Iterator[str]:
+    """Yields the template in segments with known keys replaced with data from Device_"""
+    return export_device.template.segments.iter_render(
+        build_substitutions(export_device)
+    )
+
+
+def build_substitutions(export_device: ExportDevice) -> dict[str, str]:
+    """Builds the lower cased KEY to replacement mapping for a given ExportDevice
+
+    Mirrors the replace_* functions, where a key is produced more than once the first value is used
+    """
+    substitutions: dict[str, str] = {}
+
+    def add(key: str, value: str):
+        substitutions.setdefault(key.lower(), value)
 
     for input_key, input_object in export_device.device.get_combined_inputs().items():
-        modified_template_data = replace_input_string(
-            input_key,
-            sanitize_string_for_svg(input_object.command),
-            modified_template_data,
-        )
+        add(input_key, sanitize_string_for_svg(input_object.command))
 
         if input_object.modifiers:
-            modified_template_data = replace_input_modifiers_string(
-                input_key, input_object.modifiers, modified_template_data
+            add(
+                f"{input_key}_Modifiers",
+                create_modifiers_string(input_object.modifiers),
             )
 
             for modifier_number, modifier in enumerate(input_object.modifiers, 1):
-                modified_template_data = replace_input_modifier_id_key(
-                    input_key, modifier_number, modifier, modified_template_data
-                )
+                key = f"{input_key}_Modifier_{modifier_number}"
 
-    modified_template_data = replace_template_name_string(
-        export_device.profile_wrapper.profile_name, modified_template_data
-    )
-
-    modified_template_data = replace_template_date_string(modified_template_data)
+                add(
+                    key,
+                    sanitize_string_for_svg(
+                        f"{modifier.modifiers} - {modifier.command}"
+                    ),
+                )
+                add(f"{key}_Key", sanitize_string_for_svg(f"{modifier.modifiers}"))
+                add(f"{key}_Action", sanitize_string_for_svg(f"{modifier.command}"))
 
-    modified_template_data = replace_unused_keys(modified_template_data)
+    add(TEMPLATE_NAMING_KEY, export_device.profile_wrapper.profile_name)
+    add(TEMPLATE_DATING_KEY, datetime.now().strftime("%d/%m/%Y"))
 
-    return modified_template_data
+    return substitutions
 
 
 def sanitize_string_for_svg(value_to_sanitize: str) -> str:
@@ -97,17 +476,13 @@ def replace_input_modifiers_string(
     """Replaces the INPUT_KEY_MODIFIERS key with combined modifiers from input"""
     search = re.compile(rf"\b{input_key}_Modifiers\b", re.IGNORECASE)
 
-    # Create Modifier Strings
-    mod_string = ""
-    total_modifiers = len(modifiers)
-    for modifier_index, modifier in enumerate(modifiers, 1):
-        mod_string = mod_string + sanitize_string_for_svg(str(modifier))
+    return re.sub(search, create_modifiers_string(modifiers), data)
 
-        # Due to way SVG handles new lines, this is a compromise for modifiers to be joined and look reasonable
-        if modifier_index != total_modifiers:
-            mod_string = mod_string + " | "
 
-    return re.sub(search, mod_string, data)
+def create_modifiers_string(modifiers: Iterable[Modifier]) -> str:
+    """Joins all modifiers of an input into a single string for display"""
+    # Due to way SVG handles new lines, this is a compromise for modifiers to be joined and look reasonable
+    return " | ".join(sanitize_string_for_svg(str(modifier)) for modifier in modifiers)
 
 
 def replace_input_modifier_id_key(
@@ -147,25 +522,11 @@ def replace_input_string(search_key: str, replacement: str, data: str) -> str:
 
 
 def replace_unused_keys(data: str) -> str:
-    """Replaces all unused keys in the template with default values"""
-    search_keys = [Template.BUTTON_KEY, Template.AXIS_KEY, Template.HAT_KEY]
-    search_keys.extend(Template.MODIFIER_KEYS)
+    """Replaces all unused keys in the template with default values
 
-    def find_keys(search_keys: list[re.Pattern]) -> set[str]:
-        found_keys = set()
-        for key in search_keys:
-            result = re.findall(key, data)
-            found_keys.update(set(result))
-        return found_keys
-
-    aggregated_keys = find_keys(search_keys)
-
-    # Best effort fix to gain performance, word boundaries required to prevent partial replacement depending on ordering of keys
-    joined_keys = "|".join({rf"\b{x}\b" for x in aggregated_keys})
-
-    data = re.sub(joined_keys, "", data, flags=re.IGNORECASE)
-
-    return data
+    Keys are found and removed in a single scan, so cost is linear in the size of the data regardless of the number of keys
+    """
+    return template_engine.blank_placeholders(data, UNUSED_KEYS)
 
 
 def replace_template_date_string(data: str) -> str:
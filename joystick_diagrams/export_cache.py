@@ -0,0 +1,161 @@
+"""Cache of rendered diagrams, allowing exports created from the same data to be reused rather than rendered again.
+
+Rendered files are stored in the user data directory named by their fingerprint, and the least recently used files are removed once the cache exceeds its size limit. The directory is read once, after which the size and order of use of the files are tracked in memory.
+"""
+
+import logging
+import os
+import shutil
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from joystick_diagrams import utils
+
+_logger = logging.getLogger(__name__)
+
+EXPORT_CACHE_DIR = "export_cache"
+EXPORT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+EXPORT_CACHE_SUFFIX = ".svg"
+
+
+@dataclass
+class ExportCacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+
+class ExportCache:
+    def __init__(
+        self,
+        cache_directory: Path | None = None,
+        max_bytes: int = EXPORT_CACHE_MAX_BYTES,
+        hard_link: bool = False,
+    ):
+        self.directory = cache_directory or utils.data_root().joinpath(EXPORT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self.hard_link = hard_link
+        self.stats = ExportCacheStats()
+        self._entries: OrderedDict[Path, int] | None = None
+        self._size = 0
+
+        utils.create_directory(self.directory)
+
+    def __repr__(self) -> str:
+        return f"(ExportCache: {self.directory} {self.size} bytes {self.stats})"
+
+    def path_for(self, fingerprint: str) -> Path:
+        return self.directory.joinpath(f"{fingerprint}{EXPORT_CACHE_SUFFIX}")
+
+    def restore(self, fingerprint: str, destination: Path) -> bool:
+        """Copies, or hard links, a cached file to the destination
+
+        Returns True where the fingerprint was cached
+        """
+        cached_file = self.path_for(fingerprint)
+
+        if not cached_file.exists():
+            self.stats.misses += 1
+            return False
+
+        utils.create_directory(destination.parent)
+
+        try:
+            destination.unlink(missing_ok=True)
+            if self.hard_link:
+                os.link(cached_file, destination)
+            else:
+                shutil.copyfile(cached_file, destination)
+
+            # Mark as recently used
+            os.utime(cached_file)
+            self._track(cached_file)
+
+        except OSError as e:
+            _logger.error(f"Unable to restore {destination} from export cache: {e}")
+            self.stats.misses += 1
+            return False
+
+        self.stats.hits += 1
+        return True
+
+    def store(self, fingerprint: str, source: Path) -> None:
+        """Adds a rendered file to the cache, evicting older files if over the size limit"""
+        cached_file = self.path_for(fingerprint)
+        temp_file = cached_file.with_suffix(".tmp")
+
+        try:
+            shutil.copyfile(source, temp_file)
+            temp_file.replace(cached_file)
+        except OSError as e:
+            _logger.error(f"Unable to store {source} in export cache: {e}")
+            temp_file.unlink(missing_ok=True)
+            return
+
+        self.stats.stores += 1
+        self._track(cached_file)
+        self.evict()
+
+    def files(self) -> list[Path]:
+        return list(self.directory.glob(f"*{EXPORT_CACHE_SUFFIX}"))
+
+    @property
+    def size(self) -> int:
+        "Returns the total size in bytes of the cached files"
+        self._get_entries()
+        return self._size
+
+    def _get_entries(self) -> OrderedDict[Path, int]:
+        """Returns the size of each cached file, least recently used first, reading the directory on first use"""
+        if self._entries is None:
+            cached_files = sorted(
+                ((x, x.stat()) for x in self.files()), key=lambda x: x[1].st_mtime_ns
+            )
+            self._entries = OrderedDict((x, stat.st_size) for x, stat in cached_files)
+            self._size = sum(self._entries.values())
+
+        return self._entries
+
+    def _track(self, cached_file: Path) -> None:
+        """Records a cached file as the most recently used, with its current size"""
+        entries = self._get_entries()
+        size = cached_file.stat().st_size
+
+        self._size += size - entries.pop(cached_file, 0)
+        entries[cached_file] = size
+
+    def evict(self) -> None:
+        """Removes the least recently used files until the cache is within max_bytes"""
+        entries = self._get_entries()
+
+        while self._size > self.max_bytes and entries:
+            cached_file, size = entries.popitem(last=False)
+            cached_file.unlink(missing_ok=True)
+            self._size -= size
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        for cached_file in self.files():
+            cached_file.unlink(missing_ok=True)
+
+        self._entries = OrderedDict()
+        self._size = 0
+
+
+_export_cache: ExportCache | None = None
+
+
+def get_export_cache() -> ExportCache:
+    """Returns the shared export cache in the user data directory"""
+    global _export_cache  # noqa: PLW0603
+
+    if _export_cache is None:
+        _export_cache = ExportCache()
+
+    return _export_cache
+
+
+if __name__ == "__main__":
+    pass
@@ -1,10 +1,14 @@
+import logging
 from dataclasses import dataclass, field
 
-from joystick_diagrams.input import device
+from joystick_diagrams.compatibility import create_compatibility_matrix
+from joystick_diagrams.exceptions import JoystickDiagramsError
 from joystick_diagrams.input.device import Device_
 from joystick_diagrams.profile_wrapper import ProfileWrapper
 from joystick_diagrams.template import Template
 
+_logger = logging.getLogger(__name__)
+
 
 @dataclass
 class ExportDevice:
@@ -13,7 +17,7 @@ class ExportDevice:
     device: Device_
     _template: Template | None
     profile_wrapper: ProfileWrapper
-    errors: set = field(default_factory=set, init=False)
+    _errors: set | None = field(default=None, init=False, repr=False)
 
     @property
     def template_file_name(self) -> str | None:
@@ -40,36 +44,31 @@ class ExportDevice:
     @template.setter
     def template(self, value):
         self._template = value
+        self._errors = None
 
-        if value is not None:
-            self.errors = self.check_compatibility()
-
-    def check_compatibility(self):
-        """Computes mergeability of a Device to the Template.
-
-        Returns list of missing controls from TEMPLATE
-        """
-        device_inputs = self.device.get_inputs()
-
-        # Button Checks
-        device_buttons = {
-            x.lower() for x in set(device_inputs.get(device.INPUT_BUTTON_KEY))
-        }
-
-        device_buttons.difference_update(self.template.get_template_buttons())
-
-        # Hat Checks
-        device_hats = {x.lower() for x in set(device_inputs.get(device.INPUT_HAT_KEY))}
-        device_hats.difference_update(self.template.get_template_hats())
-
-        # AXIS
-        device_axis = {x.lower() for x in set(device_inputs.get(device.INPUT_AXIS_KEY))}
-        device_axis = device_axis.union(
-            {x.lower() for x in set(device_inputs.get(device.INPUT_AXIS_SLIDER_KEY))}
-        )
-        device_axis.difference_update(self.template.get_template_axis())
-
-        return set().union(device_buttons, device_hats, device_axis)
+    @property
+    def errors(self) -> set:
+        """Controls missing from the Template, checked when first needed as this loads the template"""
+        if self._errors is None:
+            self._errors = self.check_compatibility() if self.template else set()
+
+        return self._errors
+
+    @errors.setter
+    def errors(self, value: set):
+        self._errors = value
+
+    def check_compatibility(self) -> set:
+        """Returns the controls of the Device missing from the Template, computed as a single entry compatibility matrix"""
+        try:
+            matrix = create_compatibility_matrix([self.device], [self.template])
+        except JoystickDiagramsError as e:
+            _logger.error(
+                f"Unable to check {self.template_file_name} for {self.device_name}: {e}"
+            )
+            return set()
+
+        return matrix.missing_controls(0, 0)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,84 @@
+"""Tracks what has previously been exported to an export location.
+
+The manifest is stored alongside the exported diagrams, recording the data each diagram was created from so unchanged diagrams can be skipped on later exports. The resolution each diagram was rendered to other formats at is recorded too, so renders are only skipped where made at the same resolution.
+"""
+
+import json
+import logging
+from collections.abc import Iterable
+from pathlib import Path
+
+from joystick_diagrams import utils
+
+_logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "joystick_diagrams_manifest.json"
+MANIFEST_VERSION = 2
+# Version 1 manifests record the same entries, without the renders
+READABLE_MANIFEST_VERSIONS = (1, MANIFEST_VERSION)
+ENCODING = "UTF8"
+
+
+class ExportManifest:
+    def __init__(self, export_location: Path):
+        self.export_location = Path(export_location)
+        self.path = self.export_location.joinpath(MANIFEST_FILE)
+        self.entries: dict[str, dict] = {}
+        self.renders: dict[str, dict[str, int]] = {}
+        self.load()
+
+    def load(self) -> None:
+        """Loads the existing manifest, leaving no entries where it is missing or invalid"""
+        try:
+            with open(self.path, "r", encoding=ENCODING) as f:
+                manifest = json.load(f)
+
+            if manifest.get("version") in READABLE_MANIFEST_VERSIONS:
+                self.entries = manifest["entries"]
+                # Not recorded by version 1, so their renders are made again once
+                self.renders = manifest.get("renders", {})
+
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            _logger.warning(f"Export manifest {self.path} could not be read: {e}")
+
+    def save(self) -> None:
+        utils.create_directory(self.export_location)
+
+        try:
+            with open(self.path, "w", encoding=ENCODING) as f:
+                json.dump(
+                    {
+                        "version": MANIFEST_VERSION,
+                        "entries": self.entries,
+                        "renders": self.renders,
+                    },
+                    f,
+                )
+        except OSError as e:
+            _logger.error(f"Export manifest {self.path} could not be saved: {e}")
+
+    def is_unchanged(self, file_name: str, entry: dict) -> bool:
+        """Checks if a file was previously exported from the same data and still exists"""
+        return (
+            self.entries.get(file_name) == entry
+            and self.export_location.joinpath(file_name).exists()
+        )
+
+    def update(self, file_name: str, entry: dict) -> None:
+        self.entries[file_name] = entry
+
+    def get_render_dpi(self, file_name: str, export_format: str) -> int | None:
+        """Returns the resolution a file was last rendered to a format at, or None where not recorded"""
+        return self.renders.get(file_name, {}).get(export_format)
+
+    def update_render(self, file_name: str, formats: Iterable[str], dpi: int) -> None:
+        self.renders.setdefault(file_name, {}).update(dict.fromkeys(formats, dpi))
+
+    def remove_render(self, file_name: str) -> None:
+        self.renders.pop(file_name, None)
+
+
+if __name__ == "__main__":
+    pass
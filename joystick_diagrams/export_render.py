@@ -0,0 +1,271 @@
+"""Renders exported SVG diagrams to other formats.
+
+Rendering uses the Qt SVG renderer bundled with PySide6, imported only when rendering so SVG exports do not require Qt. Documents are always rendered in worker processes, so Qt is only configured in the workers and never in the process exporting. Each worker initialises Qt once and renders many documents, so fonts and glyphs are loaded once per worker rather than once per file. The worker processes are shared by every export in the application, so they are started once.
+"""
+
+import atexit
+import logging
+import os
+from collections.abc import Callable, Iterable
+from contextlib import nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+
+from joystick_diagrams.export_manifest import ExportManifest
+from joystick_diagrams.utils import setup_worker_logging
+from joystick_diagrams.worker_pool import WorkerPool
+
+_logger = logging.getLogger(__name__)
+
+EXPORT_FORMAT_SVG = "svg"
+EXPORT_FORMAT_PNG = "png"
+EXPORT_FORMAT_PDF = "pdf"
+RENDER_FORMATS = (EXPORT_FORMAT_PNG, EXPORT_FORMAT_PDF)
+EXPORT_FORMATS = (EXPORT_FORMAT_SVG, *RENDER_FORMATS)
+
+SVG_DPI = 96  # Resolution of SVG user units
+DEFAULT_DPI = 150
+POINTS_PER_INCH = 72
+
+# Qt application of a render worker process, set by initialise_render_worker
+_application = None
+
+
+@dataclass(frozen=True)
+class RenderJob:
+    source: Path
+    formats: tuple[str, ...]
+    dpi: int = DEFAULT_DPI
+
+
+def get_render_path(source: Path, export_format: str) -> Path:
+    return source.with_suffix(f".{export_format}")
+
+
+def get_render_formats(formats: Iterable[str]) -> tuple[str, ...]:
+    """Returns the requested formats which are rendered from the exported SVG"""
+    return tuple(x for x in formats if x in RENDER_FORMATS)
+
+
+def is_rendered(
+    source: Path, formats: Iterable[str], dpi: int, manifest: ExportManifest
+) -> bool:
+    """Checks if every format has been rendered at the resolution since the source was last written"""
+    if any(manifest.get_render_dpi(source.name, x) != dpi for x in formats):
+        return False
+
+    try:
+        source_modified = source.stat().st_mtime_ns
+
+        return all(
+            get_render_path(source, x).stat().st_mtime_ns >= source_modified
+            for x in formats
+        )
+    except OSError:
+        return False
+
+
+def initialise_render_worker() -> None:
+    """Configures logging and creates the Qt application required for rendering text, once per render worker process"""
+    global _application  # noqa: PLW0603
+
+    setup_worker_logging()
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    try:
+        from PySide6.QtGui import QGuiApplication  # noqa: PLC0415
+
+        _application = QGuiApplication.instance() or QGuiApplication([])
+    except Exception as e:
+        # Raising would leave the pool starting replacement workers indefinitely, so each job fails instead
+        _logger.error(f"Unable to initialise the renderer: {e}")
+
+
+def render_job(job: RenderJob) -> bool:
+    """Renders a source SVG to each requested format, run in a render worker process
+
+    Returns True where all formats were written
+    """
+    if _application is None:
+        _logger.error(f"Unable to render {job.source} as the renderer is unavailable")
+        return False
+
+    try:
+        from PySide6.QtSvg import QSvgRenderer  # noqa: PLC0415
+
+        renderer = QSvgRenderer(str(job.source))
+
+        if not renderer.isValid():
+            _logger.error(f"Unable to render {job.source} as it is not a valid SVG")
+            return False
+
+        for export_format in job.formats:
+            destination = get_render_path(job.source, export_format)
+            temp_file = destination.with_name(f"{destination.name}.tmp")
+
+            try:
+                RENDERERS[export_format](renderer, temp_file, job.dpi)
+                temp_file.replace(destination)
+            finally:
+                temp_file.unlink(missing_ok=True)
+
+        return True
+
+    except Exception as e:
+        _logger.error(f"Failed to render {job.source}: {e}")
+        return False
+
+
+def render_png(renderer, destination: Path, dpi: int) -> None:
+    from PySide6.QtCore import Qt  # noqa: PLC0415
+    from PySide6.QtGui import QImage, QPainter  # noqa: PLC0415
+
+    size = renderer.defaultSize() * (dpi / SVG_DPI)
+    dots_per_meter = round(dpi / 0.0254)
+
+    image = QImage(size, QImage.Format.Format_ARGB32)
+    image.fill(Qt.GlobalColor.white)
+    image.setDotsPerMeterX(dots_per_meter)
+    image.setDotsPerMeterY(dots_per_meter)
+
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+    renderer.render(painter)
+    painter.end()
+
+    if not image.save(str(destination), "PNG"):
+        raise OSError(f"Unable to write {destination}")
+
+
+def render_pdf(renderer, destination: Path, dpi: int) -> None:
+    from PySide6.QtCore import QMarginsF, QSizeF  # noqa: PLC0415
+    from PySide6.QtGui import QPageLayout, QPageSize, QPainter, QPdfWriter  # noqa: PLC0415
+
+    size = renderer.defaultSize()
+    page_size = QPageSize(
+        QSizeF(
+            size.width() * POINTS_PER_INCH / SVG_DPI,
+            size.height() * POINTS_PER_INCH / SVG_DPI,
+        ),
+        QPageSize.Unit.Point,
+    )
+
+    writer = QPdfWriter(str(destination))
+    writer.setResolution(dpi)
+    writer.setPageLayout(
+        QPageLayout(page_size, QPageLayout.Orientation.Portrait, QMarginsF(0, 0, 0, 0))
+    )
+
+    painter = QPainter(writer)
+    renderer.render(painter)
+    painter.end()
+
+
+RENDERERS: dict[str, Callable] = {
+    EXPORT_FORMAT_PNG: render_png,
+    EXPORT_FORMAT_PDF: render_pdf,
+}
+
+
+class RenderPool(WorkerPool):
+    """Pool of render worker processes, which each keep their renderer loaded between documents"""
+
+    def __init__(self, workers: int = 1):
+        super().__init__(workers, initialise_render_worker)
+
+    def render(self, jobs: list[RenderJob]) -> Iterable[bool]:
+        """Renders jobs in batch, yielding the result of each in order"""
+        return self.imap(render_job, jobs)
+
+
+_render_pool: RenderPool | None = None
+
+
+def get_render_pool(workers: int = 1) -> RenderPool:
+    """Returns the render pool shared by exports, replaced where a different number of workers is requested"""
+    global _render_pool  # noqa: PLW0603
+
+    if _render_pool is None or _render_pool.workers != workers:
+        close_render_pool()
+        _render_pool = RenderPool(workers)
+
+    return _render_pool
+
+
+@atexit.register
+def close_render_pool() -> None:
+    global _render_pool  # noqa: PLW0603
+
+    if _render_pool is not None:
+        _render_pool.close()
+        _render_pool = None
+
+
+def render_exports(  # noqa: PLR0913
+    sources: list[Path],
+    formats: Iterable[str],
+    dpi: int = DEFAULT_DPI,
+    pool: RenderPool | None = None,
+    *,
+    manifest: ExportManifest | None = None,
+    incremental: bool = True,
+    progress: Callable[[int, int], None] | None = None,
+) -> int:
+    """Renders exported SVG files to the requested formats
+
+    When incremental, files the manifest records as rendered at the same resolution since the source was written are skipped. Renders are recorded in the manifest, which is left for the caller to save. Without a manifest every file is rendered
+
+    A supplied pool is used and left open, otherwise a single worker is started for the batch
+
+    Progress is reported as (completed, total) after each file
+
+    Returns the number of files which failed to render
+    """
+    render_formats = get_render_formats(formats)
+
+    if not render_formats:
+        return 0
+
+    total = len(sources)
+    jobs = [
+        RenderJob(x, render_formats, dpi)
+        for x in sources
+        if not (
+            incremental and manifest and is_rendered(x, render_formats, dpi, manifest)
+        )
+    ]
+
+    if progress:
+        progress(total - len(jobs), total)
+
+    if not jobs:
+        return 0
+
+    render_context = nullcontext(pool) if pool else RenderPool()
+    failed = 0
+
+    with render_context as render_pool:
+        for completed, (job, result) in enumerate(
+            zip(jobs, render_pool.render(jobs), strict=True), total - len(jobs) + 1
+        ):
+            if not result:
+                failed += 1
+
+            if manifest and result:
+                manifest.update_render(job.source.name, render_formats, dpi)
+            elif manifest:
+                manifest.remove_render(job.source.name)
+
+            if progress:
+                progress(completed, total)
+
+    _logger.info(
+        f"Rendered {len(jobs) - failed} exports to {', '.join(render_formats)} at {dpi} DPI"
+    )
+
+    return failed
+
+
+if __name__ == "__main__":
+    pass
@@ -3,21 +3,22 @@
 Handles AXIS and Axis Slider control types
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum, auto
 
+from joystick_diagrams.input.control import Control, InternedControl
 
-@dataclass
-class Axis:
+
+@dataclass(frozen=True, slots=True)
+class Axis(Control, metaclass=InternedControl):
     id: "AxisDirection"
+    identifier: str = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
         if not isinstance(self.id, AxisDirection):
             raise ValueError("Invalid direction used for AXIS")
 
-    @property
-    def identifier(self):
-        return f"AXIS_{self.id.name}"
+        object.__setattr__(self, "identifier", f"AXIS_{self.id.name}")
 
 
 class AxisDirection(Enum):
@@ -30,14 +31,13 @@ class AxisDirection(Enum):
     SLIDER = auto()
 
 
-@dataclass
-class AxisSlider:
+@dataclass(frozen=True, slots=True)
+class AxisSlider(Control, metaclass=InternedControl):
     id: int
+    identifier: str = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
         if not isinstance(self.id, int):
             raise ValueError("A slider must have an id of INT")
 
-    @property
-    def identifier(self):
-        return f"AXIS_SLIDER_{self.id}"
+        object.__setattr__(self, "identifier", f"AXIS_SLIDER_{self.id}")
@@ -1,16 +1,17 @@
 """Basic Button structure for the Joystick DIagrams input library"""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
+from joystick_diagrams.input.control import Control, InternedControl
 
-@dataclass
-class Button:
+
+@dataclass(frozen=True, slots=True)
+class Button(Control, metaclass=InternedControl):
     id: int
+    identifier: str = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
         if not isinstance(self.id, int):
             raise ValueError("Button must be identified by integer")
 
-    @property
-    def identifier(self):
-        return f"BUTTON_{self.id}"
+        object.__setattr__(self, "identifier", f"BUTTON_{self.id}")
@@ -0,0 +1,51 @@
+"""Shared behaviour of the control types in the Joystick Diagrams input library
+
+Controls are immutable, so each distinct control is created once and shared by every device and profile using it
+"""
+
+from typing import Any
+
+
+class InternedControl(type):
+    """Metaclass returning the existing control where one is created with the same values"""
+
+    def __init__(cls, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        cls._instances: dict[tuple, Any] = {}
+
+    def __call__(cls, *args, **kwargs):
+        if kwargs:
+            control = super().__call__(*args, **kwargs)
+            args = tuple(getattr(control, x) for x in cls.__match_args__)
+            return cls._instances.setdefault((*args, *map(type, args)), control)
+
+        # Types are part of the key so equal values of another type, such as 1.0 for 1, are still validated
+        key = (*args, *map(type, args))
+
+        try:
+            return cls._instances[key]
+        except KeyError:
+            return cls._instances.setdefault(key, super().__call__(*args))
+        except TypeError:
+            # Unhashable values are never valid, so the control is created to raise its own error
+            return super().__call__(*args)
+
+
+class Control:
+    """Base for interned controls, which are shared rather than copied"""
+
+    __slots__ = ()
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        # Recreated through the class so unpickled controls are interned again
+        return (type(self), tuple(getattr(self, x) for x in self.__match_args__))
+
+
+if __name__ == "__main__":
+    pass
@@ -4,6 +4,10 @@
 """
 
 import logging
+import sys
+import weakref
+from collections.abc import Mapping, Sequence
+from types import MappingProxyType
 from typing import Union
 from uuid import UUID
 
@@ -11,6 +15,7 @@ from joystick_diagrams.input.axis import Axis, AxisSlider
 from joystick_diagrams.input.button import Button
 from joystick_diagrams.input.hat import Hat
 from joystick_diagrams.input.input import Input_
+from joystick_diagrams.input.modifier import Modifier
 
 _logger = logging.getLogger("__name__")
 
@@ -26,25 +31,273 @@ CLASS_MAP = {
     Hat: INPUT_HAT_KEY,
 }
 
-INPUT_TYPE_IDENTIFIERS = {
-    INPUT_BUTTON_KEY: "identifier",
-    INPUT_AXIS_KEY: "identifier",
-    INPUT_AXIS_SLIDER_KEY: "identifier",
-    INPUT_HAT_KEY: "identifier",
-}
+
+class DeviceInput(Input_):
+    """An input of a device, read from and written to the storage of the device
+
+    Changing an input inherited from a layer of the device first copies it into the device
+    """
+
+    __slots__ = ("_device", "_identifier")
+
+    def __init__(self, device: "Device_", identifier: str) -> None:
+        self._device = device
+        self._identifier = identifier
+        # The control, command and modifiers are read from the device, so the input's own modifiers are never used
+        self._modifiers = {}
+
+    @property
+    def input_control(self) -> Axis | Button | Hat | AxisSlider:
+        return self._device._resolve(self._identifier)[0]
+
+    @property
+    def command(self) -> str:
+        return self._device._resolve(self._identifier)[1]
+
+    @command.setter
+    def command(self, command: str):
+        control_id = self._device._materialize(self._identifier)
+        self._device._commands[control_id] = sys.intern(command)
+
+    def _get_modifiers(self) -> dict[frozenset[str], Modifier]:
+        modifiers = self._device._resolve(self._identifier)[2]
+        control_id = self._device._ids.get(self._identifier)
+        own = self._device._modifiers.get(control_id, {})
+
+        if modifiers is own:
+            return own
+
+        # Inherited modifiers belong to the layers, so are copied to keep changes to them from reaching the layers
+        return {
+            key: own[key] if key in own else Modifier(set(x.modifiers), x.command)
+            for key, x in modifiers.items()
+        }
+
+    def _get_modifiers_for_update(self) -> dict[frozenset[str], Modifier]:
+        # Existing modifiers are changed in place, so must belong to this device
+        control_id = self._device._materialize(self._identifier)
+        return self._device._modifiers.setdefault(control_id, {})
+
+
+def copy_modifiers(
+    modifiers: dict[frozenset[str], Modifier],
+) -> dict[frozenset[str], Modifier]:
+    return {key: Modifier(set(x.modifiers), x.command) for key, x in modifiers.items()}
 
 
 class Device_:  # noqa: N801
+    """A device and its inputs
+
+    Inputs are stored as arrays indexed by an integer control id, with the shared control objects and interned commands, and modifiers only for the few inputs that have them.
+    Inputs are returned as views of this storage
+
+    A device may be layered over other devices, inheriting their inputs without copying them. An input of an earlier layer takes precedence, gaining the modifiers of later layers for other modifier keys.
+    Layers are flattened to the devices they are made of, through any depth, so a device shared by several layers is read once.
+    Inherited inputs are copied into the device only when changed, and their modifiers are returned as copies, so layers are never changed through the device
+    """
+
+    __slots__ = (
+        "guid",
+        "name",
+        "_ids",
+        "_controls",
+        "_commands",
+        "_modifiers",
+        "_layers",
+        "_dependents",
+        "_chain",
+        "_inputs",
+        "__weakref__",
+    )
+
     def __init__(self, guid: str, device_name: str):
         self.guid = self.validate_guid(guid)
         self.name = device_name.strip()
 
-        self.inputs: dict[str, dict[str, Input_]] = {
-            INPUT_BUTTON_KEY: {},
-            INPUT_AXIS_KEY: {},
-            INPUT_AXIS_SLIDER_KEY: {},
-            INPUT_HAT_KEY: {},
+        self._ids: dict[str, int] = {}
+        self._controls: list[Axis | Button | Hat | AxisSlider] = []
+        self._commands: list[str] = []
+        self._modifiers: dict[int, dict[frozenset[str], Modifier]] = {}
+        self._layers: tuple[Device_, ...] = ()
+        # Devices layered over this device, whose flattened layers and inputs include it
+        self._dependents: weakref.WeakSet[Device_] = weakref.WeakSet()
+        self._chain: tuple[Device_, ...] | None = None
+        self._inputs: Mapping[str, Mapping[str, Input_]] | None = None
+
+    @classmethod
+    def create_overlay(cls, devices: Sequence["Device_"]) -> "Device_":
+        """Creates a device layered over the supplied devices, in order of precedence"""
+        device = cls(devices[0].guid, devices[0].name)
+        device.set_layers(devices)
+
+        return device
+
+    def get_layers(self) -> tuple["Device_", ...]:
+        return self._layers
+
+    def set_layers(self, devices: Sequence["Device_"]):
+        """Replaces the devices the device is layered over, keeping the inputs changed through the device"""
+        for layer in self._layers:
+            layer._dependents.discard(self)
+
+        self._layers = tuple(devices)
+
+        for layer in self._layers:
+            layer._dependents.add(self)
+
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        """Clears the flattened layers and inputs of the device and of the devices layered over it, through any depth"""
+        self._chain = None
+        self._inputs = None
+
+        if not self._dependents:
+            return
+
+        pending = list(self._dependents)
+        invalidated = {self, *pending}
+
+        while pending:
+            device = pending.pop()
+            device._chain = None
+            device._inputs = None
+
+            for dependent in device._dependents:
+                if dependent not in invalidated:
+                    invalidated.add(dependent)
+                    pending.append(dependent)
+
+    def _get_chain(self) -> tuple["Device_", ...]:
+        """Returns the device and the devices it is layered over through any depth, each once, in order of precedence"""
+        if not self._layers:
+            return (self,)
+
+        if self._chain is None:
+            # Each layer's own chain is reused, so shared layers are flattened once
+            chain = {self: None}
+
+            for layer in self._layers:
+                chain.update(dict.fromkeys(layer._get_chain()))
+
+            self._chain = tuple(chain)
+
+        return self._chain
+
+    def __deepcopy__(self, memo) -> "Device_":
+        # Controls and commands are immutable, and layers are never changed through the device, so only modifiers need copying
+        device = object.__new__(Device_)
+        device.guid = self.guid
+        device.name = self.name
+        device._ids = self._ids.copy()
+        device._controls = self._controls.copy()
+        device._commands = self._commands.copy()
+        device._modifiers = {
+            control_id: copy_modifiers(modifiers)
+            for control_id, modifiers in self._modifiers.items()
         }
+        device._layers = self._layers
+        device._dependents = weakref.WeakSet()
+        device._chain = None
+        device._inputs = None
+
+        for layer in device._layers:
+            layer._dependents.add(device)
+
+        memo[id(self)] = device
+
+        return device
+
+    def __getstate__(self) -> dict:
+        # Dependents are held weakly and recorded again as devices are layered when unpickled, and cached views are created again when used
+        return {
+            "guid": self.guid,
+            "name": self.name,
+            "_ids": self._ids,
+            "_controls": self._controls,
+            "_commands": self._commands,
+            "_modifiers": self._modifiers,
+            "_layers": self._layers,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        for key, value in state.items():
+            setattr(self, key, value)
+
+        self._dependents = weakref.WeakSet()
+        self._chain = None
+        self._inputs = None
+
+        for layer in self._layers:
+            layer._dependents.add(self)
+
+    def _resolve(
+        self, identifier: str
+    ) -> (
+        tuple[Axis | Button | Hat | AxisSlider, str, dict[frozenset[str], Modifier]]
+        | None
+    ):
+        """Returns the control, command and modifiers of an input from the device or its layers"""
+        resolved = None
+
+        for device in self._get_chain():
+            control_id = device._ids.get(identifier)
+
+            if control_id is None:
+                continue
+
+            modifiers = device._modifiers.get(control_id)
+
+            if resolved is None:
+                resolved = (
+                    device._controls[control_id],
+                    device._commands[control_id],
+                    modifiers or {},
+                )
+                continue
+
+            if not modifiers:
+                continue
+
+            inherited = {
+                key: x for key, x in modifiers.items() if key not in resolved[2]
+            }
+
+            if inherited:
+                resolved = (resolved[0], resolved[1], {**resolved[2], **inherited})
+
+        return resolved
+
+    def _materialize(self, identifier: str) -> int | None:
+        """Returns the control id of an input, copying it from the layers where the device does not have it"""
+        control_id = self._ids.get(identifier)
+
+        if control_id is not None or not self._layers:
+            return control_id
+
+        resolved = self._resolve(identifier)
+
+        if resolved is None:
+            return None
+
+        control, command, modifiers = resolved
+        control_id = self._add_input(control, command)
+
+        if modifiers:
+            self._modifiers[control_id] = copy_modifiers(modifiers)
+
+        return control_id
+
+    def _add_input(
+        self, control: Axis | Button | Hat | AxisSlider, command: str
+    ) -> int:
+        control_id = len(self._controls)
+        self._ids[control.identifier] = control_id
+        self._controls.append(control)
+        self._commands.append(sys.intern(command))
+        self._invalidate()
+
+        return control_id
 
     def __repr__(self) -> str:
         return f"{self.guid[:8]} | {self.name}"
@@ -81,32 +334,53 @@ class Device_:  # noqa: N801
 
         Returns None | ValueError
         """
-        control_key = self.resolve_type(control)
-
-        input_obj = self.get_input(
-            input_type=control_key,
-            input_id=getattr(control, INPUT_TYPE_IDENTIFIERS[control_key]),
-        )
-        if input_obj:
-            input_obj.command = str(command)
+        self.resolve_type(control)
+
+        control_id = self._materialize(control.identifier)
+
+        if control_id is not None:
+            self._commands[control_id] = sys.intern(str(command))
         else:
-            self.inputs[control_key][
-                getattr(control, INPUT_TYPE_IDENTIFIERS[control_key])
-            ] = Input_(control, str(command))
+            self._add_input(control, str(command))
 
     def get_input(self, input_type: str, input_id: str) -> Input_ | None:
         """Get an input for a specific input type.
 
         Returns None | Input_
         """
-        return self.inputs[input_type].get(input_id)
+        resolved = self._resolve(input_id)
+
+        if resolved is None or CLASS_MAP[type(resolved[0])] != input_type:
+            return None
+
+        return DeviceInput(self, input_id)
+
+    @property
+    def inputs(self) -> Mapping[str, Mapping[str, Input_]]:
+        """Returns a read only view of get_inputs, kept until an input is added to the device or its layers"""
+        if self._inputs is None:
+            self._inputs = MappingProxyType(
+                {key: MappingProxyType(x) for key, x in self.get_inputs().items()}
+            )
+
+        return self._inputs
 
     def get_inputs(self) -> dict[str, dict[str, Input_]]:
         """Returns input dictionary
 
         Returns dict
         """
-        return self.inputs
+        inputs: dict[str, dict[str, Input_]] = {
+            INPUT_BUTTON_KEY: {},
+            INPUT_AXIS_KEY: {},
+            INPUT_AXIS_SLIDER_KEY: {},
+            INPUT_HAT_KEY: {},
+        }
+
+        for identifier, control in self._get_controls().items():
+            inputs[CLASS_MAP[type(control)]][identifier] = DeviceInput(self, identifier)
+
+        return inputs
 
     def get_combined_inputs(self) -> dict[str, Input_]:
         """Returns a flattened input dictionary
@@ -118,6 +392,20 @@ class Device_:  # noqa: N801
             flattened_dict_.update(value)
         return flattened_dict_
 
+    def get_identifiers(self) -> list[str]:
+        """Returns the identifiers of the device inputs, without creating the inputs"""
+        return list(self._get_controls())
+
+    def _get_controls(self) -> dict[str, Axis | Button | Hat | AxisSlider]:
+        """Returns the controls of the device and its layers by identifier"""
+        controls = {}
+
+        for device in self._get_chain():
+            for control in device._controls:
+                controls.setdefault(control.identifier, control)
+
+        return controls
+
     def add_modifier_to_input(
         self, control: Axis | Button | Hat | AxisSlider, modifier: set, command: str
     ) -> None:
@@ -127,28 +415,26 @@ class Device_:  # noqa: N801
 
         Returns:  None
         """
-        _logger.debug(f"Adding modifier {modifier} to input {control}")
+        debug = _logger.isEnabledFor(logging.DEBUG)
+
+        if debug:
+            _logger.debug(f"Adding modifier {modifier} to input {control}")
 
         # Magic
         type_key = self.resolve_type(control)
 
-        input_obj = self.get_input(
-            type_key,
-            getattr(control, INPUT_TYPE_IDENTIFIERS[type_key]),
-        )
+        input_obj = self.get_input(type_key, control.identifier)
 
         if input_obj is None:
-            _logger.debug(
-                f"Modifier attempted to be added to {control} but input does not exist. So a shell will be created"
-            )
+            if debug:
+                _logger.debug(
+                    f"Modifier attempted to be added to {control} but input does not exist. So a shell will be created"
+                )
 
             # Create the control object
             self.create_input(control, command="")
 
-            shell_input = self.get_input(
-                type_key,
-                getattr(control, INPUT_TYPE_IDENTIFIERS[type_key]),
-            )
+            shell_input = self.get_input(type_key, control.identifier)
 
             if shell_input:
                 shell_input.add_modifier(modifier, str(command))
@@ -1,13 +1,16 @@
 """Basic Hat structure for the Joystick DIagrams input library"""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum, auto
 
+from joystick_diagrams.input.control import Control, InternedControl
 
-@dataclass
-class Hat:
+
+@dataclass(frozen=True, slots=True)
+class Hat(Control, metaclass=InternedControl):
     id: int
     direction: "HatDirection"
+    identifier: str = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
         if not isinstance(self.id, int):
@@ -16,9 +19,7 @@ class Hat:
         if not isinstance(self.direction, HatDirection):
             raise ValueError("Invalid HatDirection used for hat switch")
 
-    @property
-    def identifier(self):
-        return f"POV_{self.id}_{self.direction.name}"
+        object.__setattr__(self, "identifier", f"POV_{self.id}_{self.direction.name}")
 
 
 class HatDirection(Enum):
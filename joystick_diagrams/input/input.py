@@ -18,14 +18,17 @@ CONTROL_TYPES = (Axis, Button, Hat, AxisSlider)
 
 
 class Input_:  # noqa: N801
+    __slots__ = ("input_control", "command", "_modifiers")
+
     def __init__(self, control: Axis | Button | Hat | AxisSlider, command: str) -> None:
         self.input_control = control
         self.command = command
-        self.modifiers: list[Modifier] = []
+        # Keyed by the modifier keys, so a modifier is found without comparing every modifier
+        self._modifiers: dict[frozenset[str], Modifier] = {}
         self.__post_init__()  # I wish normal classes had this... so now it does
 
     def __repr__(self):
-        return f"{self.input_control} - {self.command} - {self.modifiers}"
+        return f"{self.input_control} - {self.command} - {list(self.modifiers)}"
 
     def __str__(self):
         mod_to_string = [str(x) for x in self.modifiers]
@@ -40,31 +43,37 @@ class Input_:  # noqa: N801
         "Returns the child control identifier"
         return self.input_control.identifier
 
+    @property
+    def modifiers(self) -> tuple[Modifier, ...]:
+        """Returns the modifiers in the order they were added, as a tuple as modifiers are added through add_modifier"""
+        return tuple(self._get_modifiers().values())
+
+    def _get_modifiers(self) -> dict[frozenset[str], Modifier]:
+        return self._modifiers
+
+    def _get_modifiers_for_update(self) -> dict[frozenset[str], Modifier]:
+        return self._modifiers
+
     def add_modifier(self, modifier: set, command: str) -> None:
         """Adds a modifier to an existing input, or amends an existing modifier"""
-        existing = self._check_existing_modifier(modifier)
-
-        _logger.debug(f"Existing modifier check is {existing}")
+        modifiers = self._get_modifiers_for_update()
+        existing = modifiers.get(frozenset(modifier))
 
         if existing is None:
-            _logger.debug(
-                f"Modifier {modifier} for input {self.input_control} not found so adding"
-            )
-            self.modifiers.append(Modifier(modifier, command))
+            if _logger.isEnabledFor(logging.DEBUG):
+                _logger.debug(
+                    f"Modifier {modifier} for input {self.input_control} not found so adding"
+                )
+            modifiers[frozenset(modifier)] = Modifier(modifier, command)
         else:
-            _logger.debug(
-                f"Modifier {modifier} already exists for {self.input_control} and command has been overidden"
-            )
+            if _logger.isEnabledFor(logging.DEBUG):
+                _logger.debug(
+                    f"Modifier {modifier} already exists for {self.input_control} and command has been overidden"
+                )
             existing.command = command
 
     def _check_existing_modifier(self, modifier: set) -> Modifier | None:
-        _logger.debug(f"Existing modifiers: {self.modifiers}")
-        for x in self.modifiers:
-            _logger.debug(f"Checking for existing modifier {modifier} in {x}")
-            if x.modifiers == modifier:
-                _logger.debug(f"Modifier already  exists {x}")
-                return x
-        return None
+        return self._get_modifiers().get(frozenset(modifier))
 
 
 if __name__ == "__main__":
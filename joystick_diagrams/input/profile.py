@@ -1,5 +1,5 @@
 import logging
-from copy import deepcopy
+from collections.abc import Sequence
 
 from joystick_diagrams.input.device import Device_
 
@@ -31,6 +31,23 @@ class Profile_:  # noqa: N801
     def get_device(self, guid: str) -> Device_ | None:
         return self.devices.get(guid)
 
+    @classmethod
+    def create_overlay(cls, name: str, profiles: Sequence["Profile_"]) -> "Profile_":
+        """Creates a profile layered over the supplied profiles, in order of precedence
+
+        Devices are layered over the devices of the profiles rather than copied, so the profile only stores the inputs changed through it
+        """
+        overlay = cls(name)
+
+        for profile in profiles:
+            for guid in profile.devices:
+                if guid not in overlay.devices:
+                    overlay.devices[guid] = Device_.create_overlay(
+                        [x.devices[guid] for x in profiles if guid in x.devices]
+                    )
+
+        return overlay
+
     def merge_profiles(self, profile: "Profile_"):
         """Merge Profiles
 
@@ -38,40 +55,9 @@ class Profile_:  # noqa: N801
 
         OBJ << PROFILE
 
-
+        Inputs of OBJ take precedence, with modifiers for other modifier keys merged from PROFILE. Neither profile is changed by changes to the merged profile
         """
-        src_profile = deepcopy(self)
-
-        for guid, device in profile.devices.items():
-            if guid not in src_profile.devices:
-                # If the device is not in the current profile, deepcopy the entire device
-                src_profile.devices[guid] = deepcopy(device)
-            else:
-                # If the device exists in the current profile, merge inputs
-                existing_device = src_profile.devices[guid]
-                for input_type, inputs in device.inputs.items():
-                    for input_key, input_ in inputs.items():
-                        if input_key not in existing_device.inputs[input_type]:
-                            # If the input is not in the existing device, deepcopy the input
-                            existing_device.inputs[input_type][input_key] = deepcopy(
-                                input_
-                            )
-                        else:
-                            # If the input exists, merge modifiers
-                            existing_input = existing_device.inputs[input_type][
-                                input_key
-                            ]
-                            for modifier in input_.modifiers:
-                                existing_modifier = (
-                                    existing_input._check_existing_modifier(
-                                        modifier.modifiers
-                                    )
-                                )
-                                if existing_modifier is None:
-                                    existing_input.modifiers.append(deepcopy(modifier))
-                                # Don't merge upstream modifier command into current
-
-        return src_profile
+        return Profile_.create_overlay(self.name, [self, profile])
 
 
 if __name__ == "__main__":
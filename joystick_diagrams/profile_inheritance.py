@@ -0,0 +1,248 @@
+"""Resolves the profiles inherited by each profile, through any depth of parents.
+
+Profiles and their parents form a directed graph, which is checked for cycles and resolved in topological order. Each profile is merged once, after its parents, and the merged profile is reused by every profile inheriting from it.
+
+Merged profiles are updated in place when profiles or parents change. Only the changed profiles and the profiles inheriting from them are merged again, and only their devices layered over changed devices are updated. The inputs which may differ are reported, by profile and device.
+"""
+
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from graphlib import CycleError, TopologicalSorter
+
+from joystick_diagrams.exceptions import ProfileInheritanceCycleError
+from joystick_diagrams.input.device import Device_
+from joystick_diagrams.input.profile import Profile_
+
+_logger = logging.getLogger(__name__)
+
+
+@dataclass
+class InheritanceChange:
+    """Inputs of merged profiles which may have changed, by profile key and device guid"""
+
+    inputs: dict[str, dict[str, set[str]]] = field(default_factory=dict)
+    removed: list[str] = field(default_factory=list)
+
+    @property
+    def profiles(self) -> list[str]:
+        return list(self.inputs)
+
+
+def get_bindings(device: Device_) -> dict[str, tuple]:
+    """Returns the command and modifiers of each input of a device, for comparison"""
+    return {
+        key: (
+            value.command,
+            tuple((frozenset(x.modifiers), x.command) for x in value.modifiers),
+        )
+        for key, value in device.get_combined_inputs().items()
+    }
+
+
+def get_changed_inputs(before: dict[str, tuple], after: dict[str, tuple]) -> set[str]:
+    return {x for x in before.keys() | after.keys() if before.get(x) != after.get(x)}
+
+
+def get_order(parents: dict[str, list[str]]) -> list[str]:
+    """Returns the profile keys with parents before the profiles inheriting from them
+
+    Raises ProfileInheritanceCycleError where profiles inherit from each other
+    """
+    try:
+        return list(TopologicalSorter(parents).static_order())
+    except CycleError as e:
+        # Reversed from parents first to read as each profile inheriting the next
+        raise ProfileInheritanceCycleError(e.args[1][::-1]) from e
+
+
+class ProfileInheritance:
+    """Profiles by key and the ordered keys of their parents, the first parent taking precedence"""
+
+    def __init__(self, profiles: dict[str, Profile_], parents: dict[str, list[str]]):
+        self.profiles = profiles
+        self.parents = self.filter_parents(profiles, parents)
+        self._resolved: dict[str, Profile_] = {}
+
+    @staticmethod
+    def filter_parents(
+        profiles: dict[str, Profile_], parents: dict[str, list[str]]
+    ) -> dict[str, list[str]]:
+        """Returns the parents of each profile, ignoring parents which are not known profiles"""
+        filtered: dict[str, list[str]] = {}
+
+        for profile_key in profiles:
+            filtered[profile_key] = []
+
+            for parent_key in parents.get(profile_key, []):
+                if parent_key not in profiles:
+                    _logger.warning(
+                        f"Parent {parent_key} of profile {profile_key} does not exist and will be ignored"
+                    )
+                    continue
+
+                filtered[profile_key].append(parent_key)
+
+        return filtered
+
+    def get_order(self) -> list[str]:
+        """Returns the profile keys with parents before the profiles inheriting from them
+
+        Raises ProfileInheritanceCycleError where profiles inherit from each other
+        """
+        return get_order(self.parents)
+
+    def get_descendants(self, profile_keys: Iterable[str]) -> set[str]:
+        """Returns the profiles inheriting from the supplied profiles, through any depth of parents"""
+        children: dict[str, list[str]] = {}
+
+        for profile_key, parents in self.parents.items():
+            for parent_key in parents:
+                children.setdefault(parent_key, []).append(profile_key)
+
+        descendants: set[str] = set()
+        pending = list(profile_keys)
+
+        while pending:
+            for child in children.get(pending.pop(), []):
+                if child not in descendants:
+                    descendants.add(child)
+                    pending.append(child)
+
+        return descendants
+
+    def resolve_all(self) -> dict[str, Profile_]:
+        """Returns every profile with its parents merged
+
+        Profiles which inherit from each other are resolved without the parent which closes the cycle
+        """
+        if self._resolved:
+            return self._resolved
+
+        while True:
+            try:
+                order = self.get_order()
+                break
+            except ProfileInheritanceCycleError as e:
+                _logger.error(f"{e}, so {e.cycle[0]} will not inherit {e.cycle[1]}")
+                self.parents[e.cycle[0]].remove(e.cycle[1])
+
+        for profile_key in order:
+            self._resolve_profile(profile_key)
+
+        return self._resolved
+
+    def resolve(self, profile_key: str) -> Profile_:
+        """Returns a profile with its parents, and their parents, merged"""
+        return self.resolve_all()[profile_key]
+
+    def update(
+        self, profiles: dict[str, Profile_], parents: dict[str, list[str]]
+    ) -> InheritanceChange:
+        """Replaces the profiles and parents, merging again only the profiles affected by the changes
+
+        Profiles are changed by supplying a different profile object for the key. Merged profiles are updated in place, so merged profiles returned before remain current
+
+        Raises ProfileInheritanceCycleError where profiles would inherit from each other, leaving the profiles unchanged
+        """
+        parents = self.filter_parents(profiles, parents)
+        order = get_order(parents)
+
+        changed = {
+            x
+            for x in profiles
+            if x not in self._resolved
+            or profiles[x] is not self.profiles.get(x)
+            or parents[x] != self.parents.get(x)
+        }
+        removed = [x for x in self._resolved if x not in profiles]
+
+        # Compared after merging, so taken before any merged profile is updated
+        bindings = {
+            profile_key: {
+                guid: get_bindings(device)
+                for guid, device in self._resolved[profile_key].devices.items()
+            }
+            for profile_key in changed
+            if profile_key in self._resolved
+        }
+
+        self.profiles = profiles
+        self.parents = parents
+
+        for profile_key in removed:
+            del self._resolved[profile_key]
+
+        affected = changed | self.get_descendants(changed)
+        change = InheritanceChange(removed=removed)
+        invalidated: dict[Device_, set[str]] = {}
+
+        for profile_key in (x for x in order if x in affected):
+            before = self._resolved.get(profile_key)
+            layers = (
+                {guid: x.get_layers() for guid, x in before.devices.items()}
+                if before
+                else {}
+            )
+            devices = dict(before.devices) if before else {}
+
+            self._resolve_profile(profile_key)
+            devices.update(self._resolved[profile_key].devices)
+
+            for guid, device in devices.items():
+                if profile_key in changed and profile_key not in bindings:
+                    inputs = set(device.get_identifiers())
+                elif profile_key in changed:
+                    after = self._resolved[profile_key].devices.get(guid)
+                    inputs = get_changed_inputs(
+                        bindings[profile_key].get(guid, {}),
+                        get_bindings(after) if after else {},
+                    )
+                else:
+                    # Inputs are only changed through the devices the device is layered over
+                    inputs = set().union(
+                        *(
+                            invalidated.get(x, ())
+                            for x in layers.get(guid, ()) + device.get_layers()
+                        )
+                    )
+
+                if inputs:
+                    invalidated[device] = inputs
+                    change.inputs.setdefault(profile_key, {})[guid] = inputs
+
+        _logger.debug(
+            f"Profile inheritance updated {len(affected)} profiles, with changed inputs in {change.profiles}"
+        )
+
+        return change
+
+    def _resolve_profile(self, profile_key: str):
+        """Merges a profile over its merged parents, updating the existing merged profile in place"""
+        profile = self.profiles[profile_key]
+        layers = [profile, *[self._resolved[x] for x in self.parents[profile_key]]]
+
+        resolved = self._resolved.get(profile_key)
+
+        if resolved is None:
+            self._resolved[profile_key] = Profile_.create_overlay(profile.name, layers)
+            return
+
+        resolved.name = profile.name
+        guids = {guid: None for layer in layers for guid in layer.devices}
+
+        for guid in [x for x in resolved.devices if x not in guids]:
+            del resolved.devices[guid]
+
+        for guid in guids:
+            devices = [x.devices[guid] for x in layers if guid in x.devices]
+            device = resolved.devices.get(guid)
+
+            if device is None:
+                resolved.devices[guid] = Device_.create_overlay(devices)
+            elif device.get_layers() != tuple(devices):
+                device.set_layers(devices)
+
+
+if __name__ == "__main__":
+    pass
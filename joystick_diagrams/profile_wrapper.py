@@ -1,9 +1,8 @@
 """Serves as a wrapper around Plugin Profiles, allowing customisation and restored state of profiles"""
 
 import logging
-from copy import deepcopy
 
-from joystick_diagrams.db import db_profile_parents, db_profiles
+from joystick_diagrams.db import db_profile_parents
 from joystick_diagrams.input.profile import Profile_
 from joystick_diagrams.plugin_wrapper import PluginWrapper
 
@@ -21,7 +20,9 @@ class ProfileWrapper:
         self.display_name: str = ""
 
         # Master profile which represents a fully built version of the base
-        self.profile: Profile_ = deepcopy(self.original_profile)
+        self.profile: Profile_ = Profile_.create_overlay(
+            self.original_profile.name, [self.original_profile]
+        )
         # self.errors: list[str] = []
 
     def __repr__(self) -> str:
@@ -29,65 +30,22 @@ class ProfileWrapper:
             f"Profile Wrapper: {self.original_profile.name} from {self.profile_origin}"
         )
 
-    def initialise_wrapper(self):
-        """Initalises the wrapper, applying the app settings on top of the profile object
-
-        Results in a fully completed profile, and initalised ProfileWrapper with any relevant settings restored from DB"""
-        self.get_profile_settings()
-        self.get_parents_for_profile()
-        self.inherit_parents_into_profile()
-
-    def get_parents_for_profile(self):
-        """Try get the parents for a given profile from persisted state"""
-        self.parents.clear()
-        parents = db_profiles.get_profile_parents(self.profile_key)
-
-        _logger.debug(f"Parents for profile {self.profile_key} were {parents}")
-
-        from joystick_diagrams.app_state import AppState  # TODO Resolve circular  dep
+    def set_parents(
+        self, parent_keys: list[str], wrappers: dict[str, "ProfileWrapper"]
+    ):
+        """Sets the parents from their profile keys, ignoring keys without a wrapper"""
+        self.parents = [wrappers[x] for x in parent_keys if x in wrappers]
 
-        _state = AppState()
-        for parent_key, _ in parents:
-            _logger.debug(f"Trying to get parent for {parent_key}")
-
-            _wrapper = [
-                x for x in _state.profile_wrappers if x.profile_key == parent_key
-            ]
-            _logger.debug(f"Profiles fond {_wrapper}")
-            if _wrapper:
-                self.parents.append(_wrapper[0])
+        if len(self.parents) != len(parent_keys):
+            _logger.debug(
+                f"Parents of {self.profile_key} without a profile were ignored {parent_keys}"
+            )
 
     def update_parents_for_profile(self, parents: list["ProfileWrapper"]):
+        """Stores the parents of the profile, which are merged by AppState.update_profile_parents"""
         keys = [x.profile_key for x in parents]
         db_profile_parents.add_parents_to_profile(self.profile_key, keys)
         self.parents = parents
-        self.inherit_parents_into_profile()
-
-    def inherit_parents_into_profile(self):
-        if not self.parents:
-            return
-
-        _parents = self.parents  # Reverse list to flip obj >> parent
-        _parents.reverse()
-
-        merged_profiles = deepcopy(self.original_profile)
-
-        for parent in _parents[:1]:
-            obj = deepcopy(parent.original_profile)
-            merged_profiles = merged_profiles.merge_profiles(obj)
-
-        self.profile = merged_profiles
-
-    def get_profile_settings(self):
-        """Gets the profile settings if available
-
-        Uses original profile name, and origin as composite key
-        """
-        profile_settings = db_profiles.get_profile(self.profile_key)
-
-        if profile_settings:
-            # TODO restore settings
-            pass
 
     @property
     def profile_name(self):
@@ -104,5 +62,26 @@ class ProfileWrapper:
         return f"{self.profile_origin.name.lower().strip()}_{self.original_profile.name.lower().strip()}"
 
 
+def get_profile_graph(
+    wrappers: list[ProfileWrapper],
+) -> tuple[dict[str, Profile_], dict[str, list[str]]]:
+    """Returns the original profiles and the parent keys of the wrappers and their parents, by profile key"""
+    related = {}
+    pending = list(wrappers)
+
+    # Parents may not be among the wrappers, so are collected through the parents of each wrapper
+    while pending:
+        wrapper = pending.pop()
+
+        if wrapper.profile_key not in related:
+            related[wrapper.profile_key] = wrapper
+            pending.extend(wrapper.parents)
+
+    return (
+        {key: x.original_profile for key, x in related.items()},
+        {key: [y.profile_key for y in x.parents] for key, x in related.items()},
+    )
+
+
 if __name__ == "__main__":
     pass
@@ -5,13 +5,82 @@ Interacts with the template file to allow interogration of template configuratio
 """
 
 import logging
+import mmap
 import re
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from hashlib import sha256
 from pathlib import Path
 
+from joystick_diagrams import template_engine, utils
 from joystick_diagrams.exceptions import JoystickDiagramsError
+from joystick_diagrams.template_compiler import (
+    CompiledPlaceholder,
+    CompiledTemplate,
+    CompiledTemplateStore,
+)
 
 _logger = logging.getLogger(__name__)
 
+# Placeholder index groups
+PLACEHOLDER_BUTTON_KEY = "buttons"
+PLACEHOLDER_AXIS_KEY = "axis"
+PLACEHOLDER_HAT_KEY = "hats"
+PLACEHOLDER_MODIFIER_KEY = "modifiers"
+PLACEHOLDER_TEMPLATE_KEY = "template"
+PLACEHOLDER_OTHER_KEY = "other"
+
+# Order of the control type flags stored in compiled templates
+PLACEHOLDER_GROUPS = (
+    PLACEHOLDER_BUTTON_KEY,
+    PLACEHOLDER_AXIS_KEY,
+    PLACEHOLDER_HAT_KEY,
+    PLACEHOLDER_MODIFIER_KEY,
+    PLACEHOLDER_TEMPLATE_KEY,
+    PLACEHOLDER_OTHER_KEY,
+)
+
+# User data directory of compiled templates
+COMPILED_TEMPLATE_DIR = "compiled_templates"
+
+# Upper bound of template file data held by the shared template cache
+TEMPLATE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Templates of at least this size are memory mapped when enabled
+MEMORY_MAP_MIN_BYTES = 1024 * 1024
+
+# Groups which are cleared from the template on export when not used
+UNUSED_PLACEHOLDER_KEYS = {
+    PLACEHOLDER_BUTTON_KEY,
+    PLACEHOLDER_AXIS_KEY,
+    PLACEHOLDER_HAT_KEY,
+    PLACEHOLDER_MODIFIER_KEY,
+}
+UNUSED_PLACEHOLDER_FLAGS = sum(
+    1 << PLACEHOLDER_GROUPS.index(x) for x in UNUSED_PLACEHOLDER_KEYS
+)
+
+# Attributes set when template data is loaded, accessing any of these loads a lazy template
+TEMPLATE_DATA_ATTRIBUTES = frozenset(
+    [
+        "placeholders",
+        "placeholder_lengths",
+        "_raw_data",
+        "_data",
+        "_compiled",
+        "_segments",
+        "_content_hash",
+    ]
+)
+
+
+@dataclass
+class TemplateMemoryUsage:
+    heap_bytes: int  # Template text and segments held in memory
+    mapped_bytes: int  # Template file mapped into memory, paged from disk as used
+
 
 class Template:
     BUTTON_KEY = re.compile(r"\bBUTTON_\d+\b", flags=re.IGNORECASE)
@@ -31,14 +100,337 @@ class Template:
     TEMPLATE_NAMING_KEY = re.compile(r"\bTEMPLATE_NAME\b", flags=re.IGNORECASE)
     TEMPLATE_DATE_KEY = re.compile(r"\bCURRENT_DATE\b", flags=re.IGNORECASE)
 
-    def __init__(self, template_path: str):
-        self.raw_data: str = self.get_template_data(Path(template_path))
+    def __init__(
+        self,
+        template_path: str,
+        compiled_templates: CompiledTemplateStore | None = None,
+        memory_mapped: bool = False,
+        lazy: bool = False,
+    ):
+        """Lazy templates hold only their path until the template data is first used"""
+        self.template_path = Path(template_path)
         self.template_file_name = Path(template_path).name
+        self._load_options = (compiled_templates, memory_mapped)
+        self._load_lock = threading.Lock()
+
+        if not lazy:
+            self.load()
+
+    @classmethod
+    def from_data(cls, template_path: str | Path, data: bytes | str) -> "Template":
+        """Creates a template from data already read from its file, rather than reading the file again
+
+        Bytes are decoded as when loaded from the file, text is used as given
+        """
+        template = cls(template_path, lazy=True)
+        template.raw_data = (
+            data if isinstance(data, str) else template.decode_template_data(data)
+        )
+        return template
+
+    def __getattr__(self, name: str):
+        # Only called for attributes not yet set, so a lazy template loads on first use of its data
+        if name not in TEMPLATE_DATA_ATTRIBUTES:
+            raise AttributeError(name)
+
+        with self._load_lock:
+            if not self.loaded:
+                self.load()
+
+        try:
+            return self.__dict__[name]
+        except KeyError as e:
+            raise AttributeError(name) from e
+
+    @property
+    def loaded(self) -> bool:
+        return "placeholders" in self.__dict__
+
+    def load(self):
+        compiled_templates, memory_mapped = self._load_options
+
+        if compiled_templates is None and not memory_mapped:
+            self.raw_data: str = self.get_template_data(self.template_path)
+        else:
+            self.load_data(compiled_templates, memory_mapped)
+
+    @property
+    def raw_data(self) -> str:
+        if self._raw_data is None:
+            self._raw_data = self.decode_template_data(self._data)
+        return self._raw_data
+
+    @raw_data.setter
+    def raw_data(self, value: str):
+        self._raw_data: str | None = value
+        self._data: bytes | mmap.mmap | None = None
+        self._compiled: CompiledTemplate | None = None
+        self._segments: template_engine.TemplateSegments | None = None
+        self._content_hash: str | None = None
+        placeholders, self.placeholder_lengths = self.index_placeholders(value)
+        # Set last as it marks the template as loaded
+        self.placeholders = placeholders
+
+    @property
+    def memory_mapped(self) -> bool:
+        return isinstance(self._data, mmap.mmap)
+
+    @property
+    def content_hash(self) -> str:
+        "Returns a SHA256 hash of the template data"
+        if self._content_hash is None:
+            data = self.raw_data.encode("utf-8") if self._data is None else self._data
+            self._content_hash = sha256(data).hexdigest()
+        return self._content_hash
+
+    def memory_usage(self) -> TemplateMemoryUsage:
+        """Approximates the memory used by the template data and export segments, without loading a lazy template"""
+        if not self.loaded:
+            return TemplateMemoryUsage(0, 0)
+
+        held = [self._raw_data] if self._raw_data is not None else []
+
+        if self._data is not None and not self.memory_mapped:
+            held.append(self._data)
+
+        if self._segments is not None:
+            held.extend(self._segments.literals)
+
+        return TemplateMemoryUsage(
+            sum(sys.getsizeof(x) for x in held),
+            len(self._data) if self.memory_mapped else 0,
+        )
+
+    @property
+    def segments(self) -> template_engine.TemplateSegments:
+        "Returns the template split into literal and placeholder segments for export"
+        if self._segments is None:
+            self._segments = self.create_segments()
+        return self._segments
+
+    def index_placeholders(
+        self, data: str
+    ) -> tuple[dict[str, dict[str, list[int]]], dict[int, int]]:
+        """Scans template data once, indexing each placeholder by its control type
+
+        Returns dict of control type, to lower cased placeholder, to offsets within the data. Also returns the length of each placeholder at its offset, where lower casing changed its length
+        """
+        index: dict[str, dict[str, list[int]]] = {
+            PLACEHOLDER_BUTTON_KEY: {},
+            PLACEHOLDER_AXIS_KEY: {},
+            PLACEHOLDER_HAT_KEY: {},
+            PLACEHOLDER_MODIFIER_KEY: {},
+            PLACEHOLDER_TEMPLATE_KEY: {},
+            PLACEHOLDER_OTHER_KEY: {},
+        }
+        lengths: dict[int, int] = {}
+
+        for match in template_engine.PLACEHOLDER_KEY.finditer(data):
+            placeholder = match.group()
+            key = placeholder.lower()
+
+            # Some characters lower case to more than one, e.g. İ
+            if len(key) != len(placeholder):
+                lengths[match.start()] = len(placeholder)
+
+            for placeholder_type in self.resolve_placeholder_types(placeholder):
+                index[placeholder_type].setdefault(key, []).append(match.start())
+
+        return index, lengths
+
+    def resolve_placeholder_types(self, placeholder: str) -> list[str]:
+        """Resolves the control types a placeholder belongs to"""
+        placeholder_types = []
+
+        if self.BUTTON_KEY.fullmatch(placeholder):
+            placeholder_types.append(PLACEHOLDER_BUTTON_KEY)
+
+        if self.AXIS_KEY.fullmatch(placeholder):
+            placeholder_types.append(PLACEHOLDER_AXIS_KEY)
+
+        if self.HAT_KEY.fullmatch(placeholder):
+            placeholder_types.append(PLACEHOLDER_HAT_KEY)
+
+        if any(key.fullmatch(placeholder) for key in self.MODIFIER_KEYS):
+            placeholder_types.append(PLACEHOLDER_MODIFIER_KEY)
+
+        if self.TEMPLATE_NAMING_KEY.fullmatch(
+            placeholder
+        ) or self.TEMPLATE_DATE_KEY.fullmatch(placeholder):
+            placeholder_types.append(PLACEHOLDER_TEMPLATE_KEY)
+
+        return placeholder_types or [PLACEHOLDER_OTHER_KEY]
+
+    def load_data(
+        self,
+        compiled_templates: CompiledTemplateStore | None,
+        memory_mapped: bool,
+    ):
+        """Loads the template from the file bytes, using its compiled form where available
+
+        Memory mapped templates are scanned without decoding, and their segments are views of the mapped file
+        """
+        data = self.map_template_data(self.template_path) if memory_mapped else None
+        source = (
+            data if data is not None else self.get_template_bytes(self.template_path)
+        )
+        source_hash = sha256(source).digest()
+        compiled = compiled_templates.load(source_hash) if compiled_templates else None
+
+        if data is None:
+            # Matches the newline handling of reading the template as text
+            data = source.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+            if compiled is None:
+                _logger.debug(f"Compiling template {self.template_path}")
+                self.raw_data = self.decode_template_data(data)
+
+                if compiled_templates:
+                    compiled_templates.save(self.compile(source_hash))
+                return
+
+        if compiled is None:
+            compiled = self.compile_data(data, source_hash)
+
+            if compiled_templates:
+                compiled_templates.save(compiled)
+
+        self._data = data
+        self._raw_data = None
+        self._compiled = compiled
+        self._segments = None
+        self._content_hash = None
+        # Compiled placeholders are ASCII, so are the same length as their keys
+        self.placeholder_lengths = {}
+        self.placeholders = self.index_compiled_placeholders(compiled)
+
+    def compile(self, source_hash: bytes) -> CompiledTemplate:
+        """Creates the compiled form of the template from its placeholder index
+
+        As with compile_data, placeholders containing characters outside ASCII are left out as these are never substituted
+        """
+        positions: dict[int, tuple[str, int]] = {}
+
+        for group, placeholders in self.placeholders.items():
+            flag = 1 << PLACEHOLDER_GROUPS.index(group)
+
+            for key, offsets in placeholders.items():
+                for offset in offsets:
+                    _, types = positions.get(offset, (key, 0))
+                    positions[offset] = (key, types | flag)
+
+        keys: dict[str, int] = {}
+        compiled_placeholders = []
+        byte_offset = 0
+        position = 0
+
+        for offset, (key, types) in sorted(positions.items()):
+            placeholder = self.raw_data[
+                offset : offset + self.placeholder_lengths.get(offset, len(key))
+            ]
+
+            if not placeholder.isascii():
+                continue
+
+            byte_offset += len(self.raw_data[position:offset].encode("utf-8"))
+            position = offset
+
+            compiled_placeholders.append(
+                CompiledPlaceholder(
+                    byte_offset,
+                    len(placeholder),
+                    offset,
+                    keys.setdefault(key, len(keys)),
+                    types,
+                )
+            )
+
+        return CompiledTemplate(source_hash, tuple(compiled_placeholders), tuple(keys))
+
+    def compile_data(
+        self, data: bytes | mmap.mmap, source_hash: bytes
+    ) -> CompiledTemplate:
+        """Creates the compiled form of the template by scanning UTF-8 data without decoding it"""
+        keys: dict[str, int] = {}
+        compiled_placeholders = []
+
+        for (
+            byte_offset,
+            byte_length,
+            offset,
+            placeholder,
+        ) in template_engine.scan_placeholders(data):
+            types = 0
+
+            for placeholder_type in self.resolve_placeholder_types(placeholder):
+                types |= 1 << PLACEHOLDER_GROUPS.index(placeholder_type)
+
+            compiled_placeholders.append(
+                CompiledPlaceholder(
+                    byte_offset,
+                    byte_length,
+                    offset,
+                    keys.setdefault(placeholder.lower(), len(keys)),
+                    types,
+                )
+            )
+
+        return CompiledTemplate(source_hash, tuple(compiled_placeholders), tuple(keys))
+
+    def index_compiled_placeholders(
+        self, compiled: CompiledTemplate
+    ) -> dict[str, dict[str, list[int]]]:
+        """Recreates the placeholder index from a compiled template without scanning the data"""
+        index: dict[str, dict[str, list[int]]] = {x: {} for x in PLACEHOLDER_GROUPS}
+
+        for placeholder in compiled.placeholders:
+            key = compiled.keys[placeholder.key_id]
+
+            for bit, group in enumerate(PLACEHOLDER_GROUPS):
+                if placeholder.types & 1 << bit:
+                    index[group].setdefault(key, []).append(placeholder.offset)
+
+        return index
+
+    def create_segments(self) -> template_engine.TemplateSegments:
+        """Creates the export segments from the placeholder index"""
+        if self.memory_mapped:
+            return template_engine.build_mapped_segments(
+                memoryview(self._data),
+                (
+                    (
+                        x.byte_offset,
+                        x.byte_length,
+                        bool(x.types & UNUSED_PLACEHOLDER_FLAGS),
+                    )
+                    for x in self._compiled.placeholders
+                ),
+            )
+
+        positions: dict[int, tuple[int, bool]] = {}
+
+        for placeholder_type, placeholders in self.placeholders.items():
+            blank_when_unused = placeholder_type in UNUSED_PLACEHOLDER_KEYS
+
+            for key, offsets in placeholders.items():
+                for offset in offsets:
+                    _, blank = positions.get(offset, (0, False))
+                    positions[offset] = (
+                        self.placeholder_lengths.get(offset, len(key)),
+                        blank or blank_when_unused,
+                    )
+
+        return template_engine.build_segments(
+            self.raw_data,
+            (
+                (offset, length, blank)
+                for offset, (length, blank) in sorted(positions.items())
+            ),
+        )
 
     def get_template_data(self, template_path: Path):
         try:
             with Path(template_path).open("r", encoding="utf-8") as f:
-                # TODO increased validation to check its a proper template file
                 return f.read()
         except Exception as e:
             _logger.error(e)
@@ -46,57 +438,233 @@ class Template:
                 "There was an issue reading the template file"
             ) from e
 
-    def get_template_modifiers(self) -> set[str]:
-        "Returns the available MODIFIER NUMBERS supported for a given CONTROL from the template"
+    def map_template_data(self, template_path: Path) -> mmap.mmap | None:
+        """Memory maps the template file, returns None where it cannot be used without translating newlines"""
+        try:
+            with Path(template_path).open("rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            return None
+        except OSError as e:
+            _logger.error(e)
+            raise JoystickDiagramsError(
+                "There was an issue reading the template file"
+            ) from e
+
+        if data.find(b"\r") != -1:
+            _logger.debug(
+                f"Template {template_path} is not mapped as it has CR newlines"
+            )
+            data.close()
+            return None
+
+        return data
+
+    def get_template_bytes(self, template_path: Path) -> bytes:
+        try:
+            return Path(template_path).read_bytes()
+        except OSError as e:
+            _logger.error(e)
+            raise JoystickDiagramsError(
+                "There was an issue reading the template file"
+            ) from e
 
-        result = []
-        for modifier_search_key in self.MODIFIER_KEYS:
-            matches = re.findall(modifier_search_key, self.raw_data)
-            result.extend(matches)
+    def decode_template_data(self, data: bytes | mmap.mmap) -> str:
+        try:
+            return str(data, "utf-8").replace("\r\n", "\n").replace("\r", "\n")
+        except UnicodeDecodeError as e:
+            _logger.error(e)
+            raise JoystickDiagramsError(
+                "There was an issue reading the template file"
+            ) from e
 
-        return {x.lower() for x in result}
+    def get_template_modifiers(self) -> set[str]:
+        "Returns the available MODIFIER NUMBERS supported for a given CONTROL from the template"
+        return set(self.placeholders[PLACEHOLDER_MODIFIER_KEY])
 
     def get_template_hats(self) -> set[str]:
         "Returns the available HAT controls from the template"
-        return {x.lower() for x in re.findall(self.HAT_KEY, self.raw_data)}
+        return set(self.placeholders[PLACEHOLDER_HAT_KEY])
 
     def get_template_axis(self) -> set[str]:
         "Returns the available AXIS controls from the template"
-        return {x.lower() for x in re.findall(self.AXIS_KEY, self.raw_data)}
+        return set(self.placeholders[PLACEHOLDER_AXIS_KEY])
 
     def get_template_buttons(self) -> set[str]:
         "Returns the available BUTTON controls from the template"
-        return {x.lower() for x in re.findall(self.BUTTON_KEY, self.raw_data)}
+        return set(self.placeholders[PLACEHOLDER_BUTTON_KEY])
 
     @property
     def template_name(self) -> bool:
         "Checks if the template supports naming"
-        return bool(re.search(self.TEMPLATE_NAMING_KEY, self.raw_data))
+        return "template_name" in self.placeholders[PLACEHOLDER_TEMPLATE_KEY]
 
     @property
     def date(self) -> bool:
         "Checks if the template supports dating"
-        return bool(re.search(self.TEMPLATE_DATE_KEY, self.raw_data))
+        return "current_date" in self.placeholders[PLACEHOLDER_TEMPLATE_KEY]
 
     @property
     def button_count(self) -> int:
         "Returns the number of buttons available"
-        return len(self.get_template_buttons())
+        return len(self.placeholders[PLACEHOLDER_BUTTON_KEY])
 
     @property
     def axis_count(self) -> int:
         "Returns the number of axis available"
-        return len(self.get_template_axis())
+        return len(self.placeholders[PLACEHOLDER_AXIS_KEY])
 
     @property
     def hat_count(self) -> int:
         "Returns the number of hats available"
-        return len(self.get_template_hats())
+        return len(self.placeholders[PLACEHOLDER_HAT_KEY])
 
     @property
     def modifier_count(self) -> int:
         "Returns the number of modifiers available"
-        return len(self.get_template_modifiers())
+        return len(self.placeholders[PLACEHOLDER_MODIFIER_KEY])
+
+
+class TemplateCache:
+    """Least recently used cache of loaded Templates, bounded by the total size of the cached files.
+
+    Templates are keyed by resolved path, and reloaded when the file modified time or size changes on disk
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = TEMPLATE_CACHE_MAX_BYTES,
+        compiled_templates: CompiledTemplateStore | None = None,
+        memory_map_min_bytes: int | None = None,
+    ):
+        self.max_bytes = max_bytes
+        self.compiled_templates = compiled_templates
+        self.memory_map_min_bytes = memory_map_min_bytes
+        self.total_bytes = 0
+        self._templates: OrderedDict[Path, tuple[tuple[int, int], Template]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._templates)
+
+    def get(self, template_path: str | Path, lazy: bool = False) -> Template:
+        """Returns the Template for a path, loading it where not cached or changed on disk
+
+        Lazy templates are loaded when their data is first used
+        """
+        path = Path(template_path).resolve()
+
+        try:
+            stat = path.stat()
+        except OSError as e:
+            _logger.error(e)
+            raise JoystickDiagramsError(
+                "There was an issue reading the template file"
+            ) from e
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._templates.get(path)
+
+            if cached and cached[0] == signature:
+                self._templates.move_to_end(path)
+                return cached[1]
+
+            if cached:
+                _logger.debug(f"Template {path} changed on disk so will be reloaded")
+                self._remove(path)
+
+            template = Template(
+                path,
+                self.compiled_templates,
+                memory_mapped=self.memory_map_min_bytes is not None
+                and stat.st_size >= self.memory_map_min_bytes,
+                lazy=lazy,
+            )
+
+            if template.loaded:
+                _logger.debug(f"Loaded template {path} using {template.memory_usage()}")
+
+            self._templates[path] = (signature, template)
+            self.total_bytes += stat.st_size
+            self._evict()
+
+            return template
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+            self.total_bytes = 0
+
+    def memory_usage(self) -> dict[Path, TemplateMemoryUsage]:
+        "Returns the memory used by each cached template"
+        with self._lock:
+            return {
+                path: template.memory_usage()
+                for path, (_, template) in self._templates.items()
+            }
+
+    def _remove(self, path: Path):
+        (_, size), _ = self._templates.pop(path)
+        self.total_bytes -= size
+
+    def _evict(self):
+        """Removes least recently used templates until within max_bytes, always keeping the latest"""
+        while self.total_bytes > self.max_bytes and len(self._templates) > 1:
+            self._remove(next(iter(self._templates)))
+
+
+_template_cache = TemplateCache()
+
+
+def get_template(template_path: str | Path, lazy: bool = False) -> Template:
+    """Returns a Template from the shared process wide cache"""
+    return _template_cache.get(template_path, lazy)
+
+
+def clear_template_cache():
+    _template_cache.clear()
+
+
+def enable_compiled_templates(directory: Path | None = None):
+    """Loads templates for the shared cache from their compiled form, compiling them on first load"""
+    _template_cache.compiled_templates = CompiledTemplateStore(
+        directory or utils.data_root().joinpath(COMPILED_TEMPLATE_DIR)
+    )
+
+
+def enable_memory_mapped_templates(min_bytes: int = MEMORY_MAP_MIN_BYTES):
+    """Memory maps templates of at least min_bytes loaded by the shared cache
+
+    Mapped files may not be replaced on Windows while in use, so this is intended for exports rather than template editing
+    """
+    _template_cache.memory_map_min_bytes = min_bytes
+
+
+def get_template_cache_settings() -> tuple[Path | None, int | None]:
+    """Returns the compiled templates directory and memory mapping size of the shared cache, to configure worker processes"""
+    compiled_templates = _template_cache.compiled_templates
+
+    return (
+        compiled_templates.directory if compiled_templates else None,
+        _template_cache.memory_map_min_bytes,
+    )
+
+
+def configure_template_cache(
+    compiled_templates_directory: Path | None, memory_map_min_bytes: int | None
+):
+    """Applies settings from get_template_cache_settings to the shared cache"""
+    _template_cache.compiled_templates = (
+        CompiledTemplateStore(compiled_templates_directory)
+        if compiled_templates_directory
+        else None
+    )
+    _template_cache.memory_map_min_bytes = memory_map_min_bytes
 
 
 if __name__ == "__main__":
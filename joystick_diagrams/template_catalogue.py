@@ -0,0 +1,254 @@
+"""Catalogue of the templates available to assign to devices.
+
+The bundled templates, and any template directories added by the user, are indexed recursively into the database with the hash, size, modified time and controls of each template. Rescans only read templates whose size or modified time has changed, so templates can be listed and queried without walking and parsing every file.
+"""
+
+import json
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass
+from hashlib import sha256
+from pathlib import Path
+
+from joystick_diagrams.compatibility import get_template_controls
+from joystick_diagrams.db import db_template_catalogue
+from joystick_diagrams.db.db_settings import add_update_setting_value, get_setting
+from joystick_diagrams.exceptions import JoystickDiagramsError
+from joystick_diagrams.template import Template
+from joystick_diagrams.utils import find_template_files, install_root
+
+_logger = logging.getLogger(__name__)
+
+TEMPLATE_DIRECTORIES_SETTING_KEY = "template_directories"
+
+
+@dataclass(frozen=True)
+class CatalogueEntry:
+    path: Path
+    directory: Path  # Template directory the template was found in
+    hash: str
+    size: int
+    modified: int  # Modified time in nanoseconds
+    buttons: int
+    axis: int
+    hats: int  # Number of hat switches, rather than hat directions
+    modifiers: int
+    controls: frozenset[str]
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "CatalogueEntry":
+        path, directory, *counts, controls = row
+        return cls(Path(path), Path(directory), *counts, frozenset(controls.split()))
+
+    def to_row(self) -> tuple:
+        return (
+            str(self.path),
+            str(self.directory),
+            self.hash,
+            self.size,
+            self.modified,
+            self.buttons,
+            self.axis,
+            self.hats,
+            self.modifiers,
+            " ".join(sorted(self.controls)),
+        )
+
+
+@dataclass
+class CatalogueScan:
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    failed: int = 0
+
+
+def get_bundled_template_directory() -> Path:
+    return Path(install_root(), "templates").resolve()
+
+
+def get_user_template_directories() -> list[Path]:
+    setting = get_setting(TEMPLATE_DIRECTORIES_SETTING_KEY)
+    return [Path(x) for x in json.loads(setting)] if setting else []
+
+
+def store_user_template_directories(directories: Iterable[str | Path]):
+    add_update_setting_value(
+        TEMPLATE_DIRECTORIES_SETTING_KEY,
+        json.dumps([str(Path(x).resolve()) for x in directories]),
+    )
+
+
+def get_template_directories() -> list[Path]:
+    """Returns the bundled template directory followed by the user template directories"""
+    bundled = get_bundled_template_directory()
+    return [bundled, *(x for x in get_user_template_directories() if x != bundled)]
+
+
+def create_catalogue_entry(path: Path, directory: Path) -> CatalogueEntry:
+    stat = path.stat()
+    data = path.read_bytes()
+    file_hash = sha256(data).hexdigest()
+    template = Template.from_data(path, data)
+
+    return CatalogueEntry(
+        path,
+        directory,
+        file_hash,
+        stat.st_size,
+        stat.st_mtime_ns,
+        template.button_count,
+        template.axis_count,
+        len({x.split("_")[1] for x in template.get_template_hats()}),
+        template.modifier_count,
+        frozenset(get_template_controls(template)),
+    )
+
+
+def scan_directory(directory: Path) -> CatalogueScan:
+    """Updates the catalogue entries of a template directory, reading only templates changed since the last scan"""
+    scan = CatalogueScan()
+    catalogued = {
+        x.path: x
+        for x in map(
+            CatalogueEntry.from_row,
+            db_template_catalogue.get_catalogue_entries(str(directory)),
+        )
+    }
+    changed = []
+
+    for path in find_template_files(directory):
+        entry = catalogued.pop(path, None)
+
+        try:
+            stat = path.stat()
+
+            if (
+                entry is not None
+                and entry.size == stat.st_size
+                and entry.modified == stat.st_mtime_ns
+            ):
+                scan.unchanged += 1
+                continue
+
+            changed.append(create_catalogue_entry(path, directory).to_row())
+        except (OSError, JoystickDiagramsError) as e:
+            _logger.error(f"Unable to catalogue template {path}: {e}")
+            scan.failed += 1
+            continue
+
+        if entry is None:
+            scan.added += 1
+        else:
+            scan.updated += 1
+
+    # Anything not found again has been removed, or failed to be read
+    db_template_catalogue.remove_catalogue_entries([str(x) for x in catalogued])
+    db_template_catalogue.add_update_catalogue_entries(changed)
+    scan.removed = len(catalogued)
+
+    return scan
+
+
+def scan_templates(directories: Iterable[Path] | None = None) -> CatalogueScan:
+    """Updates the catalogue for the given template directories, or all template directories
+
+    Scanning all template directories also removes templates from directories no longer in use
+    """
+    scan_all = directories is None
+    directories = [
+        Path(x).resolve()
+        for x in (get_template_directories() if scan_all else directories)
+    ]
+    scan = CatalogueScan()
+
+    for directory in directories:
+        directory_scan = scan_directory(directory)
+        scan.added += directory_scan.added
+        scan.updated += directory_scan.updated
+        scan.removed += directory_scan.removed
+        scan.unchanged += directory_scan.unchanged
+        scan.failed += directory_scan.failed
+
+    if scan_all:
+        stale = [
+            row[0]
+            for row in db_template_catalogue.get_catalogue_entries()
+            if Path(row[1]) not in directories
+        ]
+        db_template_catalogue.remove_catalogue_entries(stale)
+        scan.removed += len(stale)
+
+    _logger.info(
+        f"Template catalogue updated with {scan.added} added, {scan.updated} updated, {scan.removed} removed and {scan.unchanged} unchanged"
+    )
+
+    return scan
+
+
+def get_catalogued_templates() -> list[CatalogueEntry]:
+    return [
+        CatalogueEntry.from_row(x)
+        for x in db_template_catalogue.get_catalogue_entries()
+    ]
+
+
+def get_catalogued_controls(paths: Iterable[str | Path]) -> dict[Path, frozenset[str]]:
+    """Returns the controls of templates by resolved path, from the catalogue rather than loading the templates
+
+    Templates not yet catalogued, or changed since they were catalogued, are read once and added to the catalogue. Templates which cannot be read are left out
+    """
+    paths = {Path(x).resolve() for x in paths}
+    entries = {
+        x.path: x
+        for x in map(
+            CatalogueEntry.from_row,
+            db_template_catalogue.get_catalogue_entries_by_path(list(map(str, paths))),
+        )
+    }
+    directories = get_template_directories()
+    changed = []
+
+    for path in paths:
+        entry = entries.get(path)
+
+        try:
+            stat = path.stat()
+
+            if (
+                entry is not None
+                and entry.size == stat.st_size
+                and entry.modified == stat.st_mtime_ns
+            ):
+                continue
+
+            # Templates outside the template directories are catalogued by their own directory
+            directory = next(
+                (x for x in directories if path.is_relative_to(x)), path.parent
+            )
+            entries[path] = create_catalogue_entry(path, directory)
+            changed.append(entries[path].to_row())
+        except (OSError, JoystickDiagramsError) as e:
+            _logger.error(f"Unable to catalogue template {path}: {e}")
+            entries.pop(path, None)
+
+    db_template_catalogue.add_update_catalogue_entries(changed)
+
+    return {path: entry.controls for path, entry in entries.items()}
+
+
+def find_templates(
+    min_buttons: int = 0, min_axis: int = 0, min_hats: int = 0, min_modifiers: int = 0
+) -> list[CatalogueEntry]:
+    """Returns the catalogued templates with at least the given number of each control"""
+    return [
+        CatalogueEntry.from_row(x)
+        for x in db_template_catalogue.find_catalogue_entries(
+            min_buttons, min_axis, min_hats, min_modifiers
+        )
+    ]
+
+
+if __name__ == "__main__":
+    pass
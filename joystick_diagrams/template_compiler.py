@@ -0,0 +1,171 @@
+"""Compiled template format, allowing templates to be loaded without scanning them for placeholders.
+
+A compiled template stores the position, lookup key and control types of every placeholder in a template, identified by the SHA256 hash of the template file it was compiled from. Compiled templates are stored by that hash, so an edited template is never matched to an outdated compiled template.
+
+Layout, all integers little endian:
+
+    header       magic, format version, source hash, placeholder count, key count, key data length
+    placeholders byte offset, byte length, character offset, key id, control type flags
+    key offsets  key count + 1 offsets into the key data
+    key data     UTF-8 lower cased placeholder keys
+"""
+
+import logging
+import mmap
+import struct
+from dataclasses import dataclass
+from itertools import pairwise
+from pathlib import Path
+
+from joystick_diagrams import utils
+
+_logger = logging.getLogger(__name__)
+
+COMPILED_TEMPLATE_MAGIC = b"JDTC"
+COMPILED_TEMPLATE_VERSION = 1
+COMPILED_TEMPLATE_SUFFIX = ".jdtc"
+
+HEADER = struct.Struct("<4sH32sIII")
+PLACEHOLDER = struct.Struct("<IIIIB")
+KEY_OFFSET = struct.Struct("<I")
+
+
+@dataclass(frozen=True)
+class CompiledPlaceholder:
+    byte_offset: int
+    byte_length: int
+    offset: int  # Character offset within the decoded template
+    key_id: int
+    types: int  # Bit flags of the control types the placeholder belongs to
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    source_hash: bytes
+    placeholders: tuple[CompiledPlaceholder, ...]
+    keys: tuple[str, ...]
+
+
+def dumps(compiled: CompiledTemplate) -> bytes:
+    encoded_keys = [x.encode("utf-8") for x in compiled.keys]
+    key_offsets = [0]
+
+    for key in encoded_keys:
+        key_offsets.append(key_offsets[-1] + len(key))
+
+    return b"".join(
+        [
+            HEADER.pack(
+                COMPILED_TEMPLATE_MAGIC,
+                COMPILED_TEMPLATE_VERSION,
+                compiled.source_hash,
+                len(compiled.placeholders),
+                len(compiled.keys),
+                key_offsets[-1],
+            ),
+            *(
+                PLACEHOLDER.pack(
+                    x.byte_offset, x.byte_length, x.offset, x.key_id, x.types
+                )
+                for x in compiled.placeholders
+            ),
+            *(KEY_OFFSET.pack(x) for x in key_offsets),
+            *encoded_keys,
+        ]
+    )
+
+
+def loads(buffer: bytes | mmap.mmap) -> CompiledTemplate:
+    """Reads a compiled template, raising ValueError where it is invalid or from another format version"""
+    view = memoryview(buffer)
+
+    try:
+        magic, version, source_hash, placeholder_count, key_count, key_data_length = (
+            HEADER.unpack_from(view)
+        )
+
+        if magic != COMPILED_TEMPLATE_MAGIC or version != COMPILED_TEMPLATE_VERSION:
+            raise ValueError("Unsupported compiled template format")
+
+        position = HEADER.size
+        placeholders_end = position + placeholder_count * PLACEHOLDER.size
+        key_offsets_end = placeholders_end + (key_count + 1) * KEY_OFFSET.size
+
+        if len(view) != key_offsets_end + key_data_length:
+            raise ValueError("Compiled template is truncated")
+
+        placeholders = tuple(
+            CompiledPlaceholder(*x)
+            for x in PLACEHOLDER.iter_unpack(view[position:placeholders_end])
+        )
+        key_offsets = [
+            x for (x,) in KEY_OFFSET.iter_unpack(view[placeholders_end:key_offsets_end])
+        ]
+        key_data = bytes(view[key_offsets_end:])
+        keys = tuple(
+            key_data[start:end].decode("utf-8") for start, end in pairwise(key_offsets)
+        )
+
+        if any(x.key_id >= key_count for x in placeholders):
+            raise ValueError("Compiled template references an unknown key")
+
+        return CompiledTemplate(bytes(source_hash), placeholders, keys)
+
+    except struct.error as e:
+        raise ValueError(f"Compiled template is invalid: {e}") from e
+    finally:
+        view.release()
+
+
+class CompiledTemplateStore:
+    """Directory of compiled templates named by the hash of their source template"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def path_for(self, source_hash: bytes) -> Path:
+        return self.directory.joinpath(f"{source_hash.hex()}{COMPILED_TEMPLATE_SUFFIX}")
+
+    def load(self, source_hash: bytes) -> CompiledTemplate | None:
+        """Memory maps and reads the compiled template for a source hash, returns None where none is available"""
+        path = self.path_for(source_hash)
+
+        try:
+            with (
+                open(path, "rb") as f,
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer,
+            ):
+                compiled = loads(buffer)
+
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            _logger.warning(f"Compiled template {path} could not be read: {e}")
+            return None
+
+        if compiled.source_hash != source_hash:
+            _logger.warning(f"Compiled template {path} does not match its template")
+            return None
+
+        return compiled
+
+    def save(self, compiled: CompiledTemplate) -> None:
+        path = self.path_for(compiled.source_hash)
+        temp_file = path.with_suffix(".tmp")
+
+        utils.create_directory(self.directory)
+
+        try:
+            temp_file.write_bytes(dumps(compiled))
+            temp_file.replace(path)
+        except OSError as e:
+            _logger.error(f"Compiled template {path} could not be saved: {e}")
+            temp_file.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        for compiled_file in self.directory.glob(f"*{COMPILED_TEMPLATE_SUFFIX}"):
+            compiled_file.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,203 @@
+"""Single pass substitution engine for Joystick Diagrams templates.
+
+A template is tokenized once into alternating literal text and placeholder segments, which can then be rendered against a dictionary of replacement values without rescanning the document for each key.
+
+Placeholders are matched as whole words in the same way as the \\bKEY\\b expressions used by the export replace functions, and resolved case insensitively.
+"""
+
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+# Any whole word made of a letter prefix and an underscore, covers BUTTON_/AXIS_/POV_ keys, their _Modifier_ variants, TEMPLATE_NAME and CURRENT_DATE
+PLACEHOLDER_KEY = re.compile(r"\b[a-zA-Z]+_\w*\b", flags=re.IGNORECASE)
+
+# Equivalent of PLACEHOLDER_KEY for UTF-8 data, word characters outside ASCII are checked separately
+PLACEHOLDER_KEY_BYTES = re.compile(rb"\b[a-zA-Z]+_\w*\b")
+UTF8_CONTINUATION_BYTES = re.compile(rb"[\x80-\xbf]+")
+
+
+@dataclass(frozen=True)
+class Placeholder:
+    text: str  # Placeholder as written in the template
+    key: str  # Lookup key for substitution values
+    blank_when_unused: bool  # Placeholder is removed when no value is supplied
+
+
+@dataclass(frozen=True)
+class TemplateSegments:
+    """A tokenized template.
+
+    There is always one more literal than placeholders, with placeholders sitting between their neighbouring literals.
+    """
+
+    literals: tuple[str, ...]
+    placeholders: tuple[Placeholder, ...]
+
+    def iter_render(self, substitutions: dict[str, str]) -> Iterator[str]:
+        """Yields the rendered template in segments, resolving each placeholder from substitutions
+
+        Substitution keys must be lower case
+        """
+        literals = self.literals
+        yield literals[0]
+
+        for index, placeholder in enumerate(self.placeholders, 1):
+            value = substitutions.get(placeholder.key)
+
+            if value is None:
+                value = "" if placeholder.blank_when_unused else placeholder.text
+
+            yield value
+            yield literals[index]
+
+    def render(self, substitutions: dict[str, str]) -> str:
+        """Returns the rendered template as a string"""
+        return "".join(self.iter_render(substitutions))
+
+
+@dataclass(frozen=True)
+class MappedTemplateSegments(TemplateSegments):
+    """A tokenized template whose literals are views of UTF-8 data, decoded only as they are rendered"""
+
+    literals: tuple[memoryview, ...]
+
+    def iter_render(self, substitutions: dict[str, str]) -> Iterator[str]:
+        literals = self.literals
+        yield str(literals[0], "utf-8")
+
+        for index, placeholder in enumerate(self.placeholders, 1):
+            value = substitutions.get(placeholder.key)
+
+            if value is None:
+                value = "" if placeholder.blank_when_unused else placeholder.text
+
+            yield value
+            yield str(literals[index], "utf-8")
+
+
+def tokenize(data: str, unused_keys: Iterable[re.Pattern]) -> TemplateSegments:
+    """Splits template data into literal and placeholder segments in a single scan
+
+    Placeholders fully matching one of unused_keys are blanked when rendered without a value
+    """
+    unused_key = combine_keys(unused_keys)
+
+    return build_segments(
+        data,
+        (
+            (
+                match.start(),
+                match.end() - match.start(),
+                bool(unused_key.fullmatch(match.group())),
+            )
+            for match in PLACEHOLDER_KEY.finditer(data)
+        ),
+    )
+
+
+def blank_placeholders(data: str, unused_keys: Iterable[re.Pattern]) -> str:
+    """Removes every placeholder fully matching one of unused_keys in a single scan of the data"""
+    unused_key = combine_keys(unused_keys)
+
+    def blank(match: re.Match) -> str:
+        placeholder = match.group()
+        return "" if unused_key.fullmatch(placeholder) else placeholder
+
+    return PLACEHOLDER_KEY.sub(blank, data)
+
+
+def combine_keys(keys: Iterable[re.Pattern]) -> re.Pattern:
+    """Combines key patterns into a single case insensitive pattern matching any of them"""
+    return re.compile(
+        "|".join(f"(?:{key.pattern})" for key in keys) or r"(?!)",
+        flags=re.IGNORECASE,
+    )
+
+
+def build_segments(
+    data: str, placeholders: Iterable[tuple[int, int, bool]]
+) -> TemplateSegments:
+    """Splits template data into segments from known placeholder positions
+
+    Placeholders are supplied as (offset, length, blank_when_unused) in ascending offset order
+    """
+    literals = []
+    segment_placeholders = []
+    position = 0
+
+    for offset, length, blank_when_unused in placeholders:
+        text = data[offset : offset + length]
+
+        literals.append(data[position:offset])
+        segment_placeholders.append(Placeholder(text, text.lower(), blank_when_unused))
+        position = offset + length
+
+    literals.append(data[position:])
+
+    return TemplateSegments(tuple(literals), tuple(segment_placeholders))
+
+
+def build_mapped_segments(
+    data: memoryview, placeholders: Iterable[tuple[int, int, bool]]
+) -> MappedTemplateSegments:
+    """Splits UTF-8 template data into segments from known placeholder positions, without copying the literals
+
+    Placeholders are supplied as (byte offset, byte length, blank_when_unused) in ascending offset order
+    """
+    literals = []
+    segment_placeholders = []
+    position = 0
+
+    for offset, length, blank_when_unused in placeholders:
+        text = str(data[offset : offset + length], "utf-8")
+
+        literals.append(data[position:offset])
+        segment_placeholders.append(Placeholder(text, text.lower(), blank_when_unused))
+        position = offset + length
+
+    literals.append(data[position:])
+
+    return MappedTemplateSegments(tuple(literals), tuple(segment_placeholders))
+
+
+def scan_placeholders(data: bytes | memoryview) -> Iterator[tuple[int, int, int, str]]:
+    """Finds placeholders in UTF-8 template data without decoding it
+
+    Yields (byte offset, byte length, character offset, placeholder) for the placeholders PLACEHOLDER_KEY finds in the decoded text, excluding any containing characters outside ASCII as these are never substituted
+    """
+    continuation_bytes = UTF8_CONTINUATION_BYTES.finditer(data)
+    continuation = next(continuation_bytes, None)
+    skipped = 0  # Continuation bytes before the current placeholder
+
+    for match in PLACEHOLDER_KEY_BYTES.finditer(data):
+        start, end = match.span()
+
+        # Placeholders joined to a word character outside ASCII are part of a longer word
+        if is_word_character_before(data, start) or is_word_character_at(data, end):
+            continue
+
+        while continuation and continuation.start() < start:
+            skipped += continuation.end() - continuation.start()
+            continuation = next(continuation_bytes, None)
+
+        yield start, end - start, start - skipped, match.group().decode("ascii")
+
+
+def is_word_character_before(data: bytes | memoryview, offset: int) -> bool:
+    # UTF-8 characters are at most 4 bytes, partial characters are dropped when decoding
+    character = str(data[max(offset - 4, 0) : offset], "utf-8", "ignore")[-1:]
+    return is_word_character(character)
+
+
+def is_word_character_at(data: bytes | memoryview, offset: int) -> bool:
+    character = str(data[offset : offset + 4], "utf-8", "ignore")[:1]
+    return is_word_character(character)
+
+
+def is_word_character(character: str) -> bool:
+    return character.isalnum() or character == "_"
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,192 @@
+"""Recommends templates for devices which have not been assigned one.
+
+Every template is scored against a device by how well its file name matches the device name, the share of the device's controls it has placeholders for, and the share of its own controls the device would use. The controls of each template are read once, so devices are scored against every template together using a compatibility matrix.
+"""
+
+import logging
+import os
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from functools import cached_property
+from pathlib import Path
+
+from joystick_diagrams.compatibility import (
+    create_compatibility_matrix,
+    get_device_controls,
+    get_template_controls,
+)
+from joystick_diagrams.exceptions import JoystickDiagramsError
+from joystick_diagrams.input.device import Device_
+from joystick_diagrams.template import get_template
+from joystick_diagrams.template_catalogue import (
+    CatalogueEntry,
+    get_bundled_template_directory,
+)
+from joystick_diagrams.utils import find_template_files
+
+_logger = logging.getLogger(__name__)
+
+NAME_TOKEN = re.compile(r"[a-z0-9]+")
+
+NAME_WEIGHT = 0.6
+COVERAGE_WEIGHT = 0.3
+UTILISATION_WEIGHT = 0.1
+
+DEFAULT_RECOMMENDATIONS = 3
+DEFAULT_MIN_SCORE = 0.5
+
+
+def normalise_name(name: str) -> str:
+    """Lower cases a name, joining abbreviations such as H.O.T.A.S and separating words"""
+    return " ".join(NAME_TOKEN.findall(name.lower().replace(".", "")))
+
+
+def name_similarity(device_name: str, template_name: str) -> float:
+    """Scores from 0 to 1 how alike two normalised names are, favouring shared words over shared characters"""
+    device_words = set(device_name.split())
+    template_words = set(template_name.split())
+
+    if not device_words or not template_words:
+        return 0.0
+
+    shared_words = (
+        2
+        * len(device_words & template_words)
+        / (len(device_words) + len(template_words))
+    )
+    shared_characters = SequenceMatcher(None, device_name, template_name).ratio()
+
+    return 0.75 * shared_words + 0.25 * shared_characters
+
+
+@dataclass(frozen=True)
+class TemplateCandidate:
+    path: Path
+    name: str  # Normalised name, including the folder of the template
+    controls: frozenset[str] = field(repr=False)
+
+
+def create_candidate(
+    template_path: Path, template_directory: Path, controls: frozenset[str]
+) -> TemplateCandidate:
+    name = template_path.relative_to(template_directory).with_suffix("")
+    return TemplateCandidate(template_path, normalise_name(os.fsdecode(name)), controls)
+
+
+@dataclass(frozen=True)
+class TemplateRecommendation:
+    template_path: Path
+    score: float
+    name_similarity: float
+    coverage: float  # Share of the device controls the template supports
+    missing: frozenset[str]
+
+
+class TemplateRecommender:
+    """Scores the templates in a directory against devices, reading each template once"""
+
+    def __init__(self, template_directory: str | Path | None = None):
+        self.template_directory = Path(
+            template_directory or get_bundled_template_directory()
+        )
+
+    @classmethod
+    def from_catalogue(cls, entries: list[CatalogueEntry]) -> "TemplateRecommender":
+        """Creates a recommender for catalogued templates, without reading the templates"""
+        recommender = cls()
+        recommender.candidates = [
+            create_candidate(x.path, x.directory, x.controls) for x in entries
+        ]
+        return recommender
+
+    @cached_property
+    def candidates(self) -> list[TemplateCandidate]:
+        candidates = []
+
+        for template_path in find_template_files(self.template_directory):
+            try:
+                controls = get_template_controls(get_template(template_path))
+            except JoystickDiagramsError as e:
+                _logger.warning(
+                    f"Template {template_path} will not be recommended: {e}"
+                )
+                continue
+
+            candidates.append(
+                create_candidate(
+                    template_path, self.template_directory, frozenset(controls)
+                )
+            )
+
+        _logger.debug(f"Loaded {len(candidates)} templates to recommend")
+
+        return candidates
+
+    def recommend(
+        self, devices: Sequence[Device_], limit: int = DEFAULT_RECOMMENDATIONS
+    ) -> dict[str, list[TemplateRecommendation]]:
+        """Returns the best scoring templates for each device by GUID, best first
+
+        Devices appear once per profile, so the controls of devices sharing a GUID are scored together
+        """
+        candidates = self.candidates
+        device_names: dict[str, str] = {}
+        combined_controls: dict[str, frozenset[str]] = {}
+
+        for device_obj in devices:
+            device_names.setdefault(device_obj.guid, normalise_name(device_obj.name))
+            combined_controls[device_obj.guid] = combined_controls.get(
+                device_obj.guid, frozenset()
+            ) | get_device_controls(device_obj)
+
+        device_controls = list(combined_controls.values())
+        matrix = create_compatibility_matrix(
+            device_controls, [set(x.controls) for x in candidates]
+        )
+        missing_counts = matrix.missing_counts()
+        recommendations = {}
+
+        for device_index, guid in enumerate(combined_controls):
+            device_name = device_names[guid]
+            controls = len(device_controls[device_index])
+            scored = []
+
+            for template_index, candidate in enumerate(candidates):
+                supported = controls - missing_counts[device_index][template_index]
+                coverage = supported / controls if controls else 1.0
+                utilisation = (
+                    supported / len(candidate.controls) if candidate.controls else 0.0
+                )
+                similarity = name_similarity(device_name, candidate.name)
+
+                scored.append(
+                    (
+                        NAME_WEIGHT * similarity
+                        + COVERAGE_WEIGHT * coverage
+                        + UTILISATION_WEIGHT * utilisation,
+                        similarity,
+                        coverage,
+                        template_index,
+                    )
+                )
+
+            scored.sort(key=lambda x: x[0], reverse=True)
+
+            recommendations[guid] = [
+                TemplateRecommendation(
+                    candidates[template_index].path,
+                    score,
+                    similarity,
+                    coverage,
+                    frozenset(matrix.missing_controls(device_index, template_index)),
+                )
+                for score, similarity, coverage, template_index in scored[:limit]
+            ]
+
+        return recommendations
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,260 @@
+"""Validates templates, so broken templates are found before they are exported.
+
+Templates are checked to be well formed XML, and their placeholders checked for keys the export would not handle as intended: malformed control keys, controls not recognised by the placeholder expressions, unknown modifier items, repeated controls and placeholders within attributes.
+
+Results are stored by the hash of the template file, so unchanged templates are not validated again. Templates which need validating are checked in a pool of worker processes.
+"""
+
+import json
+import logging
+import multiprocessing
+import re
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass
+from hashlib import sha256
+from pathlib import Path
+from xml.etree import ElementTree
+
+from joystick_diagrams.db import db_template_validation
+from joystick_diagrams.template import (
+    PLACEHOLDER_AXIS_KEY,
+    PLACEHOLDER_BUTTON_KEY,
+    PLACEHOLDER_HAT_KEY,
+    PLACEHOLDER_MODIFIER_KEY,
+    PLACEHOLDER_OTHER_KEY,
+    Template,
+)
+from joystick_diagrams.template_engine import PLACEHOLDER_KEY
+from joystick_diagrams.utils import setup_worker_logging
+
+_logger = logging.getLogger(__name__)
+
+# Increased when the checks change, so stored results from earlier checks are not used
+VALIDATOR_VERSION = 1
+
+ISSUE_ERROR = "error"
+ISSUE_WARNING = "warning"
+
+CONTROL_GROUPS = {
+    PLACEHOLDER_BUTTON_KEY,
+    PLACEHOLDER_AXIS_KEY,
+    PLACEHOLDER_HAT_KEY,
+    PLACEHOLDER_MODIFIER_KEY,
+}
+CONTROL_PREFIXES = ("button", "axis", "pov")
+
+# Keys produced for device inputs, including their modifier variants
+DEVICE_INPUT_KEY = re.compile(
+    r"(BUTTON_\d+|AXIS_SLIDER_\d+|AXIS_[a-z]+|POV_\d+_[URDL]+)(_Modifiers|_Modifier_\d+(_Key|_Action)?)?",
+    flags=re.IGNORECASE,
+)
+MODIFIER_ITEM = re.compile(
+    r"_Modifier_\d+_(?!(Key|Action)$)[a-z]+", flags=re.IGNORECASE
+)
+
+
+@dataclass(frozen=True)
+class TemplateIssue:
+    severity: str
+    message: str
+    line: int | None = None
+
+    def __str__(self) -> str:
+        location = f"line {self.line}: " if self.line else ""
+        return f"{self.severity} {location}{self.message}"
+
+
+@dataclass(frozen=True)
+class TemplateValidation:
+    path: Path
+    hash: str
+    issues: tuple[TemplateIssue, ...]
+    cached: bool = False
+
+    @property
+    def errors(self) -> list[TemplateIssue]:
+        return [x for x in self.issues if x.severity == ISSUE_ERROR]
+
+    @property
+    def warnings(self) -> list[TemplateIssue]:
+        return [x for x in self.issues if x.severity == ISSUE_WARNING]
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+
+def get_local_name(name: str) -> str:
+    """Returns an element or attribute name without its namespace"""
+    return name.rpartition("}")[2]
+
+
+def iter_rendered_text(element: ElementTree.Element) -> Iterator[str]:
+    """Yields the text within an element, from only the first child of switch elements as one child is rendered
+
+    Templates drawn in draw.io repeat each label as a text fallback within a switch element
+    """
+    if element.text:
+        yield element.text
+
+    children = list(element)
+
+    if get_local_name(element.tag) == "switch":
+        children = children[:1]
+
+    for child in children:
+        yield from iter_rendered_text(child)
+
+        if child.tail:
+            yield child.tail
+
+
+def check_attributes(root: ElementTree.Element) -> Iterator[TemplateIssue]:
+    for element in root.iter():
+        for attribute, value in element.attrib.items():
+            # draw.io keeps an editable copy of the diagram in the content attribute of the root element
+            if element is root and get_local_name(attribute) == "content":
+                continue
+
+            for match in PLACEHOLDER_KEY.finditer(value):
+                if DEVICE_INPUT_KEY.fullmatch(match.group()):
+                    yield TemplateIssue(
+                        ISSUE_WARNING,
+                        f"{match.group()} in the {get_local_name(attribute)} attribute of a {get_local_name(element.tag)} element will be replaced on export",
+                    )
+
+
+def check_repeated_controls(
+    root: ElementTree.Element, template: Template
+) -> Iterator[TemplateIssue]:
+    occurrences = Counter(
+        match.group().lower()
+        for text in iter_rendered_text(root)
+        for match in PLACEHOLDER_KEY.finditer(text)
+    )
+
+    for key, count in occurrences.items():
+        if count > 1 and set(template.resolve_placeholder_types(key)) & CONTROL_GROUPS:
+            yield TemplateIssue(ISSUE_WARNING, f"{key.upper()} appears {count} times")
+
+
+def check_control_keys(template: Template, data: str) -> Iterator[TemplateIssue]:
+    for key, offsets in template.placeholders[PLACEHOLDER_OTHER_KEY].items():
+        if key.partition("_")[0] not in CONTROL_PREFIXES:
+            continue
+
+        line = data.count("\n", 0, offsets[0]) + 1
+
+        if DEVICE_INPUT_KEY.fullmatch(key):
+            yield TemplateIssue(
+                ISSUE_WARNING,
+                f"{key.upper()} is not recognised as a control, so it is not checked against devices or cleared when unused",
+                line,
+            )
+        else:
+            yield TemplateIssue(
+                ISSUE_ERROR, f"{key.upper()} is not a valid control key", line
+            )
+
+    for key, offsets in template.placeholders[PLACEHOLDER_MODIFIER_KEY].items():
+        if MODIFIER_ITEM.search(key):
+            yield TemplateIssue(
+                ISSUE_WARNING,
+                f"{key.upper()} is not a modifier Key or Action, so it is never replaced",
+                data.count("\n", 0, offsets[0]) + 1,
+            )
+
+
+def validate_template_data(
+    path: Path, data: bytes, file_hash: str | None = None
+) -> TemplateValidation:
+    """Validates the data of a template file, safe to be run in a worker process
+
+    The hash of the data is calculated where not supplied
+    """
+    file_hash = file_hash or sha256(data).hexdigest()
+    issues = []
+
+    try:
+        text = data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+    except UnicodeDecodeError as e:
+        issues.append(TemplateIssue(ISSUE_ERROR, f"Template is not UTF-8: {e}"))
+        return TemplateValidation(path, file_hash, tuple(issues))
+
+    template = Template.from_data(path, text)
+    issues.extend(check_control_keys(template, text))
+
+    try:
+        root = ElementTree.fromstring(data)
+    except ElementTree.ParseError as e:
+        issues.append(
+            TemplateIssue(
+                ISSUE_ERROR, f"Template is not well formed XML: {e}", e.position[0]
+            )
+        )
+    else:
+        issues.extend(check_attributes(root))
+        issues.extend(check_repeated_controls(root, template))
+
+    return TemplateValidation(path, file_hash, tuple(issues))
+
+
+def validate_templates(
+    paths: Iterable[str | Path], workers: int = 1
+) -> list[TemplateValidation]:
+    """Validates templates, reusing stored results for templates validated before
+
+    Each template is read once, and templates without stored results are validated from the data read, in worker processes where more than one worker is requested
+    """
+    data = {}
+    hashes = {}
+
+    for path in map(Path, paths):
+        try:
+            data[path] = path.read_bytes()
+            hashes[path] = sha256(data[path]).hexdigest()
+        except OSError as e:
+            _logger.error(f"Unable to read template {path}: {e}")
+
+    stored = db_template_validation.get_validation_results(
+        list(set(hashes.values())), VALIDATOR_VERSION
+    )
+    results = {
+        path: TemplateValidation(
+            path,
+            file_hash,
+            tuple(TemplateIssue(**x) for x in json.loads(stored[file_hash])),
+            cached=True,
+        )
+        for path, file_hash in hashes.items()
+        if file_hash in stored
+    }
+    pending = [(x, data.pop(x), hashes[x]) for x in hashes if x not in results]
+    data.clear()
+
+    if workers > 1 and len(pending) > 1:
+        with multiprocessing.Pool(
+            min(workers, len(pending)), initializer=setup_worker_logging
+        ) as pool:
+            validated = pool.starmap(validate_template_data, pending)
+    else:
+        validated = [validate_template_data(*x) for x in pending]
+
+    db_template_validation.add_update_validation_results(
+        [
+            (x.hash, VALIDATOR_VERSION, json.dumps([asdict(y) for y in x.issues]))
+            for x in validated
+        ]
+    )
+    results.update((x.path, x) for x in validated)
+
+    _logger.info(
+        f"Validated {len(pending)} templates, {len(results) - len(pending)} were unchanged since they were last validated"
+    )
+
+    return [results[x] for x in hashes if x in results]
+
+
+if __name__ == "__main__":
+    pass
@@ -15,6 +15,7 @@ from PySide6.QtWidgets import (
 from joystick_diagrams.export_device import ExportDevice
 from joystick_diagrams.ui import ui_consts
 from joystick_diagrams.ui.device_setup_controller import (
+    check_export_devices,
     get_export_devices,
 )
 from joystick_diagrams.ui.qt_designer import device_setup_ui
@@ -89,6 +90,7 @@ class DeviceSetup(QMainWindow, device_setup_ui.Ui_Form):
 
     def initialise_ui(self):
         devices = get_export_devices()
+        check_export_devices(devices)
 
         self.add_devices_to_widget(devices)
 
@@ -3,14 +3,27 @@ from pathlib import Path
 from typing import Union
 
 from joystick_diagrams.app_state import AppState
+from joystick_diagrams.compatibility import (
+    create_compatibility_matrix,
+    get_device_controls,
+    get_template_controls,
+)
 from joystick_diagrams.db.db_device_management import (
+    add_update_device_template_path,
     get_device_template_path,
     remove_template_path_from_device,
 )
 from joystick_diagrams.exceptions import JoystickDiagramsError
 from joystick_diagrams.export_device import ExportDevice
+from joystick_diagrams.input.device import Device_
 from joystick_diagrams.profile_wrapper import ProfileWrapper
-from joystick_diagrams.template import Template
+from joystick_diagrams.template import Template, get_template
+from joystick_diagrams.template_catalogue import get_catalogued_controls
+from joystick_diagrams.template_recommendation import (
+    DEFAULT_MIN_SCORE,
+    TemplateRecommendation,
+    TemplateRecommender,
+)
 
 _logger = logging.getLogger(__name__)
 
@@ -30,14 +43,74 @@ def convert_profile_wrappers_to_export_devices(
 
 def setup_export_devices(export_device_list: list[ExportDevice]):
     """Configures Export Devices and enriches object with additional information"""
+    # Devices appear once per profile, so resolve each device template once
+    device_templates: dict[str, Template | None] = {}
+
     for export_device in export_device_list:
         # Get the template
         try:
-            export_device.template = get_template_for_device(export_device.device_id)
+            if export_device.device_id not in device_templates:
+                device_templates[export_device.device_id] = get_template_for_device(
+                    export_device.device_id
+                )
+
+            export_device.template = device_templates[export_device.device_id]
         except JoystickDiagramsError as e:
             _logger.error(e)
 
 
+def check_export_devices(export_device_list: list[ExportDevice]):
+    """Checks all Export Devices against their templates together, setting their errors
+
+    Template controls are taken from the template catalogue, so templates are not loaded and are only read where changed since they were catalogued
+    """
+    # Devices appear once per profile, and templates are shared between devices, so each is encoded once
+    devices: dict[frozenset[str], int] = {}
+    templates: dict[Template, set[str] | frozenset[str] | None] = {}
+    pairs = []
+    catalogued = get_catalogued_controls(
+        x.template.template_path for x in export_device_list if x.template
+    )
+
+    for export_device in export_device_list:
+        template = export_device.template
+
+        if template is None:
+            continue
+
+        if template not in templates:
+            path = template.template_path.resolve()
+
+            try:
+                templates[template] = (
+                    catalogued[path]
+                    if path in catalogued
+                    else get_template_controls(template)
+                )
+            except JoystickDiagramsError as e:
+                _logger.error(e)
+                templates[template] = None
+
+        if templates[template] is None:
+            continue
+
+        controls = get_device_controls(export_device.device)
+        pairs.append(
+            (export_device, devices.setdefault(controls, len(devices)), template)
+        )
+
+    checked_templates = [x for x, controls in templates.items() if controls is not None]
+    template_index = {x: i for i, x in enumerate(checked_templates)}
+    matrix = create_compatibility_matrix(
+        list(devices), [templates[x] for x in checked_templates]
+    )
+
+    for export_device, device_index, template in pairs:
+        export_device.errors = matrix.missing_controls(
+            device_index, template_index[template]
+        )
+
+
 def get_export_devices() -> list[ExportDevice]:
     """Retrieves profiles from global state and converts them to device trees"""
     devices = convert_profile_wrappers_to_export_devices(get_processed_profiles())
@@ -46,6 +119,35 @@ def get_export_devices() -> list[ExportDevice]:
     return devices
 
 
+def get_unassigned_devices(export_device_list: list[ExportDevice]) -> list[Device_]:
+    """Returns the devices without a template, from every profile they appear in"""
+    return [x.device for x in export_device_list if not x.has_template]
+
+
+def assign_recommended_templates(
+    devices: list[Device_],
+    recommender: TemplateRecommender | None = None,
+    min_score: float = DEFAULT_MIN_SCORE,
+) -> dict[str, TemplateRecommendation]:
+    """Stores the best recommended template for each device, where it scores at least min_score
+
+    Returns the assigned recommendations by device GUID
+    """
+    recommendations = (recommender or TemplateRecommender()).recommend(devices, 1)
+    assigned = {}
+
+    for guid, device_recommendations in recommendations.items():
+        if not device_recommendations or device_recommendations[0].score < min_score:
+            continue
+
+        best = device_recommendations[0]
+
+        if add_update_device_template_path(guid, str(best.template_path)):
+            assigned[guid] = best
+
+    return assigned
+
+
 def get_template_for_device(device_guid: str) -> Union[Template, None]:
     """Retrieves a device template from storage"""
     template = get_device_template_path(device_guid)
@@ -62,7 +164,8 @@ def get_template_for_device(device_guid: str) -> Union[Template, None]:
         remove_template_path_from_device(device_guid)
         return None
 
-    return Template(template)
+    # Loaded when first exported or checked for compatibility
+    return get_template(template, lazy=True)
 
 
 def get_processed_profiles() -> list[ProfileWrapper]:
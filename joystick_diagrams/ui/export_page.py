@@ -12,7 +12,8 @@ from joystick_diagrams.app_state import AppState
 from joystick_diagrams.db.db_device_management import (
     add_update_device_template_path,
 )
-from joystick_diagrams.export import export
+from joystick_diagrams.export import ExportOptions, export_devices
+from joystick_diagrams.export_cache import get_export_cache
 from joystick_diagrams.export_device import ExportDevice
 from joystick_diagrams.ui import main_window, ui_consts
 from joystick_diagrams.ui.device_setup import DeviceSetup
@@ -136,7 +137,13 @@ class ExportPage(QMainWindow, export_ui.Ui_Form):
         msg_box.setWindowIcon(QIcon(ui_consts.JD_ICON))
         msg_box.setWindowTitle("Export Completed")
         msg_box.setText(
-            f"{data} items were exported to {self.export_settings_widget.export_location}"
+            f"{data.written} items were exported to {self.export_settings_widget.export_location}"
+            f"\n\n{data.skipped} items were unchanged since the last export"
+            + (
+                f"\n\n{data.render_failed} items could not be rendered"
+                if data.render_failed
+                else ""
+            )
         )
         msg_box.setDefaultButton(QMessageBox.StandardButton.Ok)
         msg_box.setStandardButtons(QMessageBox.StandardButton.Ok)
@@ -172,7 +179,14 @@ class ExportPage(QMainWindow, export_ui.Ui_Form):
         items_to_export = self.get_items_to_export()
 
         worker = ExportDispatch(
-            items_to_export, self.export_settings_widget.export_location
+            items_to_export,
+            self.export_settings_widget.export_location,
+            ExportOptions(
+                workers=self.export_settings_widget.export_workers,
+                formats=self.export_settings_widget.export_formats,
+                dpi=self.export_settings_widget.export_dpi,
+                incremental=not self.export_settings_widget.export_force,
+            ),
         )
 
         worker.signals.started.connect(self.lock_export_button)
@@ -184,7 +198,7 @@ class ExportPage(QMainWindow, export_ui.Ui_Form):
 
 class ExportSignals(QObject):
     started = Signal()
-    finished = Signal(int)
+    finished = Signal(object)
     progress = Signal(int)
 
 
@@ -196,12 +210,17 @@ class ExportDispatch(QRunnable):
     """
 
     def __init__(
-        self, export_items: list[ExportDevice], export_directory: str, **kwargs
+        self,
+        export_items: list[ExportDevice],
+        export_directory: str,
+        options: ExportOptions,
+        **kwargs,
     ):
         super(ExportDispatch, self).__init__()
 
         self.export_items = export_items
         self.export_directory = export_directory
+        self.options = options
         self.signals = ExportSignals()
 
     @Slot()  # QtCore.Slot
@@ -212,16 +231,23 @@ class ExportDispatch(QRunnable):
         self.signals.started.emit()
         item_count = len(self.export_items)
 
-        for count, item in enumerate(self.export_items, 1):
-            _logger.info(
-                f"Exporting {count}/{item_count} which has profile {item.profile_wrapper.profile_name}"
-            )
-            export(item, self.export_directory)
+        _logger.info(
+            f"Exporting {item_count} items using up to {self.options.workers} workers"
+        )
 
-            self.signals.progress.emit(
-                round(count / item_count * 100 if item != item_count - 1 else 100)
-            )
-        self.signals.finished.emit(item_count)
+        # Worker processes are shared by exports, so are started once rather than for each export
+        summary = export_devices(
+            self.export_items,
+            self.export_directory,
+            self.options,
+            progress=self.report_progress,
+            cache=get_export_cache(),
+        )
+
+        self.signals.finished.emit(summary)
+
+    def report_progress(self, completed: int, total: int):
+        self.signals.progress.emit(round(completed / total * 100))
 
 
 if __name__ == "__main__":
@@ -3,15 +3,35 @@ import os
 import sys
 
 from PySide6.QtCore import Signal
-from PySide6.QtWidgets import QApplication, QFileDialog, QMainWindow
+from PySide6.QtWidgets import (
+    QApplication,
+    QCheckBox,
+    QFileDialog,
+    QLabel,
+    QMainWindow,
+    QSpinBox,
+)
 
 from joystick_diagrams.db.db_settings import add_update_setting_value, get_setting
+from joystick_diagrams.export import (
+    EXPORT_DPI_SETTING_KEY,
+    EXPORT_FORMAT_SETTING_KEY,
+    EXPORT_PATH_SETTING_KEY,
+    EXPORT_WORKERS_SETTING_KEY,
+)
+from joystick_diagrams.export_render import (
+    DEFAULT_DPI,
+    EXPORT_FORMAT_SVG,
+    EXPORT_FORMATS,
+)
 from joystick_diagrams.ui.qt_designer import export_settings
 from joystick_diagrams.utils import install_root
 
 _logger = logging.getLogger(__name__)
 
-EXPORT_PATH_SETTING_KEY = "export_path"
+MAX_EXPORT_WORKERS = os.cpu_count() or 1
+MIN_EXPORT_DPI = 72
+MAX_EXPORT_DPI = 1200
 
 
 class ExportSettings(QMainWindow, export_settings.Ui_Form):
@@ -23,9 +43,51 @@ class ExportSettings(QMainWindow, export_settings.Ui_Form):
 
         # Attributes
         self.export_location = None
+        self.export_workers = self.get_export_workers()
+        self.selected_export_format = self.get_export_format()
+        self.export_dpi = self.get_export_dpi()
+        # Not stored, as exporting every device again is only wanted occasionally
+        self.export_force = False
+
+        # Export formats, SVG is always exported as the source of other formats
+        self.export_format.clear()
+        self.export_format.addItems([x.upper() for x in EXPORT_FORMATS])
+        self.export_format.setCurrentIndex(
+            EXPORT_FORMATS.index(self.selected_export_format)
+        )
+
+        # Export worker processes
+        self.export_workers_label = QLabel("Export Workers")
+        self.export_workers_label.setFont(self.export_format_label.font())
+        self.export_workers_input = QSpinBox()
+        self.export_workers_input.setRange(1, MAX_EXPORT_WORKERS)
+        self.export_workers_input.setValue(self.export_workers)
+        self.export_format_container.addWidget(self.export_workers_label)
+        self.export_format_container.addWidget(self.export_workers_input)
+
+        # Resolution of rendered formats
+        self.export_dpi_label = QLabel("DPI")
+        self.export_dpi_label.setFont(self.export_format_label.font())
+        self.export_dpi_input = QSpinBox()
+        self.export_dpi_input.setRange(MIN_EXPORT_DPI, MAX_EXPORT_DPI)
+        self.export_dpi_input.setValue(self.export_dpi)
+        self.export_format_container.addWidget(self.export_dpi_label)
+        self.export_format_container.addWidget(self.export_dpi_input)
+
+        # Export devices unchanged since they were last exported
+        self.export_force_input = QCheckBox("Force Export")
+        self.export_force_input.setFont(self.export_format_label.font())
+        self.export_force_input.setToolTip(
+            "Export every device, including those unchanged since they were last exported"
+        )
+        self.export_format_container.addWidget(self.export_force_input)
 
         # Connections
         self.setExportLocationButton.clicked.connect(self.set_export_location)
+        self.export_workers_input.valueChanged.connect(self.store_export_workers)
+        self.export_format.currentIndexChanged.connect(self.store_export_format)
+        self.export_dpi_input.valueChanged.connect(self.store_export_dpi)
+        self.export_force_input.toggled.connect(self.set_export_force)
         self.setExportLocationButton.setProperty("class", "export-location-button")
         self.export_path_changed.connect(self.setup_widget)
 
@@ -53,6 +115,47 @@ class ExportSettings(QMainWindow, export_settings.Ui_Form):
     def store_export_location(self, location: str):
         add_update_setting_value(EXPORT_PATH_SETTING_KEY, location)
 
+    def get_export_workers(self) -> int:
+        """Gets the stored number of export worker processes, defaulting to the CPU count"""
+        workers = get_setting(EXPORT_WORKERS_SETTING_KEY)
+
+        if workers and workers.isdigit():
+            return min(max(int(workers), 1), MAX_EXPORT_WORKERS)
+
+        return MAX_EXPORT_WORKERS
+
+    def store_export_workers(self, workers: int):
+        self.export_workers = workers
+        add_update_setting_value(EXPORT_WORKERS_SETTING_KEY, str(workers))
+
+    @property
+    def export_formats(self) -> tuple[str, ...]:
+        "Returns the formats to export, SVG is always included as other formats are rendered from it"
+        return tuple(dict.fromkeys([EXPORT_FORMAT_SVG, self.selected_export_format]))
+
+    def get_export_format(self) -> str:
+        export_format = get_setting(EXPORT_FORMAT_SETTING_KEY)
+        return export_format if export_format in EXPORT_FORMATS else EXPORT_FORMAT_SVG
+
+    def store_export_format(self, index: int):
+        self.selected_export_format = EXPORT_FORMATS[index]
+        add_update_setting_value(EXPORT_FORMAT_SETTING_KEY, self.selected_export_format)
+
+    def get_export_dpi(self) -> int:
+        dpi = get_setting(EXPORT_DPI_SETTING_KEY)
+
+        if dpi and dpi.isdigit():
+            return min(max(int(dpi), MIN_EXPORT_DPI), MAX_EXPORT_DPI)
+
+        return DEFAULT_DPI
+
+    def store_export_dpi(self, dpi: int):
+        self.export_dpi = dpi
+        add_update_setting_value(EXPORT_DPI_SETTING_KEY, str(dpi))
+
+    def set_export_force(self, force: bool):
+        self.export_force = force
+
     def set_export_location(self):
         _folder = QFileDialog.getExistingDirectory(
             self,
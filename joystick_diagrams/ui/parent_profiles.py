@@ -6,6 +6,7 @@ from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import QListWidgetItem, QMainWindow
 
 from joystick_diagrams.app_state import AppState
+from joystick_diagrams.exceptions import ProfileInheritanceCycleError
 from joystick_diagrams.profile_wrapper import ProfileWrapper
 from joystick_diagrams.ui.qt_designer import parent_profile_management_ui
 
@@ -119,7 +120,14 @@ class parent_profile_ui(QMainWindow, parent_profile_management_ui.Ui_Form):
             for x in range(self.listWidget.count())
         ]
 
-        self.currentActiveProfile.update_parents_for_profile(parent_profiles)
+        try:
+            self.appState.update_profile_parents(
+                self.currentActiveProfile, parent_profiles
+            )
+        except ProfileInheritanceCycleError as e:
+            _logger.error(f"Parents of {self.currentActiveProfile} were not saved: {e}")
+            self.load_profile_parent_maps(self.currentActiveProfile)
+
         self.update_selectable_profiles()
 
     def load_profile_parent_maps(self, profile_wrapper: ProfileWrapper):
@@ -129,7 +137,8 @@ class parent_profile_ui(QMainWindow, parent_profile_management_ui.Ui_Form):
             f"Loading profile parent maps for {profile_wrapper.profile_key}: Maps {profile_wrapper.parents}"
         )
 
-        for parent in reversed(profile_wrapper.parents):
+        # Listed in order of precedence, as stored
+        for parent in profile_wrapper.parents:
             item = QListWidgetItem(
                 QIcon(parent.profile_origin.icon),
                 parent.profile_name,
@@ -1,11 +1,15 @@
 import logging
 import os
 import sys
+from collections.abc import Iterator
+from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
 _logger = logging.getLogger(__name__)
 
 JOYSTICK_DIAGRAMS_DATA_DIR = "Joystick Diagrams"
+TEMPLATE_SUFFIX = ".svg"
+LOG_FORMAT = "%(module)s %(filename)s - %(asctime)s - %(levelname)s - %(message)s"
 
 
 def data_root() -> Path:
@@ -33,7 +37,7 @@ def plugin_data_root() -> Path:
 def create_directory(directory) -> None:
     try:
         if not Path(directory).exists():
-            Path(directory).mkdir()
+            Path(directory).mkdir(parents=True)
     except OSError as error:
         _logger.error(f"Failed to create directory: {directory} with {error}")
 
@@ -50,3 +54,43 @@ def install_root() -> str:
         if getattr(sys, "frozen", False)
         else os.path.dirname(__package__)
     )
+
+
+def find_template_files(directory: str | Path) -> Iterator[Path]:
+    """Yields every template within a directory and its subdirectories, in path order"""
+    for path in sorted(Path(directory).rglob(f"*{TEMPLATE_SUFFIX}")):
+        if path.is_file():
+            yield path
+
+
+def setup_logging() -> None:
+    """Logs to the console and the application log file, called once by the application entry point"""
+    log_path = Path.joinpath(data_root(), "logs")
+    create_directory(str(log_path))
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format=LOG_FORMAT,
+        handlers=[
+            logging.StreamHandler(),
+            RotatingFileHandler(
+                str(Path.joinpath(log_path, "application.log")),
+                mode="a",
+                maxBytes=5 * 1000000,
+                backupCount=1,
+            ),
+        ],
+    )
+
+
+def setup_worker_logging() -> None:
+    """Logs to the console only, used as the initializer of worker processes
+
+    Workers must not write to the application log file, which is rotated by the main process. Handlers inherited from the main process are replaced
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format=LOG_FORMAT,
+        handlers=[logging.StreamHandler()],
+        force=True,
+    )
@@ -10,11 +10,12 @@ import logging
 import os
 from dataclasses import dataclass, field
 from hashlib import sha256
-from pathlib import Path
 
 import requests  # type: ignore
 import semver
 
+from joystick_diagrams.utils import find_template_files
+
 _LOGGER = logging.getLogger(__name__)
 
 VERSION = "2.1.0"  # Format Major.Minor
@@ -121,20 +122,17 @@ def generate_version(version_number: str = VERSION) -> JoystickDiagramVersion:
 
 
 def generate_template_manifest() -> dict[str, str]:
-    """Generates a list of hashes for each templatein the package"""
-    # TODO Possible deprecation
-    templates = Path(TEMPLATE_DIR)
+    """Generates a hash for each template in the package, by path relative to the template directory
+
+    Templates in the top level of the directory keep the file name keys of earlier manifests, while templates in subdirectories, which earlier manifests left out, are keyed by their POSIX style relative path such as Vendor/Device.svg
+    """
     manifest: dict[str, str] = {}
 
-    # Generate Template Manifest
-    for template in templates.iterdir():
-        # For now no traversal supported
-        if template.is_dir():
-            continue
-        if template.suffix != ".svg":
-            continue
+    for template in find_template_files(TEMPLATE_DIR):
         with open(template, "rb", buffering=0) as file:
-            manifest[template.name] = sha256(file.read()).hexdigest()
+            manifest[template.relative_to(TEMPLATE_DIR).as_posix()] = sha256(
+                file.read()
+            ).hexdigest()
 
     return manifest
 
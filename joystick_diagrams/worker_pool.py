@@ -0,0 +1,61 @@
+"""Pools of worker processes kept between batches of jobs.
+
+Starting worker processes, and loading what their jobs need in each of them, can take longer than the jobs of a small export. A pool is therefore kept once started, and is only started again where a later batch could use more workers than it has.
+"""
+
+import logging
+import multiprocessing
+from collections.abc import Callable, Iterable, Iterator
+
+_logger = logging.getLogger(__name__)
+
+
+class WorkerPool:
+    """Pool of up to a number of worker processes, started when first given jobs
+
+    No more workers are started than there are jobs in the batch
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        initializer: Callable | None = None,
+        initargs: tuple = (),
+    ):
+        self.workers = workers
+        self.initializer = initializer
+        self.initargs = initargs
+        self.pool = None
+        self.size = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def imap(self, func: Callable, jobs: Iterable) -> Iterator:
+        """Runs func over the jobs in the worker processes, yielding the result of each in order"""
+        jobs = list(jobs)
+        size = max(min(self.workers, len(jobs)), 1)
+
+        if self.pool is None or self.size < size:
+            self.close()
+            _logger.debug(f"Starting {size} worker processes")
+            self.pool = multiprocessing.Pool(
+                size, initializer=self.initializer, initargs=self.initargs
+            )
+            self.size = size
+
+        return self.pool.imap(func, jobs)
+
+    def close(self) -> None:
+        if self.pool:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+            self.size = 0
+
+
+if __name__ == "__main__":
+    pass
@@ -43,3 +43,9 @@ def test_axis_slider_identifier():
     axis = AxisSlider(1)
 
     assert axis.identifier == "AXIS_SLIDER_1"
+
+
+def test_axis_shared():
+    assert Axis(AxisDirection.X) is Axis(AxisDirection.X)
+    assert AxisSlider(1) is AxisSlider(1)
+    assert AxisSlider(1) == AxisSlider(1) != Axis(AxisDirection.X)
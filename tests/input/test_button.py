@@ -1,3 +1,7 @@
+import copy
+import pickle
+from dataclasses import FrozenInstanceError
+
 import pytest
 
 from joystick_diagrams.input.button import Button
@@ -21,3 +25,27 @@ def test_hat_identifier_format():
     button = Button(1)
 
     assert button.identifier == "BUTTON_1"
+
+
+def test_button_shared():
+    assert Button(5) is Button(5)
+    assert Button(5) is not Button(6)
+
+
+def test_button_immutable():
+    button = Button(1)
+
+    with pytest.raises(FrozenInstanceError):
+        button.id = 2
+
+
+def test_button_copies_are_shared():
+    button = Button(1)
+
+    assert copy.deepcopy(button) is button
+    assert pickle.loads(pickle.dumps(button)) is button
+
+
+def test_button_float_id():
+    with pytest.raises(ValueError):
+        Button(1.0)
@@ -1,4 +1,6 @@
+import copy
 import logging
+import pickle
 
 import pytest
 
@@ -131,3 +133,123 @@ def test_get_inputs():
     all_inputs = obj.get_inputs()
     expected_keys = ("buttons", "axis", "axis_slider", "hats")
     assert [x for x in expected_keys if x in all_inputs.keys()]
+
+
+def test_input_views_update_device():
+    obj = Device_("666EC0A0-556B-11EE-8002-444553540000", "name")
+    obj.create_input(Button(1), "Shoot")
+
+    obj.get_input("buttons", "BUTTON_1").command = "Fire"
+    obj.get_inputs()["buttons"]["BUTTON_1"].add_modifier({"ctrl"}, "Reload")
+
+    input_ = obj.get_input("buttons", "BUTTON_1")
+    assert input_.command == "Fire"
+    assert input_.modifiers[0].command == "Reload"
+    assert obj.get_input("hats", "BUTTON_1") is None
+
+
+def test_inputs_are_read_only():
+    obj = Device_("666EC0A0-556B-11EE-8002-444553540000", "name")
+    obj.create_input(Button(1), "Shoot")
+
+    with pytest.raises(TypeError):
+        obj.inputs["buttons"]["BUTTON_2"] = obj.get_input("buttons", "BUTTON_1")
+
+    with pytest.raises(TypeError):
+        obj.inputs["hats"] = {}
+
+
+def test_device_commands_interned():
+    first = Device_("666EC0A0-556B-11EE-8002-444553540000", "name")
+    second = Device_("666EC0A0-556B-11EE-8002-444553540001", "name")
+    first.create_input(Button(1), "".join(["Sho", "ot"]))
+    second.create_input(Button(2), "".join(["Sh", "oot"]))
+
+    assert first.get_input("buttons", "BUTTON_1").command is (
+        second.get_input("buttons", "BUTTON_2").command
+    )
+
+
+def test_device_deepcopy():
+    obj = Device_("666EC0A0-556B-11EE-8002-444553540000", "name")
+    obj.create_input(Button(1), "Shoot")
+    obj.add_modifier_to_input(Button(1), {"ctrl"}, "Reload")
+
+    copied = copy.deepcopy(obj)
+    copied.add_modifier_to_input(Button(1), {"ctrl"}, "Changed")
+    copied.create_input(Button(2), "Jump")
+
+    assert obj.get_identifiers() == ["BUTTON_1"]
+    assert obj.get_input("buttons", "BUTTON_1").modifiers[0].command == "Reload"
+    assert copied.get_identifiers() == ["BUTTON_1", "BUTTON_2"]
+    assert copied.get_input("buttons", "BUTTON_1").modifiers[0].command == "Changed"
+
+
+def test_layers_shared_through_several_paths_are_read_once():
+    guid = "666EC0A0-556B-11EE-8002-444553540000"
+    base = Device_(guid, "name")
+    base.create_input(Button(1), "Fire")
+    layers = [base]
+
+    # Each level is layered over both devices of the level below, doubling the paths to the base every level
+    for _ in range(30):
+        layers = [Device_.create_overlay(layers), Device_.create_overlay(layers)]
+
+    device = Device_.create_overlay(layers)
+
+    assert len(device._get_chain()) == 62
+    assert device.get_input("buttons", "BUTTON_1").command == "Fire"
+
+    replacement = Device_(guid, "name")
+    replacement.create_input(Button(1), "Replaced")
+    layers[0].set_layers([replacement])
+
+    assert device.get_input("buttons", "BUTTON_1").command == "Replaced"
+
+
+def test_layers_changed_only_for_devices_layered_over_them():
+    guid = "666EC0A0-556B-11EE-8002-444553540000"
+    base = Device_(guid, "name")
+    base.create_input(Button(1), "Fire")
+    device = Device_.create_overlay([base])
+    other = Device_.create_overlay([Device_(guid, "name")])
+
+    chain = device._get_chain()
+    other.set_layers([base])
+
+    assert device._get_chain() is chain
+    assert other.get_input("buttons", "BUTTON_1").command == "Fire"
+
+
+def test_inputs_kept_until_an_input_is_added():
+    guid = "666EC0A0-556B-11EE-8002-444553540000"
+    base = Device_(guid, "name")
+    base.create_input(Button(1), "Fire")
+    device = Device_.create_overlay([base])
+    device.create_input(Button(1), "Changed")
+
+    inputs = device.inputs
+    device.add_modifier_to_input(Button(1), {"ctrl"}, "Reload")
+
+    assert device.inputs is inputs
+    assert inputs["buttons"]["BUTTON_1"].modifiers[0].command == "Reload"
+
+    base.create_input(Button(2), "Jump")
+
+    assert device.inputs is not inputs
+    assert list(device.inputs["buttons"]) == ["BUTTON_1", "BUTTON_2"]
+
+
+def test_layered_device_pickled():
+    guid = "666EC0A0-556B-11EE-8002-444553540000"
+    base = Device_(guid, "name")
+    base.create_input(Button(1), "Fire")
+    device = Device_.create_overlay([base])
+    device.add_modifier_to_input(Button(1), {"ctrl"}, "Reload")
+
+    unpickled = pickle.loads(pickle.dumps(device))
+    unpickled.get_layers()[0].create_input(Button(2), "Jump")
+
+    assert unpickled.get_identifiers() == ["BUTTON_1", "BUTTON_2"]
+    assert unpickled.inputs["buttons"]["BUTTON_1"].modifiers[0].command == "Reload"
+    assert unpickled.inputs["buttons"]["BUTTON_1"]._modifiers == {}
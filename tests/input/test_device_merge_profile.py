@@ -138,3 +138,57 @@ def test_merge_device_into_profile_with_existing_merged_with_target():
     assert merged_instance.devices[guid].inputs["buttons"]["BUTTON_1"].modifiers[
         0
     ].modifiers == {"ctrl"}
+
+
+def test_merged_profile_changes_do_not_change_profiles():
+    """Checks that inputs changed in the merged profile are copied rather than changed in the profiles merged"""
+    guid = "666ec0a0-556b-11ee-8002-444553540000"
+    profile_1 = Profile_("Profile_1")
+    profile_1.add_device(guid, "guid").create_input(Button(1), "First")
+
+    profile_2 = Profile_("Profile_1")
+    profile_2_dev = profile_2.add_device(guid, "guid")
+    profile_2_dev.create_input(Button(2), "Second")
+    profile_2_dev.add_modifier_to_input(Button(2), {"ctrl"}, "Modifier")
+
+    merged_instance = profile_1.merge_profiles(profile_2)
+    merged_device = merged_instance.devices[guid]
+
+    # Nothing is stored by the merged device until it is changed
+    assert merged_device._controls == []
+
+    merged_device.create_input(Button(1), "Changed")
+    merged_device.add_modifier_to_input(Button(2), {"ctrl"}, "Changed")
+    merged_device.add_modifier_to_input(Button(2), {"alt"}, "Added")
+
+    assert merged_device.inputs["buttons"]["BUTTON_1"].command == "Changed"
+    assert [
+        x.command for x in merged_device.inputs["buttons"]["BUTTON_2"].modifiers
+    ] == [
+        "Changed",
+        "Added",
+    ]
+    assert profile_1.devices[guid].inputs["buttons"]["BUTTON_1"].command == "First"
+    assert [
+        x.command for x in profile_2_dev.inputs["buttons"]["BUTTON_2"].modifiers
+    ] == ["Modifier"]
+
+
+def test_inherited_modifiers_are_copies():
+    guid = "666ec0a0-556b-11ee-8002-444553540000"
+    profile_1 = Profile_("Profile_1")
+    profile_1.add_device(guid, "guid").create_input(Button(1), "First")
+
+    profile_2 = Profile_("Profile_2")
+    profile_2_dev = profile_2.add_device(guid, "guid")
+    profile_2_dev.add_modifier_to_input(Button(1), {"ctrl"}, "Modifier")
+
+    merged_device = profile_1.merge_profiles(profile_2).devices[guid]
+    merged_device.inputs["buttons"]["BUTTON_1"].modifiers[0].command = "Changed"
+
+    assert profile_2_dev.inputs["buttons"]["BUTTON_1"].modifiers[0].command == (
+        "Modifier"
+    )
+    assert merged_device.inputs["buttons"]["BUTTON_1"].modifiers[0].command == (
+        "Modifier"
+    )
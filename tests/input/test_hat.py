@@ -42,3 +42,9 @@ def test_hat_identifier_format():
     hat = Hat(hat_id, direction)
 
     assert hat.identifier == "POV_1_U"
+
+
+def test_hat_shared():
+    assert Hat(1, HatDirection.U) is Hat(1, HatDirection.U)
+    assert Hat(1, HatDirection.U) is Hat(id=1, direction=HatDirection.U)
+    assert Hat(1, HatDirection.U) is not Hat(1, HatDirection.D)
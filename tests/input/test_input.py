@@ -4,6 +4,7 @@ from joystick_diagrams.input.axis import Axis, AxisDirection, AxisSlider
 from joystick_diagrams.input.button import Button
 from joystick_diagrams.input.hat import Hat, HatDirection
 from joystick_diagrams.input.input import Input_
+from joystick_diagrams.input.modifier import Modifier
 
 
 def test_new_button_input_valid():
@@ -74,3 +75,21 @@ def test_input_identifier():
     """Covered primarily by individual control type tests"""
     new_input = Input_(Button(1), "created")
     assert new_input.identifier == "BUTTON_1"
+
+
+def test_modifiers_keep_order():
+    new_input = Input_(Button(1), "created")
+    new_input.add_modifier({"ctrl", "alt"}, "first")
+    new_input.add_modifier({"shift"}, "second")
+    new_input.add_modifier({"alt", "ctrl"}, "changed")
+
+    assert [x.command for x in new_input.modifiers] == ["changed", "second"]
+    assert new_input._check_existing_modifier({"shift"}).command == "second"
+    assert new_input._check_existing_modifier({"ctrl"}) is None
+
+
+def test_modifiers_cannot_be_appended():
+    new_input = Input_(Button(1), "created")
+
+    with pytest.raises(AttributeError):
+        new_input.modifiers.append(Modifier({"ctrl"}, "mod"))
@@ -0,0 +1,68 @@
+from benchmarks.export_benchmark import (
+    create_control,
+    find_regressions,
+    main,
+)
+from joystick_diagrams.input.axis import Axis, AxisDirection, AxisSlider
+from joystick_diagrams.input.button import Button
+from joystick_diagrams.input.hat import Hat, HatDirection
+
+
+def test_create_control():
+    assert create_control("button_12") == Button(12)
+    assert create_control("pov_1_ul") == Hat(1, HatDirection.UL)
+    assert create_control("axis_rx") == Axis(AxisDirection.RX)
+    assert create_control("axis_slider_2") == AxisSlider(2)
+    assert create_control("axis_unknown") is None
+    assert create_control("template_name") is None
+
+
+def test_find_regressions():
+    baseline = {
+        "totals": {
+            "populate_template": {"median_seconds": 1.0, "peak_memory_bytes": 100}
+        }
+    }
+    report = {
+        "totals": {
+            "populate_template": {"median_seconds": 1.5, "peak_memory_bytes": 110}
+        }
+    }
+
+    regressions = find_regressions(report, baseline, 0.2)
+
+    assert len(regressions) == 1
+    assert "populate_template median_seconds" in regressions[0]
+    assert find_regressions(report, {}, 0.2) == []
+
+
+def test_benchmark_writes_results(tmp_path):
+    templates = tmp_path / "templates"
+    templates.mkdir()
+    (templates / "device.svg").write_text(
+        "<text>BUTTON_1</text><text>AXIS_X</text><text>POV_1_U</text><text>BUTTON_2</text>",
+        encoding="UTF8",
+    )
+    output = tmp_path / "results.json"
+
+    assert (
+        main(["--templates", str(templates), "--output", str(output), "--runs", "1"])
+        == 0
+    )
+    assert (
+        main(
+            [
+                "--templates",
+                str(templates),
+                "--output",
+                str(tmp_path / "second.json"),
+                "--runs",
+                "1",
+                "--baseline",
+                str(output),
+                "--tolerance",
+                "1000",
+            ]
+        )
+        == 0
+    )
@@ -0,0 +1,51 @@
+from unittest.mock import patch
+
+import pytest
+
+from joystick_diagrams import cli
+
+
+def test_is_cli_command():
+    assert cli.is_cli_command(["export", "--output", "diagrams"]) is True
+    assert cli.is_cli_command([]) is False
+    assert cli.is_cli_command(["--unknown"]) is False
+
+
+def test_export_arguments():
+    arguments = cli.create_parser().parse_args(
+        ["export", "--output", "diagrams", "--workers", "3"]
+    )
+
+    assert arguments.command == "export"
+    assert arguments.output == "diagrams"
+    assert arguments.workers == 3
+
+
+def test_export_invalid_workers():
+    with pytest.raises(SystemExit):
+        cli.create_parser().parse_args(["export", "--workers", "many"])
+
+
+def test_export_without_location(caplog):
+    with (
+        patch.object(cli.db_handler, "init"),
+        patch.object(cli, "enable_compiled_templates"),
+        patch.object(cli, "enable_memory_mapped_templates"),
+        patch.object(cli, "get_setting", return_value=None),
+        patch.object(cli, "initialise_plugins") as initialise_plugins,
+    ):
+        assert cli.main(["export"]) == 1
+
+    initialise_plugins.assert_not_called()
+    assert "No export location was supplied" in caplog.text
+
+
+def test_recommend_arguments():
+    arguments = cli.create_parser().parse_args(
+        ["recommend", "--apply", "--min-score", "0.7"]
+    )
+
+    assert cli.is_cli_command(["recommend"]) is True
+    assert arguments.command == "recommend"
+    assert arguments.apply is True
+    assert arguments.min_score == 0.7
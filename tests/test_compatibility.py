@@ -0,0 +1,86 @@
+from pathlib import Path
+
+import pytest
+
+from joystick_diagrams.compatibility import (
+    ControlVocabulary,
+    create_compatibility_matrix,
+    get_device_controls,
+    get_template_controls,
+)
+from joystick_diagrams.export_device import ExportDevice
+from joystick_diagrams.input.axis import Axis, AxisDirection, AxisSlider
+from joystick_diagrams.input.button import Button
+from joystick_diagrams.input.device import Device_
+from joystick_diagrams.input.hat import Hat, HatDirection
+from joystick_diagrams.template import Template
+
+TEMPLATE_DIR = Path("templates")
+
+
+@pytest.fixture
+def devices():
+    first = Device_("12345678-1234-5678-1234-567812345678", "First Device")
+    first.create_input(Button(1), "Fire")
+    first.create_input(Button(90), "Missing")
+    first.create_input(Hat(1, HatDirection.U), "Look up")
+    first.create_input(AxisSlider(1), "Throttle")
+
+    second = Device_("87654321-1234-5678-1234-567812345678", "Second Device")
+    second.create_input(Axis(AxisDirection.X), "Roll")
+    second.create_input(Axis(AxisDirection.RZ), "Yaw")
+
+    return [first, second]
+
+
+def test_get_device_controls(devices):
+    assert get_device_controls(devices[0]) == {
+        "button_1",
+        "button_90",
+        "pov_1_u",
+        "axis_slider_1",
+    }
+
+
+def test_control_vocabulary_round_trip():
+    vocabulary = ControlVocabulary()
+    first = vocabulary.encode(["button_1", "axis_x"])
+    second = vocabulary.encode(["axis_x", "pov_1_u"])
+
+    assert first & second == vocabulary.encode(["axis_x"])
+    assert vocabulary.decode(first | second) == {"button_1", "axis_x", "pov_1_u"}
+    assert vocabulary.decode(0) == set()
+
+
+def test_matrix_accepts_control_sets():
+    matrix = create_compatibility_matrix(
+        [frozenset({"button_1", "button_2"}), frozenset()],
+        [{"button_1"}, {"button_1", "button_2"}, set()],
+    )
+
+    assert matrix.missing_controls(0, 0) == {"button_2"}
+    assert matrix.missing_controls(0, 1) == set()
+    assert matrix.missing_counts() == [[1, 0, 2], [0, 0, 0]]
+
+
+def test_matrix_matches_set_difference(devices):
+    templates = [Template(x) for x in sorted(TEMPLATE_DIR.rglob("*.svg"))]
+
+    matrix = create_compatibility_matrix(devices, templates)
+
+    for device_index, device in enumerate(devices):
+        for template_index, template in enumerate(templates):
+            expected = get_device_controls(device) - get_template_controls(template)
+
+            assert matrix.missing_controls(device_index, template_index) == expected
+            assert ExportDevice(device, template, None).errors == expected
+
+
+def test_get_template_controls():
+    template = Template("tests/data/template_test.svg")
+
+    assert get_template_controls(template) == (
+        template.get_template_buttons()
+        | template.get_template_hats()
+        | template.get_template_axis()
+    )
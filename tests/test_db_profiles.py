@@ -0,0 +1,33 @@
+import pytest
+
+from joystick_diagrams.db import db_connection, db_profile_parents, db_profiles
+
+
+@pytest.fixture(autouse=True)
+def database(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_connection, "data_root", lambda: tmp_path)
+    tmp_path.joinpath(db_connection.DB_DIR).mkdir()
+    db_profiles.create_new_db_if_not_exist()
+    db_profile_parents.create_new_db_if_not_exist()
+
+
+def test_add_profiles():
+    db_profiles.add_profile("dcs_a10")
+    db_profiles.add_profiles(["dcs_a10", "dcs_f16", "dcs_f18"])
+
+    assert db_profiles.get_profile("dcs_f16") == "dcs_f16"
+    assert db_profiles.get_profile("dcs_f18") == "dcs_f18"
+
+
+def test_get_all_profile_parents():
+    db_profiles.add_profiles(["dcs_a10", "dcs_f16", "dcs_base"])
+    db_profile_parents.add_parents_to_profile("dcs_a10", ["dcs_f16", "dcs_base"])
+    db_profile_parents.add_parents_to_profile("dcs_f16", ["dcs_base"])
+
+    assert db_profile_parents.get_all_profile_parents() == {
+        "dcs_a10": ["dcs_f16", "dcs_base"],
+        "dcs_f16": ["dcs_base"],
+    }
+    assert [
+        x for x, _ in db_profiles.get_profile_parents("dcs_a10")
+    ] == db_profile_parents.get_all_profile_parents()["dcs_a10"]
@@ -6,6 +6,13 @@ import pytest
 from joystick_diagrams.export import (
     TEMPLATE_DATING_KEY,
     TEMPLATE_NAMING_KEY,
+    UNUSED_KEYS,
+    ExportOptions,
+    close_export_pool,
+    create_export_job,
+    export_device_to_templates,
+    export_devices,
+    get_export_pool,
     populate_template,
     replace_input_modifier_id_key,
     replace_input_modifiers_string,
@@ -14,12 +21,18 @@ from joystick_diagrams.export import (
     replace_template_name_string,
     replace_unused_keys,
     sanitize_string_for_svg,
+    save_template,
 )
+from joystick_diagrams.export_cache import ExportCache
+from joystick_diagrams.export_device import ExportDevice
+from joystick_diagrams.export_render import EXPORT_FORMAT_PNG, EXPORT_FORMAT_SVG
 from joystick_diagrams.input.axis import Axis, AxisDirection
 from joystick_diagrams.input.button import Button
 from joystick_diagrams.input.device import Device_
 from joystick_diagrams.input.hat import Hat, HatDirection
 from joystick_diagrams.input.modifier import Modifier
+from joystick_diagrams.template import Template
+from joystick_diagrams.template_engine import tokenize
 
 # Unit Tests
 
@@ -104,6 +117,15 @@ def test_unused_keys_cleanup_modifiers():
     assert rep == test_string.format(" | " * (len(controls) - 1))
 
 
+def test_unused_keys_cleanup_many_keys():
+    controls = [f"BUTTON_{x}" for x in range(1, 5001)]
+    test_data = "|".join(controls)
+
+    rep = replace_unused_keys(test_data)
+
+    assert rep == "|" * (len(controls) - 1)
+
+
 def test_replace_basic_key_input_string():
     test_string = '<testData>STRING="ABC">{}<testData>'
     controls = [
@@ -205,6 +227,10 @@ def mock_export_device():
     class MockTemplate:
         raw_data: object
 
+        @property
+        def segments(self):
+            return tokenize(self.raw_data, UNUSED_KEYS)
+
     @dataclass
     class MockWrapper:
         profile_name: str
@@ -241,3 +267,201 @@ def test_template_populate(mock_export_device):
         modified_template
         == "Button Action 1 | Button Action 2 |  | AXIS Control 1 | Hat Control Action 1 |  | Modifier 1 - ctrl"
     )
+
+
+@pytest.fixture()
+def export_device_list(tmp_path):
+    @dataclass
+    class MockWrapper:
+        profile_name: str
+
+    template_file = tmp_path / "template.svg"
+    template_file.write_text(
+        "<text>BUTTON_1</text><text>BUTTON_2</text><text>TEMPLATE_NAME</text>",
+        encoding="utf-8",
+    )
+
+    devices = []
+    for index in range(1, 4):
+        dev = Device_(f"666ec0a0-556b-11ee-8002-44455354000{index}", f"Device {index}")
+        dev.create_input(Button(1), f"Fire {index}")
+        devices.append(
+            ExportDevice(dev, Template(template_file), MockWrapper(f"profile_{index}"))
+        )
+
+    devices.append(ExportDevice(dev, None, MockWrapper("no_template")))
+
+    return devices
+
+
+def test_create_export_job(export_device_list, tmp_path):
+    job = create_export_job(export_device_list[0], tmp_path)
+
+    assert job.template_path == str(tmp_path / "template.svg")
+    assert job.file_name == "666ec-Device 1-profile_1.svg"
+    assert job.substitutions["button_1"] == "Fire 1"
+
+    assert create_export_job(export_device_list[3], tmp_path) is None
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_export_devices(export_device_list, tmp_path, workers):
+    output = tmp_path / "output"
+    progress = []
+
+    summary = export_devices(
+        export_device_list,
+        str(output),
+        ExportOptions(workers=workers),
+        progress=lambda completed, total: progress.append((completed, total)),
+    )
+
+    assert summary.written == 3
+    assert summary.failed == 1
+    assert progress[-1] == (4, 4)
+    assert (output / "666ec-Device 2-profile_2.svg").read_text(
+        encoding="utf-8"
+    ) == "<text>Fire 2</text><text></text><text>profile_2</text>"
+
+
+def test_export_pool_shared_by_exports(export_device_list, tmp_path):
+    options = ExportOptions(workers=8, incremental=False)
+
+    export_devices(export_device_list, str(tmp_path / "first"), options)
+    pool = get_export_pool(8)
+    started = pool.pool
+    summary = export_devices(export_device_list, str(tmp_path / "second"), options)
+
+    assert summary.written == 3
+    assert get_export_pool(8).pool is started
+    # No more workers are started than there are devices to export
+    assert pool.size == 3
+
+    close_export_pool()
+
+
+def test_export_devices_skips_unchanged(export_device_list, tmp_path):
+    output = tmp_path / "output"
+
+    first = export_devices(export_device_list, str(output))
+    second = export_devices(export_device_list, str(output))
+
+    assert (first.written, first.skipped) == (3, 0)
+    assert (second.written, second.skipped) == (0, 3)
+
+    export_device_list[0].device.create_input(Button(2), "Changed")
+    (output / "666ec-Device 2-profile_2.svg").unlink()
+
+    third = export_devices(export_device_list, str(output))
+
+    assert (third.written, third.skipped) == (2, 1)
+    assert "Changed" in (output / "666ec-Device 1-profile_1.svg").read_text(
+        encoding="utf-8"
+    )
+
+    forced = export_devices(
+        export_device_list, str(output), ExportOptions(incremental=False)
+    )
+
+    assert (forced.written, forced.skipped) == (3, 0)
+
+
+def test_export_devices_reports_render_failures(export_device_list, tmp_path):
+    progress = []
+
+    summary = export_devices(
+        export_device_list,
+        str(tmp_path / "output"),
+        ExportOptions(formats=(EXPORT_FORMAT_SVG, EXPORT_FORMAT_PNG)),
+        progress=lambda completed, total: progress.append((completed, total)),
+    )
+
+    # The template is not a complete SVG document, so exports cannot be rendered
+    assert (summary.written, summary.failed, summary.render_failed) == (3, 1, 3)
+    assert progress[3] == (4, 8)
+    assert progress[-1] == (8, 8)
+
+
+def test_export_devices_renders_again_at_new_dpi(export_device_list, tmp_path):
+    pytest.importorskip("PySide6.QtSvg")
+    (tmp_path / "template.svg").write_text(
+        '<svg xmlns="http://www.w3.org/2000/svg" width="200" height="100"><text>BUTTON_1</text></svg>',
+        encoding="utf-8",
+    )
+    output = tmp_path / "output"
+    png = output / "666ec-Device 1-profile_1.png"
+    formats = (EXPORT_FORMAT_SVG, EXPORT_FORMAT_PNG)
+
+    export_devices(
+        export_device_list, str(output), ExportOptions(formats=formats, dpi=96)
+    )
+    low_resolution = png.read_bytes()
+
+    summary = export_devices(
+        export_device_list, str(output), ExportOptions(formats=formats, dpi=192)
+    )
+
+    assert (summary.skipped, summary.render_failed) == (3, 0)
+    assert png.read_bytes() != low_resolution
+
+    png.write_bytes(b"")
+    export_devices(
+        export_device_list, str(output), ExportOptions(formats=formats, dpi=192)
+    )
+
+    assert png.read_bytes() == b""
+
+    export_devices(
+        export_device_list,
+        str(output),
+        ExportOptions(formats=formats, dpi=192, incremental=False),
+    )
+
+    assert png.read_bytes() != b""
+
+
+def test_export_devices_restores_from_cache(export_device_list, tmp_path):
+    cache = ExportCache(tmp_path / "cache")
+
+    first = export_devices(export_device_list, str(tmp_path / "first"), cache=cache)
+    second = export_devices(export_device_list, str(tmp_path / "second"), cache=cache)
+
+    assert (first.written, first.cached) == (3, 0)
+    assert (second.written, second.cached) == (3, 3)
+    assert cache.stats.stores == 3
+
+    for exported in (tmp_path / "first").glob("*.svg"):
+        restored = tmp_path / "second" / exported.name
+        assert restored.read_text(encoding="utf-8") == exported.read_text(
+            encoding="utf-8"
+        )
+
+
+def test_export_device_to_templates_skips_unchanged(export_device_list, tmp_path):
+    assert export_device_to_templates(export_device_list[0], tmp_path) is True
+    assert export_device_to_templates(export_device_list[0], tmp_path) is False
+
+
+def test_save_template_streams_segments(tmp_path):
+    save_template(
+        iter(["<svg>", "Button Action 1", "</svg>"]), "streamed.svg", tmp_path
+    )
+
+    assert (tmp_path / "streamed.svg").read_text(
+        encoding="utf-8"
+    ) == "<svg>Button Action 1</svg>"
+    assert not (tmp_path / "streamed.svg.tmp").exists()
+
+
+def test_save_template_keeps_existing_file_on_failure(tmp_path):
+    (tmp_path / "existing.svg").write_text("previous", encoding="utf-8")
+
+    def failing_segments():
+        yield "<svg>"
+        raise ValueError("Render failed")
+
+    with pytest.raises(ValueError):
+        save_template(failing_segments(), "existing.svg", tmp_path)
+
+    assert (tmp_path / "existing.svg").read_text(encoding="utf-8") == "previous"
+    assert not (tmp_path / "existing.svg.tmp").exists()
@@ -0,0 +1,89 @@
+import os
+
+from joystick_diagrams.export_cache import ExportCache
+
+
+def create_file(path, data="<svg></svg>"):
+    path.write_text(data, encoding="UTF8")
+    return path
+
+
+def test_restore_missing(tmp_path):
+    cache = ExportCache(tmp_path / "cache")
+
+    assert cache.restore("abc", tmp_path / "output.svg") is False
+    assert cache.stats.misses == 1
+    assert not (tmp_path / "output.svg").exists()
+
+
+def test_store_and_restore(tmp_path):
+    cache = ExportCache(tmp_path / "cache")
+    source = create_file(tmp_path / "source.svg", "<svg>Fire</svg>")
+
+    cache.store("abc", source)
+
+    assert cache.restore("abc", tmp_path / "output.svg") is True
+    assert (tmp_path / "output.svg").read_text(encoding="UTF8") == "<svg>Fire</svg>"
+    assert cache.stats.stores == 1
+    assert cache.stats.hits == 1
+
+
+def test_restore_replaces_existing_file(tmp_path):
+    cache = ExportCache(tmp_path / "cache", hard_link=True)
+    cache.store("abc", create_file(tmp_path / "source.svg", "new"))
+    destination = create_file(tmp_path / "output.svg", "old")
+
+    assert cache.restore("abc", destination) is True
+    assert destination.read_text(encoding="UTF8") == "new"
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ExportCache(tmp_path / "cache", max_bytes=20)
+
+    for number, fingerprint in enumerate(["a", "b"]):
+        cache.store(fingerprint, create_file(tmp_path / "source.svg", "x" * 10))
+        os.utime(cache.path_for(fingerprint), ns=(number, number))
+
+    cache.store("c", create_file(tmp_path / "source.svg", "x" * 10))
+
+    assert not cache.path_for("a").exists()
+    assert cache.path_for("b").exists()
+    assert cache.path_for("c").exists()
+    assert cache.stats.evictions == 1
+    assert cache.size == 20
+
+
+def test_clear(tmp_path):
+    cache = ExportCache(tmp_path / "cache")
+    cache.store("abc", create_file(tmp_path / "source.svg"))
+
+    cache.clear()
+
+    assert cache.files() == []
+
+
+def test_store_reads_directory_once(tmp_path, monkeypatch):
+    cache = ExportCache(tmp_path / "cache", max_bytes=50)
+    listed = []
+    files = cache.files
+    monkeypatch.setattr(cache, "files", lambda: listed.append(1) or files())
+
+    for fingerprint in range(20):
+        cache.store(str(fingerprint), create_file(tmp_path / "source.svg", "x" * 10))
+
+    assert len(listed) == 1
+    assert cache.size == 50
+    assert len(files()) == 5
+    assert cache.stats.evictions == 15
+
+
+def test_restore_marks_recently_used(tmp_path):
+    cache = ExportCache(tmp_path / "cache", max_bytes=20)
+    cache.store("a", create_file(tmp_path / "source.svg", "x" * 10))
+    cache.store("b", create_file(tmp_path / "source.svg", "x" * 10))
+
+    cache.restore("a", tmp_path / "output.svg")
+    cache.store("c", create_file(tmp_path / "source.svg", "x" * 10))
+
+    assert cache.path_for("a").exists()
+    assert not cache.path_for("b").exists()
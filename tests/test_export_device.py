@@ -76,6 +76,28 @@ def test_template_set(export_device, template):
     assert export_device.errors is not None
 
 
+def test_template_errors_checked_when_used(export_device, device, template):
+    template = Template(template.template_path, lazy=True)
+    export_device.template = template
+
+    assert template.loaded is False
+    assert export_device.errors == {"pov_3_u", "axis_rz", "button_90"}
+
+    other_device = ExportDevice(device, template, None)
+    other_device.template = template
+
+    assert other_device.errors == export_device.errors
+    assert other_device.errors is not export_device.errors
+
+
+def test_template_errors_reset_on_template_change(export_device, template):
+    export_device.template = template
+    assert export_device.errors
+
+    export_device.template = None
+    assert export_device.errors == set()
+
+
 def test_template_compatibility(export_device, template):
     export_device.template = template
 
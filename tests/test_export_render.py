@@ -0,0 +1,137 @@
+import json
+import os
+
+import pytest
+
+from joystick_diagrams import export_render
+from joystick_diagrams.export_manifest import (
+    MANIFEST_FILE,
+    MANIFEST_VERSION,
+    ExportManifest,
+)
+from joystick_diagrams.export_render import (
+    EXPORT_FORMAT_PDF,
+    EXPORT_FORMAT_PNG,
+    EXPORT_FORMAT_SVG,
+    get_render_path,
+    is_rendered,
+    render_exports,
+)
+
+SVG = '<svg xmlns="http://www.w3.org/2000/svg" width="200" height="100"><text x="10" y="50">Fire</text></svg>'
+
+
+@pytest.fixture
+def svg_file(tmp_path):
+    source = tmp_path / "device.svg"
+    source.write_text(SVG, encoding="UTF8")
+    os.utime(source, ns=(1_000, 1_000))
+    return source
+
+
+def test_get_render_path(tmp_path):
+    assert get_render_path(tmp_path / "a.b.svg", "png") == tmp_path / "a.b.png"
+
+
+def test_is_rendered(svg_file):
+    manifest = ExportManifest(svg_file.parent)
+    png = get_render_path(svg_file, EXPORT_FORMAT_PNG)
+
+    assert is_rendered(svg_file, [EXPORT_FORMAT_PNG], 150, manifest) is False
+
+    png.write_bytes(b"")
+    assert is_rendered(svg_file, [EXPORT_FORMAT_PNG], 150, manifest) is False
+
+    manifest.update_render(svg_file.name, [EXPORT_FORMAT_PNG], 150)
+    assert is_rendered(svg_file, [EXPORT_FORMAT_PNG], 150, manifest) is True
+    assert is_rendered(svg_file, [EXPORT_FORMAT_PNG], 300, manifest) is False
+    assert (
+        is_rendered(svg_file, [EXPORT_FORMAT_PNG, EXPORT_FORMAT_PDF], 150, manifest)
+        is False
+    )
+
+    os.utime(png, ns=(0, 0))
+    assert is_rendered(svg_file, [EXPORT_FORMAT_PNG], 150, manifest) is False
+
+
+def test_manifest_reads_version_1(tmp_path):
+    entries = {"device.svg": {"fingerprint": "abc"}}
+    (tmp_path / MANIFEST_FILE).write_text(
+        json.dumps({"version": 1, "entries": entries}), encoding="UTF8"
+    )
+
+    manifest = ExportManifest(tmp_path)
+    manifest.save()
+
+    assert manifest.entries == entries
+    assert manifest.renders == {}
+    assert json.loads((tmp_path / MANIFEST_FILE).read_text(encoding="UTF8")) == {
+        "version": MANIFEST_VERSION,
+        "entries": entries,
+        "renders": {},
+    }
+
+
+def test_render_exports_svg_only(svg_file):
+    assert render_exports([svg_file], [EXPORT_FORMAT_SVG]) == 0
+    assert list(svg_file.parent.iterdir()) == [svg_file]
+
+
+def test_render_exports_skips_rendered(svg_file):
+    manifest = ExportManifest(svg_file.parent)
+    manifest.update_render(svg_file.name, [EXPORT_FORMAT_PNG], 150)
+    get_render_path(svg_file, EXPORT_FORMAT_PNG).write_bytes(b"")
+    progress = []
+
+    assert (
+        render_exports(
+            [svg_file],
+            [EXPORT_FORMAT_SVG, EXPORT_FORMAT_PNG],
+            150,
+            manifest=manifest,
+            progress=lambda completed, total: progress.append((completed, total)),
+        )
+        == 0
+    )
+    assert get_render_path(svg_file, EXPORT_FORMAT_PNG).read_bytes() == b""
+    assert progress == [(1, 1)]
+
+
+def test_render_exports(svg_file):
+    pytest.importorskip("PySide6.QtSvg")
+
+    assert render_exports([svg_file], [EXPORT_FORMAT_PNG, EXPORT_FORMAT_PDF]) == 0
+    assert (
+        get_render_path(svg_file, EXPORT_FORMAT_PNG).read_bytes().startswith(b"\x89PNG")
+    )
+    assert get_render_path(svg_file, EXPORT_FORMAT_PDF).read_bytes().startswith(b"%PDF")
+    # Qt is set up only in the render workers
+    assert export_render._application is None
+
+
+def test_render_exports_records_dpi(svg_file):
+    pytest.importorskip("PySide6.QtSvg")
+    manifest = ExportManifest(svg_file.parent)
+    png = get_render_path(svg_file, EXPORT_FORMAT_PNG)
+
+    assert render_exports([svg_file], [EXPORT_FORMAT_PNG], 96, manifest=manifest) == 0
+    low_resolution = png.read_bytes()
+
+    assert render_exports([svg_file], [EXPORT_FORMAT_PNG], 192, manifest=manifest) == 0
+    assert png.read_bytes() != low_resolution
+    assert manifest.get_render_dpi(svg_file.name, EXPORT_FORMAT_PNG) == 192
+
+
+def test_render_exports_records_failures(tmp_path):
+    source = tmp_path / "device.svg"
+    source.write_text("not an svg", encoding="UTF8")
+    manifest = ExportManifest(tmp_path)
+    manifest.update_render(source.name, [EXPORT_FORMAT_PNG], 150)
+
+    assert (
+        render_exports(
+            [source], [EXPORT_FORMAT_PNG], 150, manifest=manifest, incremental=False
+        )
+        == 1
+    )
+    assert manifest.get_render_dpi(source.name, EXPORT_FORMAT_PNG) is None
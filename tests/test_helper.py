@@ -1,3 +1,4 @@
+import logging
 from pathlib import Path
 from unittest.mock import patch
 
@@ -10,3 +11,19 @@ def test_dir_create_exception(caplog):
         utils.create_directory("testdir")
 
         assert "Failed to create directory: testdir" in caplog.text
+
+
+def test_setup_worker_logging_replaces_file_handlers(tmp_path):
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    root.addHandler(logging.FileHandler(tmp_path / "application.log"))
+
+    try:
+        utils.setup_worker_logging()
+
+        assert [type(x) for x in root.handlers] == [logging.StreamHandler]
+    finally:
+        for handler in root.handlers:
+            handler.close()
+
+        root.handlers[:] = handlers
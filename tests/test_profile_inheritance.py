@@ -0,0 +1,180 @@
+import pytest
+
+from joystick_diagrams.exceptions import ProfileInheritanceCycleError
+from joystick_diagrams.input.button import Button
+from joystick_diagrams.input.profile import Profile_
+from joystick_diagrams.profile_inheritance import ProfileInheritance
+
+GUID = "666ec0a0-556b-11ee-8002-444553540000"
+
+
+def create_profile(name: str, inputs: dict[int, str]) -> Profile_:
+    profile = Profile_(name)
+    device = profile.add_device(GUID, "device")
+
+    for button, command in inputs.items():
+        device.create_input(Button(button), command)
+
+    return profile
+
+
+def get_commands(profile: Profile_) -> dict[str, str]:
+    return {
+        key: value.command
+        for key, value in profile.devices[GUID].get_combined_inputs().items()
+    }
+
+
+@pytest.fixture
+def profiles():
+    return {
+        "base": create_profile("base", {1: "Base", 2: "Base", 3: "Base"}),
+        "aircraft": create_profile("aircraft", {2: "Aircraft"}),
+        "variant": create_profile("variant", {3: "Variant"}),
+        "other": create_profile("other", {}),
+    }
+
+
+def test_resolves_parents_of_parents(profiles):
+    inheritance = ProfileInheritance(
+        profiles, {"variant": ["aircraft"], "aircraft": ["base"]}
+    )
+
+    assert inheritance.get_order().index("base") < inheritance.get_order().index(
+        "aircraft"
+    )
+    assert get_commands(inheritance.resolve("variant")) == {
+        "BUTTON_3": "Variant",
+        "BUTTON_2": "Aircraft",
+        "BUTTON_1": "Base",
+    }
+    assert get_commands(profiles["variant"]) == {"BUTTON_3": "Variant"}
+
+
+def test_first_parent_takes_precedence(profiles):
+    inheritance = ProfileInheritance(profiles, {"other": ["aircraft", "base"]})
+
+    assert get_commands(inheritance.resolve("other"))["BUTTON_2"] == "Aircraft"
+
+
+def test_shared_parent_resolved_once(profiles):
+    inheritance = ProfileInheritance(
+        profiles, {"variant": ["aircraft"], "other": ["aircraft"], "aircraft": ["base"]}
+    )
+
+    variant = inheritance.resolve("variant")
+    other = inheritance.resolve("other")
+
+    assert (
+        variant.devices[GUID].get_layers()[1]
+        is inheritance.resolve("aircraft").devices[GUID]
+    )
+    assert other.devices[GUID].get_layers()[1] is variant.devices[GUID].get_layers()[1]
+
+
+def test_unknown_parents_ignored(profiles):
+    inheritance = ProfileInheritance(profiles, {"variant": ["missing", "base"]})
+
+    assert inheritance.parents["variant"] == ["base"]
+
+
+def test_cycle_detected(profiles, caplog):
+    inheritance = ProfileInheritance(
+        profiles,
+        {"base": ["variant"], "variant": ["aircraft"], "aircraft": ["base"]},
+    )
+
+    with pytest.raises(ProfileInheritanceCycleError) as e:
+        inheritance.get_order()
+
+    assert len(e.value.cycle) == 4
+    assert e.value.cycle[0] == e.value.cycle[-1]
+
+    # The parent closing the cycle is dropped, so the remaining parents are still resolved
+    resolved = inheritance.resolve_all()
+
+    assert "inherit from each other" in caplog.text
+    assert len(resolved) == 4
+    assert sum(len(x) for x in inheritance.parents.values()) == 2
+
+
+@pytest.fixture
+def inheritance(profiles):
+    inheritance = ProfileInheritance(
+        profiles,
+        {"variant": ["aircraft"], "aircraft": ["base"], "other": ["base"]},
+    )
+    inheritance.resolve_all()
+
+    return inheritance
+
+
+def test_update_unchanged(inheritance):
+    change = inheritance.update(inheritance.profiles, inheritance.parents)
+
+    assert change.inputs == {}
+
+
+def test_update_profile_invalidates_descendants(inheritance, profiles):
+    variant = inheritance.resolve("variant")
+    base = create_profile("base", {1: "Changed", 2: "Base", 3: "Base"})
+
+    change = inheritance.update({**profiles, "base": base}, inheritance.parents)
+
+    assert set(change.profiles) == {"base", "aircraft", "other", "variant"}
+    assert change.inputs["base"] == {GUID: {"BUTTON_1"}}
+    assert change.inputs["variant"] == {GUID: {"BUTTON_1"}}
+
+    # Merged profiles are updated in place
+    assert inheritance.resolve("variant") is variant
+    assert get_commands(variant)["BUTTON_1"] == "Changed"
+
+
+def test_update_parents_only_affects_descendants(inheritance, profiles):
+    other = inheritance.resolve("other")
+    change = inheritance.update(
+        profiles, {**inheritance.parents, "aircraft": [], "variant": ["aircraft"]}
+    )
+
+    assert set(change.profiles) == {"aircraft", "variant"}
+    assert change.inputs["aircraft"] == {GUID: {"BUTTON_1", "BUTTON_3"}}
+    assert get_commands(inheritance.resolve("variant")) == {
+        "BUTTON_3": "Variant",
+        "BUTTON_2": "Aircraft",
+    }
+    assert inheritance.resolve("other") is other
+
+
+def test_update_devices_added_and_removed(inheritance, profiles):
+    other_guid = "666ec0a0-556b-11ee-8002-444553540001"
+    base = create_profile("base", {})
+    base.devices = {}
+    base.add_device(other_guid, "other device").create_input(Button(9), "New")
+
+    change = inheritance.update({**profiles, "base": base}, inheritance.parents)
+
+    assert change.inputs["other"] == {
+        GUID: {"BUTTON_1", "BUTTON_2", "BUTTON_3"},
+        other_guid: {"BUTTON_9"},
+    }
+    assert change.inputs["variant"][other_guid] == {"BUTTON_9"}
+    assert get_commands(inheritance.resolve("other")) == {}
+    assert other_guid in inheritance.resolve("other").devices
+
+
+def test_update_cycle_leaves_profiles_unchanged(inheritance, profiles):
+    parents = dict(inheritance.parents)
+
+    with pytest.raises(ProfileInheritanceCycleError):
+        inheritance.update(profiles, {**parents, "base": ["variant"]})
+
+    assert inheritance.parents == parents
+
+
+def test_update_removed_profile(inheritance, profiles):
+    del profiles["variant"]
+
+    change = inheritance.update(profiles, inheritance.parents)
+
+    assert change.removed == ["variant"]
+    assert "variant" not in inheritance.resolve_all()
@@ -3,7 +3,7 @@ from pathlib import Path
 import pytest
 
 from joystick_diagrams.exceptions import JoystickDiagramsError
-from joystick_diagrams.template import Template
+from joystick_diagrams.template import Template, TemplateCache
 
 
 @pytest.fixture
@@ -21,6 +21,17 @@ def test_template_set_failure():
         Template("")
 
 
+def test_template_from_data(get_template_path_valid):
+    data = get_template_path_valid.read_bytes()
+    template = Template.from_data(Path("missing.svg"), data)
+
+    assert template.loaded is True
+    assert template.placeholders == Template(get_template_path_valid).placeholders
+
+    with pytest.raises(JoystickDiagramsError):
+        Template.from_data(Path("missing.svg"), b"\xff")
+
+
 def test_template_hat_property(get_template_path_valid):
     expected_hats = {
         "pov_1_r",
@@ -101,3 +112,149 @@ def test_template_template_date_missing(get_template_path_valid):
         Template.TEMPLATE_DATE_KEY, "", setup_template.raw_data
     )
     assert setup_template.date is False
+
+
+def test_template_placeholder_index_offsets(get_template_path_valid):
+    setup_template = Template(get_template_path_valid)
+
+    for key, offsets in setup_template.placeholders["buttons"].items():
+        for offset in offsets:
+            assert setup_template.raw_data[offset : offset + len(key)].lower() == key
+
+
+def test_template_placeholder_index_rebuilt_on_data_change(get_template_path_valid):
+    setup_template = Template(get_template_path_valid)
+    setup_template.raw_data = "<text>BUTTON_5</text><text>POV_1_U</text>"
+
+    assert setup_template.get_template_buttons() == {"button_5"}
+    assert setup_template.get_template_hats() == {"pov_1_u"}
+    assert setup_template.axis_count == 0
+    assert setup_template.placeholders["buttons"]["button_5"] == [6]
+
+
+def test_template_segments_from_index(get_template_path_valid):
+    setup_template = Template(get_template_path_valid)
+    setup_template.raw_data = "BUTTON_1 | stroke_width | TEMPLATE_NAME"
+
+    assert (
+        setup_template.segments.render({"template_name": "Profile"})
+        == " | stroke_width | Profile"
+    )
+
+
+def test_template_segments_with_placeholder_lengthened_by_lower_case(
+    get_template_path_valid,
+):
+    setup_template = Template(get_template_path_valid)
+    setup_template.raw_data = "<text>X_İİ BUTTON_1</text>"
+
+    assert setup_template.placeholders["other"]["x_i̇i̇"] == [6]
+    assert (
+        setup_template.segments.render({"button_1": "Fire"}) == "<text>X_İİ Fire</text>"
+    )
+
+
+def test_template_cache_reuses_template(tmp_path):
+    template_file = tmp_path / "cached.svg"
+    template_file.write_text("<text>BUTTON_1</text>", encoding="utf-8")
+    cache = TemplateCache()
+
+    assert cache.get(template_file) is cache.get(str(template_file))
+    assert len(cache) == 1
+
+
+def test_template_cache_reloads_changed_file(tmp_path):
+    template_file = tmp_path / "cached.svg"
+    template_file.write_text("<text>BUTTON_1</text>", encoding="utf-8")
+    cache = TemplateCache()
+    original = cache.get(template_file)
+
+    template_file.write_text("<text>BUTTON_1 BUTTON_2</text>", encoding="utf-8")
+    reloaded = cache.get(template_file)
+
+    assert reloaded is not original
+    assert reloaded.button_count == 2
+    assert len(cache) == 1
+
+
+def test_template_cache_evicts_least_recently_used(tmp_path):
+    paths = []
+    for name in ["a", "b", "c"]:
+        template_file = tmp_path / f"{name}.svg"
+        template_file.write_text("BUTTON_1".ljust(100), encoding="utf-8")
+        paths.append(template_file)
+
+    cache = TemplateCache(max_bytes=250)
+    first = cache.get(paths[0])
+    cache.get(paths[1])
+    cache.get(paths[0])
+    cache.get(paths[2])
+
+    assert len(cache) == 2
+    assert cache.total_bytes == 200
+    assert cache.get(paths[0]) is first
+
+
+def test_lazy_template_loads_on_first_use(get_template_path_valid):
+    template = Template(get_template_path_valid, lazy=True)
+
+    assert template.loaded is False
+    assert template.template_file_name == "template_test.svg"
+    assert template.memory_usage().heap_bytes == 0
+
+    assert template.button_count == Template(get_template_path_valid).button_count
+    assert template.loaded is True
+
+
+def test_lazy_template_missing_file_raises_on_use(tmp_path):
+    template = Template(tmp_path / "missing.svg", lazy=True)
+
+    with pytest.raises(JoystickDiagramsError):
+        template.get_template_buttons()
+
+
+def test_template_cache_missing_file(tmp_path):
+    with pytest.raises(JoystickDiagramsError):
+        TemplateCache().get(tmp_path / "missing.svg")
+
+
+def test_memory_mapped_template(tmp_path):
+    template_file = tmp_path / "template.svg"
+    template_file.write_bytes(
+        "<text>Ünïcode BUTTON_1</text><text>POV_1_U TEMPLATE_NAME</text>".encode()
+    )
+
+    template = Template(template_file)
+    mapped = Template(template_file, memory_mapped=True)
+
+    assert mapped.memory_mapped is True
+    assert mapped.placeholders == template.placeholders
+    assert mapped.content_hash == template.content_hash
+    assert mapped.segments.render({"button_1": "Fire"}) == template.segments.render(
+        {"button_1": "Fire"}
+    )
+    assert mapped.memory_usage().mapped_bytes == template_file.stat().st_size
+    assert template.memory_usage().mapped_bytes == 0
+
+
+def test_memory_mapped_template_with_cr_newlines(tmp_path):
+    template_file = tmp_path / "template.svg"
+    template_file.write_bytes(b"<text>BUTTON_1</text>\r\n<text>BUTTON_2</text>")
+
+    template = Template(template_file, memory_mapped=True)
+
+    assert template.memory_mapped is False
+    assert template.raw_data == "<text>BUTTON_1</text>\n<text>BUTTON_2</text>"
+    assert template.get_template_buttons() == {"button_1", "button_2"}
+
+
+def test_template_cache_memory_maps_large_templates(tmp_path):
+    small = tmp_path / "small.svg"
+    small.write_text("<text>BUTTON_1</text>", encoding="utf-8")
+    large = tmp_path / "large.svg"
+    large.write_text("<text>BUTTON_1</text>" * 10, encoding="utf-8")
+    cache = TemplateCache(memory_map_min_bytes=100)
+
+    assert cache.get(small).memory_mapped is False
+    assert cache.get(large).memory_mapped is True
+    assert set(cache.memory_usage()) == {small.resolve(), large.resolve()}
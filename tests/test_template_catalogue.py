@@ -0,0 +1,173 @@
+import os
+
+import pytest
+
+from joystick_diagrams import template_catalogue
+from joystick_diagrams.db import db_connection, db_settings, db_template_catalogue
+from joystick_diagrams.export_device import ExportDevice
+from joystick_diagrams.input.button import Button
+from joystick_diagrams.input.device import Device_
+from joystick_diagrams.template import Template
+from joystick_diagrams.template_catalogue import (
+    find_templates,
+    get_catalogued_controls,
+    get_catalogued_templates,
+    get_template_directories,
+    scan_templates,
+    store_user_template_directories,
+)
+from joystick_diagrams.template_recommendation import TemplateRecommender
+from joystick_diagrams.ui.device_setup_controller import check_export_devices
+from joystick_diagrams.utils import find_template_files
+
+
+@pytest.fixture(autouse=True)
+def database(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_connection, "data_root", lambda: tmp_path)
+    tmp_path.joinpath(db_connection.DB_DIR).mkdir()
+    db_settings.create_new_db_if_not_exist()
+    db_template_catalogue.create_new_db_if_not_exist()
+
+
+@pytest.fixture
+def template_directory(tmp_path):
+    directory = tmp_path.joinpath("templates")
+    templates = {
+        "Stick.svg": "BUTTON_1 BUTTON_2 POV_1_U POV_1_D POV_2_U AXIS_X",
+        "Vendor/Panel.svg": " ".join(f"BUTTON_{x}" for x in range(1, 33)),
+        "Vendor/Grip/Grip.svg": "BUTTON_1 POV_1_L",
+    }
+
+    for name, placeholders in templates.items():
+        template_file = directory.joinpath(name)
+        template_file.parent.mkdir(parents=True, exist_ok=True)
+        template_file.write_text(f"<svg>{placeholders}</svg>", encoding="utf-8")
+
+    return directory.resolve()
+
+
+def test_find_template_files(template_directory):
+    assert [x.name for x in find_template_files(template_directory)] == [
+        "Stick.svg",
+        "Grip.svg",
+        "Panel.svg",
+    ]
+
+
+def test_scan_indexes_subdirectories(template_directory):
+    scan = scan_templates([template_directory])
+
+    assert scan.added == 3
+    assert [x.path.name for x in get_catalogued_templates()] == [
+        "Stick.svg",
+        "Grip.svg",
+        "Panel.svg",
+    ]
+
+    stick = get_catalogued_templates()[0]
+    assert stick.buttons == 2
+    assert stick.hats == 2
+    assert stick.axis == 1
+    assert stick.controls == {
+        "button_1",
+        "button_2",
+        "pov_1_u",
+        "pov_1_d",
+        "pov_2_u",
+        "axis_x",
+    }
+
+
+def test_rescan_only_reads_changed_templates(template_directory):
+    scan_templates([template_directory])
+
+    changed = template_directory.joinpath("Stick.svg")
+    changed.write_text("<svg>BUTTON_1</svg>", encoding="utf-8")
+    os.utime(changed, ns=(0, 0))
+    template_directory.joinpath("Vendor/Grip/Grip.svg").unlink()
+
+    scan = scan_templates([template_directory])
+
+    assert (scan.added, scan.updated, scan.removed, scan.unchanged) == (0, 1, 1, 1)
+    assert get_catalogued_templates()[0].buttons == 1
+
+
+def test_find_templates_by_controls(template_directory):
+    scan_templates([template_directory])
+
+    assert [x.path.name for x in find_templates(min_buttons=32)] == ["Panel.svg"]
+    assert [x.path.name for x in find_templates(min_buttons=2, min_hats=2)] == [
+        "Stick.svg"
+    ]
+    assert find_templates(min_modifiers=1) == []
+
+
+def test_user_template_directories(template_directory, tmp_path, monkeypatch):
+    bundled = tmp_path.joinpath("bundled").resolve()
+    bundled.mkdir()
+    bundled.joinpath("Bundled.svg").write_text("<svg>BUTTON_1</svg>", encoding="utf-8")
+    monkeypatch.setattr(
+        "joystick_diagrams.template_catalogue.get_bundled_template_directory",
+        lambda: bundled,
+    )
+
+    store_user_template_directories([template_directory])
+    assert get_template_directories() == [bundled, template_directory]
+    assert scan_templates().added == 4
+
+    store_user_template_directories([])
+    scan = scan_templates()
+
+    # Templates of the removed user directory are dropped
+    assert (scan.removed, scan.unchanged) == (3, 1)
+    assert [x.path.name for x in get_catalogued_templates()] == ["Bundled.svg"]
+
+
+def test_recommender_from_catalogue(template_directory):
+    scan_templates([template_directory])
+
+    recommender = TemplateRecommender.from_catalogue(get_catalogued_templates())
+
+    assert [x.name for x in recommender.candidates] == [
+        "stick",
+        "vendor grip grip",
+        "vendor panel",
+    ]
+
+
+def test_get_catalogued_controls(template_directory, monkeypatch):
+    stick = template_directory.joinpath("Stick.svg")
+    outside = template_directory.parent.joinpath("Outside.svg")
+    outside.write_text("<svg>BUTTON_3</svg>", encoding="utf-8")
+
+    assert get_catalogued_controls([stick, outside]) == {
+        stick: {"button_1", "button_2", "pov_1_u", "pov_1_d", "pov_2_u", "axis_x"},
+        outside: {"button_3"},
+    }
+
+    # Catalogued templates are not read again
+    monkeypatch.setattr(template_catalogue, "create_catalogue_entry", None)
+
+    assert get_catalogued_controls([outside]) == {outside: {"button_3"}}
+
+
+def test_check_export_devices_uses_catalogue(template_directory):
+    device = Device_("12345678-1234-5678-1234-567812345678", "Stick")
+    device.create_input(Button(1), "Fire")
+    device.create_input(Button(3), "Missing")
+    template = Template(template_directory.joinpath("Stick.svg"), lazy=True)
+    export_device = ExportDevice(device, template, None)
+
+    check_export_devices([export_device])
+
+    assert export_device.errors == {"button_3"}
+    assert template.loaded is False
+
+
+def test_find_templates_searches_counts_index():
+    con = db_connection.connection()
+    plan = con.execute(
+        f"EXPLAIN QUERY PLAN SELECT path from {db_template_catalogue.TABLE_NAME} WHERE buttons >= 1 AND axis >= 1 AND hats >= 1 AND modifiers >= 1"
+    ).fetchall()
+
+    assert f"{db_template_catalogue.TABLE_NAME}_counts" in plan[0][3]
@@ -0,0 +1,103 @@
+import pytest
+
+from joystick_diagrams.template import Template
+from joystick_diagrams.template_compiler import (
+    CompiledPlaceholder,
+    CompiledTemplate,
+    CompiledTemplateStore,
+    dumps,
+    loads,
+)
+
+TEMPLATE_DATA = "<svg>\r\n<text>Ünïcode BUTTON_1</text>\r\n<text>AXIS_X_Modifier_1_Key</text><text>TEMPLATE_NAME POV_1_U</text></svg>"
+
+
+@pytest.fixture
+def template_file(tmp_path):
+    template = tmp_path / "template.svg"
+    template.write_bytes(TEMPLATE_DATA.encode("utf-8"))
+    return template
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CompiledTemplateStore(tmp_path / "compiled")
+
+
+def test_dumps_loads():
+    compiled = CompiledTemplate(
+        bytes(32),
+        (CompiledPlaceholder(10, 8, 9, 0, 1), CompiledPlaceholder(30, 6, 29, 1, 4)),
+        ("button_1", "pov_1_u"),
+    )
+
+    assert loads(dumps(compiled)) == compiled
+
+
+@pytest.mark.parametrize(
+    "data", [b"", b"JDTC", b"XXXX" + dumps(CompiledTemplate(bytes(32), (), ()))[4:]]
+)
+def test_loads_invalid(data):
+    with pytest.raises(ValueError):
+        loads(data)
+
+
+def test_loads_truncated():
+    compiled = CompiledTemplate(bytes(32), (), ("button_1",))
+
+    with pytest.raises(ValueError):
+        loads(dumps(compiled)[:-1])
+
+
+def test_compiled_template_matches_template(template_file, store):
+    template = Template(template_file)
+    compiled = Template(template_file, store)
+    loaded = Template(template_file, store)
+
+    assert len(list(store.directory.iterdir())) == 1
+    assert loaded._compiled is not None
+
+    for other in (compiled, loaded):
+        assert other.placeholders == template.placeholders
+        assert other.segments == template.segments
+        assert other.content_hash == template.content_hash
+        assert other.raw_data == template.raw_data
+
+
+def test_compiled_from_text_matches_compiled_from_data(tmp_path, store):
+    template_file = tmp_path / "non_ascii.svg"
+    template_file.write_bytes("<text>X_İİ BUTTON_1 X_\u212a</text>".encode())
+    template = Template(template_file)
+    compiled = template.compile(bytes(32))
+
+    assert compiled == template.compile_data(template_file.read_bytes(), bytes(32))
+    assert compiled.keys == ("button_1",)
+
+    Template(template_file, store)
+    loaded = Template(template_file, store)
+
+    assert loaded._compiled == template.compile(loaded._compiled.source_hash)
+    assert loaded.segments.render({"button_1": "Fire"}) == template.segments.render(
+        {"button_1": "Fire"}
+    )
+
+
+def test_changed_template_is_recompiled(template_file, store):
+    Template(template_file, store)
+    template_file.write_text("<text>BUTTON_2</text>", encoding="utf-8")
+
+    template = Template(template_file, store)
+
+    assert template.get_template_buttons() == {"button_2"}
+    assert len(list(store.directory.iterdir())) == 2
+
+
+def test_invalid_compiled_template_is_replaced(template_file, store):
+    template = Template(template_file, store)
+    compiled_file = next(store.directory.iterdir())
+    compiled_file.write_bytes(b"invalid")
+
+    reloaded = Template(template_file, store)
+
+    assert reloaded.placeholders == template.placeholders
+    assert loads(compiled_file.read_bytes()).keys
@@ -0,0 +1,77 @@
+from joystick_diagrams.export import UNUSED_KEYS
+from joystick_diagrams.template_engine import (
+    blank_placeholders,
+    build_mapped_segments,
+    scan_placeholders,
+    tokenize,
+)
+
+
+def test_tokenize_splits_literals_and_placeholders():
+    segments = tokenize("<text>BUTTON_1</text><text>AXIS_X</text>", UNUSED_KEYS)
+
+    assert segments.literals == ("<text>", "</text><text>", "</text>")
+    assert [x.text for x in segments.placeholders] == ["BUTTON_1", "AXIS_X"]
+
+
+def test_tokenize_whole_words_only():
+    segments = tokenize("BUTTON_1 BUTTON_10 BUTTON_1_Modifiers", UNUSED_KEYS)
+
+    assert [x.key for x in segments.placeholders] == [
+        "button_1",
+        "button_10",
+        "button_1_modifiers",
+    ]
+
+
+def test_render_case_insensitive_substitution():
+    segments = tokenize("button_1 | Button_1 | BUTTON_1", UNUSED_KEYS)
+
+    assert segments.render({"button_1": "Fire"}) == "Fire | Fire | Fire"
+
+
+def test_render_blanks_unused_keys():
+    segments = tokenize("BUTTON_2 | POV_1_U | AXIS_X_Modifier_1_Key", UNUSED_KEYS)
+
+    assert segments.render({}) == " |  | "
+
+
+def test_render_keeps_unknown_words():
+    segments = tokenize("TEMPLATE_NAME | stroke_width | BUTTON_X", UNUSED_KEYS)
+
+    assert segments.render({}) == "TEMPLATE_NAME | stroke_width | BUTTON_X"
+
+
+def test_render_values_are_not_rescanned():
+    segments = tokenize("BUTTON_1 | BUTTON_2", UNUSED_KEYS)
+
+    assert segments.render({"button_1": "BUTTON_2 \\1"}) == "BUTTON_2 \\1 | "
+
+
+def test_blank_placeholders():
+    data = "BUTTON_1 | Button_2_Modifiers | TEMPLATE_NAME | AXIS_SLIDER_1"
+
+    assert blank_placeholders(data, UNUSED_KEYS) == " |  | TEMPLATE_NAME | "
+
+
+def test_blank_placeholders_no_keys():
+    assert blank_placeholders("BUTTON_1", []) == "BUTTON_1"
+
+
+def test_scan_placeholders():
+    data = "<text>é BUTTON_1</text>•AXIS_X éPOV_1_U BUTTON_2é TEMPLATE_NAME".encode()
+
+    assert list(scan_placeholders(data)) == [
+        (9, 8, 8, "BUTTON_1"),
+        (27, 6, 24, "AXIS_X"),
+        (55, 13, 50, "TEMPLATE_NAME"),
+    ]
+
+
+def test_mapped_segments_render():
+    data = "<text>é BUTTON_1</text><text>BUTTON_2</text>".encode()
+    segments = build_mapped_segments(
+        memoryview(data), [(x[0], x[1], True) for x in scan_placeholders(data)]
+    )
+
+    assert segments.render({"button_1": "Fire"}) == "<text>é Fire</text><text></text>"
@@ -0,0 +1,88 @@
+import pytest
+
+from joystick_diagrams.input.button import Button
+from joystick_diagrams.input.device import Device_
+from joystick_diagrams.input.hat import Hat, HatDirection
+from joystick_diagrams.template_recommendation import (
+    TemplateRecommender,
+    name_similarity,
+    normalise_name,
+)
+
+
+@pytest.fixture
+def template_directory(tmp_path):
+    templates = {
+        "Vendor/Warthog - Joystick.svg": "BUTTON_1 BUTTON_2 POV_1_U",
+        "Vendor/Warthog - Throttle.svg": "BUTTON_1 BUTTON_2 BUTTON_3",
+        "Button Box.svg": " ".join(f"BUTTON_{x}" for x in range(1, 41)),
+    }
+
+    for name, placeholders in templates.items():
+        template_file = tmp_path.joinpath(name)
+        template_file.parent.mkdir(parents=True, exist_ok=True)
+        template_file.write_text(f"<svg>{placeholders}</svg>", encoding="utf-8")
+
+    return tmp_path
+
+
+def create_device(name: str, buttons: int, hat: bool = False) -> Device_:
+    device = Device_("12345678-1234-5678-1234-567812345678", name)
+
+    for number in range(1, buttons + 1):
+        device.create_input(Button(number), f"Action {number}")
+
+    if hat:
+        device.create_input(Hat(1, HatDirection.U), "Look up")
+
+    return device
+
+
+def test_normalise_name():
+    assert normalise_name("X56 H.O.T.A.S. Throttle") == "x56 hotas throttle"
+    assert normalise_name("Vendor/T.16000M - Joystick") == "vendor t16000m joystick"
+
+
+def test_name_similarity():
+    assert name_similarity("warthog joystick", "vendor warthog joystick") > (
+        name_similarity("warthog joystick", "vendor warthog throttle")
+    )
+    assert name_similarity("", "warthog") == 0.0
+
+
+def test_recommend_by_name(template_directory):
+    device = create_device("Joystick - HOTAS Warthog", 2, hat=True)
+
+    recommendations = TemplateRecommender(template_directory).recommend([device])
+
+    best = recommendations[device.guid][0]
+    assert best.template_path.name == "Warthog - Joystick.svg"
+    assert best.coverage == 1.0
+    assert best.missing == frozenset()
+    assert len(recommendations[device.guid]) == 3
+
+
+def test_recommend_by_coverage(template_directory):
+    device = create_device("Generic USB Controller", 30)
+
+    recommendations = TemplateRecommender(template_directory).recommend([device], 1)
+
+    assert recommendations[device.guid][0].template_path.name == "Button Box.svg"
+
+
+def test_recommend_empty_directory(tmp_path):
+    device = create_device("Joystick", 1)
+
+    assert TemplateRecommender(tmp_path).recommend([device]) == {device.guid: []}
+
+
+def test_recommend_combines_device_profiles(template_directory):
+    first_profile = create_device("Joystick - HOTAS Warthog", 2)
+    second_profile = create_device("Joystick - HOTAS Warthog", 0, hat=True)
+
+    recommendations = TemplateRecommender(template_directory).recommend(
+        [first_profile, second_profile], 1
+    )
+
+    assert list(recommendations) == [first_profile.guid]
+    assert recommendations[first_profile.guid][0].coverage == 1.0
@@ -0,0 +1,114 @@
+from pathlib import Path
+
+import pytest
+
+from joystick_diagrams.db import db_connection, db_template_validation
+from joystick_diagrams.template_validation import (
+    ISSUE_ERROR,
+    ISSUE_WARNING,
+    validate_template_data,
+    validate_templates,
+)
+
+SVG = '<svg xmlns="http://www.w3.org/2000/svg">{}</svg>'
+
+
+@pytest.fixture(autouse=True)
+def database(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_connection, "data_root", lambda: tmp_path)
+    tmp_path.joinpath(db_connection.DB_DIR).mkdir()
+    db_template_validation.create_new_db_if_not_exist()
+
+
+def validate(content: str):
+    return validate_template_data("test.svg", SVG.format(content).encode("utf-8"))
+
+
+def messages(validation, severity):
+    return [x.message for x in validation.issues if x.severity == severity]
+
+
+def test_valid_template():
+    validation = validate(
+        "<text>BUTTON_1 POV_1_U AXIS_X BUTTON_1_Modifier_1_Key</text>"
+    )
+
+    assert validation.valid
+    assert validation.issues == ()
+
+
+def test_malformed_xml():
+    validation = validate_template_data("test.svg", b"<svg><text>BUTTON_1</svg>")
+
+    assert not validation.valid
+    assert "not well formed XML" in validation.errors[0].message
+    assert validation.errors[0].line == 1
+
+
+def test_malformed_control_keys():
+    validation = validate("<text>AXIS_\nPOV_1 BUTTON_A</text>")
+
+    assert messages(validation, ISSUE_ERROR) == [
+        "AXIS_ is not a valid control key",
+        "POV_1 is not a valid control key",
+        "BUTTON_A is not a valid control key",
+    ]
+    assert [x.line for x in validation.errors] == [1, 2, 2]
+
+
+def test_unrecognised_control_keys():
+    validation = validate("<text>AXIS_SLIDER_10 BUTTON_1_Modifier_1_Command</text>")
+
+    assert validation.valid
+    assert messages(validation, ISSUE_WARNING) == [
+        "AXIS_SLIDER_10 is not recognised as a control, so it is not checked against devices or cleared when unused",
+        "BUTTON_1_MODIFIER_1_COMMAND is not a modifier Key or Action, so it is never replaced",
+    ]
+
+
+def test_repeated_controls_ignore_switch_fallbacks():
+    validation = validate(
+        "<switch><foreignObject>BUTTON_1</foreignObject><text>BUTTON_1</text></switch>"
+        "<text>BUTTON_2</text><text>button_2</text><text>TEMPLATE_NAME TEMPLATE_NAME</text>"
+    )
+
+    assert messages(validation, ISSUE_WARNING) == ["BUTTON_2 appears 2 times"]
+
+
+def test_placeholder_in_attribute():
+    validation = validate('<g id="BUTTON_1"><text>BUTTON_1</text></g>')
+
+    assert messages(validation, ISSUE_WARNING) == [
+        "BUTTON_1 in the id attribute of a g element will be replaced on export"
+    ]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_validate_templates_stores_results(tmp_path, workers):
+    paths = []
+    for name, content in [("a.svg", "BUTTON_1"), ("b.svg", "AXIS_")]:
+        template_file = tmp_path.joinpath(name)
+        template_file.write_text(
+            SVG.format(f"<text>{content}</text>"), encoding="utf-8"
+        )
+        paths.append(template_file)
+
+    first = validate_templates(paths, workers)
+    second = validate_templates([*paths, tmp_path.joinpath("missing.svg")], workers)
+
+    assert [x.valid for x in first] == [True, False]
+    assert [x.cached for x in first] == [False, False]
+    assert second == [type(x)(x.path, x.hash, x.issues, cached=True) for x in first]
+
+
+def test_validate_templates_reads_each_template_once(tmp_path, monkeypatch):
+    template_file = tmp_path.joinpath("a.svg")
+    template_file.write_text(SVG.format("<text>BUTTON_1</text>"), encoding="utf-8")
+    read = []
+    read_bytes = Path.read_bytes
+    monkeypatch.setattr(Path, "read_bytes", lambda x: read.append(x) or read_bytes(x))
+
+    validation = validate_templates([template_file])
+
+    assert read == [template_file]
+    assert validation[0].valid